@@ -2,19 +2,24 @@
 #!/usr/bin/env python3
 
 from . import common
-from .datatypes import ObjectData
+from .datatypes import ObjectData, create
 from . import db
 from . import fetch
 from . import proc_image
 from . import project
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from pathlib import Path
 from shutil import copy as cp
 from shlex import join as shjoin, split as shsplit
 import sys
-from typing import Dict, cast
+from typing import Dict, List, Optional, Set, Tuple, cast
+
+
+FETCH_WORKERS = 4       # concurrent requests to astronomyapi.com
 
 
 def _add_images(project_root: str,
@@ -64,7 +69,7 @@ def _add_images(project_root: str,
     return db_data
 
 
-def _add_sketch(root: str, data: Dict, cmd: str = ''):
+def _add_sketch(pdb: db.ProjectDB, data: Dict, cmd: str = ''):
 
     print('Add sketches ...')
 
@@ -77,28 +82,29 @@ def _add_sketch(root: str, data: Dict, cmd: str = ''):
         this_app = Path(sys.argv[0]).name
         cmd = shjoin([this_app] + sys.argv[1:])
 
-    db.add_sketch(root=root,
+    db.add_sketch(pdb,
                   full=data['cropped_img'],
                   scan=data.get('scan', ''),
                   sub=[i for i in imgs if i],
                   cmd=[cmd])
 
 
-def _add_observation(root: str, name: str, img_date: datetime):
+def _add_observation(pdb: db.ProjectDB, name: str, img_date: datetime):
 
     print(f'Add observation for {name} ...')
 
-    db.add_obs(root,
+    db.add_obs(pdb,
                name=name,
                date=img_date.date().isoformat())
 
 
-def _add_objects(root: str, name: str):
+def _add_objects(pdb: db.ProjectDB, name: str, fetched: Optional[Dict[str, ObjectData]] = None):
 
     print(f'Add object data for {name} ...')
 
-    fetched = fetch_astronomyapi_on_demand(name)
-    db.add_objects(root, name=name, fetched=fetched)
+    if fetched is None:
+        fetched = fetch_astronomyapi_on_demand(name)
+    db.add_objects(pdb, name=name, fetched=fetched)
 
 
 def add(project_root: str,
@@ -124,15 +130,181 @@ def add(project_root: str,
                               full_page=full_page,
                               simple=simple)
 
-    _add_sketch(root=project_root, data=sketch_data, cmd=cmd)
+    # all the db changes are saved together, once per file
+    with db.ProjectDB(project_root) as pdb:
+
+        _add_sketch(pdb=pdb, data=sketch_data, cmd=cmd)
+
+        for obj in [first_object, second_object]:
+            if obj:
+                _add_observation(pdb=pdb,
+                                 name=obj,
+                                 img_date=sketch_data['img_date'])
+                _add_objects(pdb=pdb,
+                             name=obj)
+
+
+@dataclass
+class BatchItem:
+    img: str = ''
+    scan: str = ''
+    x_offset: int = 0
+    y_offset: int = 0
+    scale: float = 1.0
+    objects: List[str] = field(default_factory=list)
+    full_page: bool = False
+    simple: bool = False
+
+
+def load_batch(manifest: str) -> List[BatchItem]:
+    """
+    The scans listed in a batch manifest, image paths relative to it:
+
+        scans:
+          - img: orig/cluster.jpg
+            scan: orig/cluster-scan.jpg
+            x_offset: 10
+            objects: [C47, Alpha UMi]
+    """
+
+    try:
+        data = db.load(manifest, read_only=True)
+    except AssertionError:
+        # not a mapping
+        data = None
+    if not isinstance(data, dict) or not isinstance(data.get('scans'), list):
+        raise ValueError(f'No list of \'scans\' in {manifest}')
+
+    keys = [f.name for f in fields(BatchItem)]
+    base = Path(manifest).parent
+    items = []
+    for i, d in enumerate(data['scans'], start=1):
+        if not isinstance(d, dict) or not d.get('img'):
+            raise ValueError(f'Scan #{i} of {manifest} has no \'img\'')
+        unknown = [k for k in d.keys() if k not in keys]
+        if unknown:
+            raise ValueError(f'Scan #{i} of {manifest} has unknown keys {', '.join(unknown)}')
+        item = create(BatchItem, d)
+        if isinstance(item.objects, str):
+            item.objects = [item.objects]
+        item.objects = list(item.objects or [])
+        if len(item.objects) > 2:
+            raise ValueError(f'Scan #{i} of {manifest} has more than two objects')
+        item.img = str((base / item.img).resolve())
+        if item.scan:
+            item.scan = str((base / item.scan).resolve())
+        items.append(item)
+
+    return items
+
+
+def _add_cmd_line(project_root: str, item: BatchItem) -> str:
+    # an equivalent 'add' command, to be replayed by reproc()
+
+    args = [Path(sys.argv[0]).name, project_root, 'add', '-i', item.img]
+    if item.scan:
+        args += ['-c', item.scan]
+    if item.x_offset:
+        args += ['-x', str(item.x_offset)]
+    if item.y_offset:
+        args += ['-y', str(item.y_offset)]
+    if item.scale != 1.0:
+        args += ['-s', str(item.scale)]
+    for opt, obj in zip(['-o1', '-o2'], item.objects):
+        args += [opt, obj]
+    if item.full_page:
+        args.append('--full-page')
+    if item.simple:
+        args.append('--simple')
+    return shjoin(args)
+
+
+def _batch_images(job: Tuple[str, List[BatchItem]]) -> List[Dict]:
+    # run in worker processes, see add_batch()
+
+    project_root, items = job
+    data = []
+    for item in items:
+        objects = item.objects + ['', '']
+        data.append(_add_images(project_root=project_root,
+                                img=item.img,
+                                scan=item.scan,
+                                x_offset=item.x_offset,
+                                y_offset=item.y_offset,
+                                scale=item.scale,
+                                first_object=objects[0],
+                                second_object=objects[1],
+                                full_page=item.full_page,
+                                simple=item.simple))
+    return data
 
-    for obj in [first_object, second_object]:
-        if obj:
-            _add_observation(root=project_root,
-                             name=obj,
-                             img_date=sketch_data['img_date'])
-            _add_objects(root=project_root,
-                         name=obj)
+
+def _batch_groups(items: List[BatchItem]) -> List[List[int]]:
+    """
+    Indexes of the items to process one after the other: the ones which
+    may get the same file names, made unique only by checking the files
+    already written. Those are the items sharing an object or a scan name.
+    """
+
+    def names(item: BatchItem) -> Set[str]:
+        res = {'full:' + '|'.join(o.lower() for o in item.objects)}
+        res |= {'obj:' + n.lower() for o in item.objects for n in common.names_to_list(o)}
+        if item.scan:
+            res.add('scan:' + Path(item.scan).name)
+        return res
+
+    groups: List[Tuple[Set[str], List[int]]] = []
+    for i, item in enumerate(items):
+        n = names(item)
+        merged = (n, [i])
+        rest = []
+        for g in groups:
+            if g[0] & merged[0]:
+                merged = (g[0] | merged[0], g[1] + merged[1])
+            else:
+                rest.append(g)
+        groups = rest + [merged]
+
+    return sorted(sorted(g[1]) for g in groups)
+
+
+def add_batch(project_root: str, manifest: str, workers: Optional[int] = None):
+    """
+    Add the scans of a batch manifest, see load_batch(). The images are
+    processed in parallel and the object data is fetched concurrently,
+    then all the db changes are saved at once, none if any scan fails.
+    """
+
+    items = load_batch(manifest)
+    print(f'Adding {len(items)} scans ...')
+
+    groups = _batch_groups(items)
+    jobs = [(project_root, [items[i] for i in g]) for g in groups]
+    if workers == 1 or len(jobs) < 2:
+        results = [_batch_images(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_batch_images, jobs))
+
+    sketch_data: List[Dict] = [{}] * len(items)
+    for g, group_data in zip(groups, results):
+        for i, d in zip(g, group_data):
+            sketch_data[i] = d
+
+    names = list(dict.fromkeys(obj for item in items for obj in item.objects))
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        fetched = dict(zip(names, executor.map(fetch_astronomyapi_on_demand, names)))
+
+    with db.ProjectDB(project_root) as pdb:
+        for item, data in zip(items, sketch_data):
+            _add_sketch(pdb=pdb, data=data, cmd=_add_cmd_line(project_root, item))
+            for obj in item.objects:
+                _add_observation(pdb=pdb, name=obj, img_date=data['img_date'])
+        # the new objects inserted into the object db in one pass
+        if names:
+            _add_objects(pdb=pdb,
+                         name=', '.join(names),
+                         fetched={k: v for obj in names for k, v in fetched[obj].items()})
 
 
 def fetch_astronomyapi_on_demand(name: str) -> Dict[str, ObjectData]:
@@ -170,16 +342,17 @@ def fetch_objects(project_root: str,
             fetch_map = {fetch_name: fetch_name}
 
         print(f'Add object data for {obj} ...')
-        db.add_objects(root=project_root,
-                       name=obj,
-                       fetched=fetched,
-                       fetch_map={obj: fetch_map},
-                       refresh=True)
+        with db.ProjectDB(project_root) as pdb:
+            db.add_objects(pdb,
+                           name=obj,
+                           fetched=fetched,
+                           fetch_map={obj: fetch_map},
+                           refresh=True)
     else:
         print(f'No data for {fetch_name}')
 
 
-def _reproc_one(sketch: Dict, project_root: str, arg_parser: argparse.ArgumentParser):
+def _reproc_one(sketch: Dict, pdb: db.ProjectDB, arg_parser: argparse.ArgumentParser):
 
     print(f'Reprocessing sketch {sketch['full']} ...')
 
@@ -196,7 +369,7 @@ def _reproc_one(sketch: Dict, project_root: str, arg_parser: argparse.ArgumentPa
             print(f'Args were {shjoin(cmd)}')
             proc_args = arg_parser.parse_args(cmd)
 
-            sketch_data = _add_images(project_root=project_root,
+            sketch_data = _add_images(project_root=pdb.root,
                                       img=proc_args.img,
                                       scan=proc_args.scan,
                                       x_offset=proc_args.x_offset,
@@ -207,7 +380,7 @@ def _reproc_one(sketch: Dict, project_root: str, arg_parser: argparse.ArgumentPa
                                       full_page=proc_args.full_page,
                                       simple=proc_args.simple)
 
-            _add_sketch(root=project_root, data=sketch_data, cmd=c)
+            _add_sketch(pdb=pdb, data=sketch_data, cmd=c)
 
         # argparse exits on a malformed command line, catch it too
         # to keep reprocessing the remaining sketches
@@ -219,19 +392,22 @@ def _reproc_one(sketch: Dict, project_root: str, arg_parser: argparse.ArgumentPa
 
 def reproc(project_root: str, arg_parser: argparse.ArgumentParser, sketch: str = ''):
 
-    sketches = db.sketches_raw(project_root)
+    # the sketch db is saved once, after all the sketches are reprocessed
+    with db.ProjectDB(project_root) as pdb:
+
+        sketches = pdb.sketches_raw()
 
-    if sketch:
-        basename = Path(sketch).name
-        found = [s for s in sketches if s['full'] == basename]
-        if not found:
-            print(f'No sketch found with full name {basename}')
-        elif len(found) > 1:
-            print(f'Error: multiple sketches found with full name {basename}')
+        if sketch:
+            basename = Path(sketch).name
+            found = [s for s in sketches if s['full'] == basename]
+            if not found:
+                print(f'No sketch found with full name {basename}')
+            elif len(found) > 1:
+                print(f'Error: multiple sketches found with full name {basename}')
+            else:
+                _reproc_one(sketch=found[0], pdb=pdb, arg_parser=arg_parser)
         else:
-            _reproc_one(sketch=found[0], project_root=project_root, arg_parser=arg_parser)
-    else:
-        print('Reprocessing all sketches ...')
-        for s in sketches:
-            print('--------')
-            _reproc_one(sketch=s, project_root=project_root, arg_parser=arg_parser)
+            print('Reprocessing all sketches ...')
+            for s in sketches:
+                print('--------')
+                _reproc_one(sketch=s, pdb=pdb, arg_parser=arg_parser)
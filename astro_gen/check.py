@@ -58,16 +58,22 @@ def check_links(root: str, file: str) -> List[Tuple[str, str, str]]:
     return broken
 
 
-def check(root: str) -> bool:
+def check_pages(root: str, files: List[str]) -> bool:
 
     all_ok: bool = True
-    root_dir = Path(project.site_root(root))
 
-    files = [f for f in root_dir.rglob(pattern="*.md") if '_site' not in str(f)]
     for f in files:
-        broken = check_links(root, str(f))
+        broken = check_links(root, f)
         for loc, name, link in broken:
             print(f"In file {loc}: invalid link '{name}' to '{link}'")
             all_ok = False
 
     return all_ok
+
+
+def check(root: str) -> bool:
+
+    root_dir = Path(project.site_root(root))
+
+    files = [str(f) for f in root_dir.rglob(pattern="*.md") if '_site' not in str(f)]
+    return check_pages(root, files)
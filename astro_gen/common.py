@@ -4,25 +4,61 @@ from . import constellations
 from .datatypes import Object
 
 from datetime import datetime, timedelta
+from functools import lru_cache
 import re
 from slugify import slugify
-from typing import List, Union
+from typing import Dict, List, Tuple, Union
 import unicodedata
 
 
+# Name transformations are called for each name of every page, log
+# and index row, memoize them with a bounded cache.
+NAME_CACHE_SIZE = 4096
+
+_GREEK_PREFIX = 'GREEK SMALL LETTER '
+
+
+def _greek_letters() -> Dict[str, str]:
+
+    res = {}
+    for block in [range(0x0370, 0x0400), range(0x1F00, 0x2000)]:
+        for c in map(chr, block):
+            n = unicodedata.name(c, '')
+            letter = n.removeprefix(_GREEK_PREFIX)
+            # single words only, as the first word of a name is looked up
+            if letter != n and ' ' not in letter:
+                res[letter] = c
+    return res
+
+
+GREEK_LETTERS = _greek_letters()
+
+MESSIER_PATTERN = re.compile(r'^M(\d{1,3})$')
+
+# By designation table in https://en.wikipedia.org/wiki/Double_star
+STRUVE_PATTERN = re.compile(r'^(ST[A-Z]{1,2}) ?(\d+( [A-B,]+)?)$')
+STRUVE_PREFIXES = {
+    'STF': 'Σ',
+    'STFA': 'Σ I',
+    'STFB': 'Σ II',
+    'STT': 'OΣ',
+    'STTA': 'OΣΣ'
+}
+
+
 def to_greek(val: str) -> str:
 
+    key = val.upper()
+    if key in GREEK_LETTERS:
+        return GREEK_LETTERS[key]
     try:
-        key = f'GREEK SMALL LETTER {val.upper()}'
-        return unicodedata.lookup(key)
+        return unicodedata.lookup(f'{_GREEK_PREFIX}{key}')
     except Exception:
         return val
 
 
-def greek_name(name: Union[str, List[str]]) -> Union[str, List[str]]:
-
-    if isinstance(name, list):
-        return [greek_name(n) for n in name]
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _greek_name(name: str) -> str:
 
     split_name = name.split()
     if len(split_name) != 2:
@@ -32,53 +68,60 @@ def greek_name(name: Union[str, List[str]]) -> Union[str, List[str]]:
     return f'{maybe_greek} {name_end}'
 
 
-def pretty_name(name: Union[str, List[str]]) -> Union[str, List[str]]:
+def greek_name(name: Union[str, List[str]]) -> Union[str, List[str]]:
 
     if isinstance(name, list):
-        return [pretty_name(n) for n in name]
+        return [_greek_name(n) for n in name]
+    return _greek_name(name)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _pretty_name(name: str) -> str:
 
     split_name = name.split()
     if constellations.is_constellation(split_name[-1]):
         name_start = ' '.join(split_name[0:-1])
         return f'{name_start} {constellations.genitive(split_name[-1])}'
 
-    messier_match = re.match(r'^M(\d{1,3})$', name)
+    messier_match = MESSIER_PATTERN.match(name)
     if messier_match:
         return f'Messier {messier_match.group(1)}'
 
     return name
 
 
+def pretty_name(name: Union[str, List[str]]) -> Union[str, List[str]]:
+
+    if isinstance(name, list):
+        return [_pretty_name(n) for n in name]
+    return _pretty_name(name)
+
+
 def names_to_list(names: str) -> List[str]:
     return names.replace(', ', ',').split(',')
 
 
-def traditional_name(name: Union[str, List[str]]) -> Union[str, List[str]]:
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _traditional_name(name: str) -> str:
 
-    if isinstance(name, list):
-        return [traditional_name(n) for n in name]
-
-    maybe_greek = greek_name(name)
+    maybe_greek = _greek_name(name)
     if maybe_greek != name:
         return maybe_greek
 
-    # By designation table in https://en.wikipedia.org/wiki/Double_star
-    struve_match = re.match(r'^(ST[A-Z]{1,2}) ?(\d+( [A-B,]+)?)$', name.upper())
-    if struve_match:
-        if struve_match.group(1) == 'STF':
-            return f'Σ {struve_match.group(2)}'
-        if struve_match.group(1) == 'STFA':
-            return f'Σ I {struve_match.group(2)}'
-        if struve_match.group(1) == 'STFB':
-            return f'Σ II {struve_match.group(2)}'
-        if struve_match.group(1) == 'STT':
-            return f'OΣ {struve_match.group(2)}'
-        if struve_match.group(1) == 'STTA':
-            return f'OΣΣ {struve_match.group(2)}'
+    struve_match = STRUVE_PATTERN.match(name.upper())
+    if struve_match and struve_match.group(1) in STRUVE_PREFIXES:
+        return f'{STRUVE_PREFIXES[struve_match.group(1)]} {struve_match.group(2)}'
 
     return name
 
 
+def traditional_name(name: Union[str, List[str]]) -> Union[str, List[str]]:
+
+    if isinstance(name, list):
+        return [_traditional_name(n) for n in name]
+    return _traditional_name(name)
+
+
 def pretty_name_str(name: Union[str, List[str]]) -> str:
 
     pn = pretty_name(name)
@@ -117,13 +160,18 @@ def md_image(text: str, url: str, desc: str = '') -> str:
     return f'!{md_link(text, url, desc)}'
 
 
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _name_slug(name: str) -> str:
+    return slugify(name)
+
+
 def name_slug(obj: Union[str, List[str]]) -> str:
     if isinstance(obj, list):
         name = ','.join(obj)
     else:
         name = obj
 
-    return slugify(name)
+    return _name_slug(name)
 
 
 def file_basename(obj: Union[str, List[str]], date: str) -> str:
@@ -157,6 +205,11 @@ def obs_year(date: str) -> str:
     return str(_obs_date(date).year)
 
 
+def obs_day_and_year(date: str) -> Tuple[str, str]:
+    d = _obs_date(date)
+    return (d.isoformat(), str(d.year))
+
+
 def get_constellation(name: str) -> str:
 
     split_name = name.split()
@@ -2,10 +2,11 @@
 
 from copy import deepcopy
 from dataclasses import dataclass, field, fields, asdict
+import sys
 from typing import Any, Dict, List, Type
 
 
-@dataclass
+@dataclass(slots=True)
 class SketchData:
     full: str = ''
     scan: str = ''
@@ -13,7 +14,7 @@ class SketchData:
     notes: str = ''
 
 
-@dataclass
+@dataclass(slots=True)
 class ObsData:
     names: List[str] = field(default_factory=list)
     img: str = ''
@@ -28,7 +29,17 @@ class ObsData:
     data: Dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class ObsRecord:
+    """An observation with the derived data of its page."""
+    obs: ObsData
+    day: str
+    year: str
+    slug: str
+    page: str   # path of the observation page relative to the site root
+
+
+@dataclass(slots=True)
 class ObjectData:
     name: str = ''
     constellation: str = ''
@@ -43,15 +54,34 @@ class ObjectData:
     data: Dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Object(ObjectData):
     components: Dict[str, ObjectData] = field(default_factory=dict)
     fetched: Dict[str, ObjectData] = field(default_factory=dict)
 
 
+# Fields with few distinct values over many records, e.g. the location
+# of the observations or the type of the objects. create() interns their
+# strings, so records parsed separately share a single copy of each.
+INTERNED: Dict[Type, List[str]] = {
+    ObsData: ['names', 'loc', 'fov'],
+    ObjectData: ['constellation', 'type', 'subtype', 'spectral_class'],
+    Object: ['constellation', 'type', 'subtype', 'spectral_class'],
+}
+
+
+def _intern(v: Any) -> Any:
+    if isinstance(v, str):
+        return sys.intern(v)
+    if isinstance(v, list):
+        return [sys.intern(e) if isinstance(e, str) else e for e in v]
+    return v
+
+
 def create(cls: Type, d: Dict) -> Any:
     KEYS = [f.name for f in fields(cls)]
-    filt = {k: v for k, v in d.items() if k in KEYS}
+    interned = INTERNED.get(cls, [])
+    filt = {k: _intern(v) if k in interned else v for k, v in d.items() if k in KEYS}
     return cls(**filt)
 
 
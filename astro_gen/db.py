@@ -1,56 +1,72 @@
 #!/usr/bin/env python3
 
 from . import common
+from . import db_cache
 from . import project
-from .datatypes import ObsData, Object, ObjectData, SketchData, create
+from .datatypes import ObsData, ObsRecord, Object, ObjectData, SketchData, create
 
+from bisect import bisect_right, insort
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from dataclasses import asdict
 from datetime import datetime
-from natsort import natsorted
+import io
+from natsort import natsort_keygen
 from pathlib import Path
 from ruamel.yaml import YAML, comments
-from typing import Callable, Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 # As db files are also edited manually, we're using
 # ruamel.yaml to be able to round-trip edit
 # files to preserve comments, empty lines etc.
+# Commands only reading the dbs use the safe loader
+# instead: same YAML 1.2 schema, plain containers, and
+# the C parser of ruamel.yaml.clib when it's installed
+# - ruamel falls back to the pure Python one otherwise.
 
 YamlDict = comments.CommentedMap
 YamlList = comments.CommentedSeq
 
+# Observation db shards parsed in parallel from this many,
+# below that the worker processes aren't worth starting
+PARALLEL_LOAD_MIN_FILES = 8
 
-def load(db: str) -> YamlDict:
+# Sort key of the object names, e.g. M2 before M13
+_natural_key = natsort_keygen()
 
-    print(f'Loading {db} ...')
 
-    yaml = YAML()
-    data = yaml.load(Path(db))
-    assert isinstance(data, YamlDict)
-    return data
+def _obs_key(entry: Dict) -> Tuple:
+    name = entry['name']
+    return (tuple(name) if isinstance(name, list) else name, entry['img'])
 
 
-def sketches_raw(root: str) -> List[Dict]:
+# The keys identifying the entries of the db lists, an
+# observation by its objects and image, a sketch by its image
+LIST_KEYS: Dict[str, Callable[[Dict], Any]] = {
+    'observations': _obs_key,
+    'sketches': lambda entry: entry['full'],
+}
 
-    sketch_db = load(project.sketch_db(root))
-    return list(sketch_db['sketches'])
 
+def load(db: str, read_only: bool = False) -> Dict:
+    """Load a db file, round-trip editable unless `read_only`."""
 
-def sketches(root: str) -> List[SketchData]:
+    print(f'Loading {db} ...')
 
-    raw = sketches_raw(root)
-    return [create(SketchData, d) for d in raw]
+    yaml = YAML(typ='safe') if read_only else YAML()
+    data = yaml.load(Path(db))
+    assert isinstance(data, dict)
+    return data
 
 
-def observations_raw(root: str) -> List[Dict]:
+def _sketches_of(sketch_db: Dict) -> List[SketchData]:
 
-    obs_db = load(project.obs_db(root))
-    return list(obs_db['observations'])
+    return [create(SketchData, d) for d in sketch_db['sketches']]
 
 
-def observations(root: str) -> List[ObsData]:
+def _observations_of(obs_db: Dict) -> List[ObsData]:
 
-    raw = observations_raw(root)
+    raw = [dict(r) for r in obs_db['observations']]
     for r in raw:
         if isinstance(r['name'], str):
             r['names'] = [r['name']]
@@ -62,13 +78,61 @@ def observations(root: str) -> List[ObsData]:
     return [create(ObsData, d) for d in raw]
 
 
-def objects_raw(root: str) -> Dict[str, Dict]:
+def _parse_observations(file: str) -> List[ObsData]:
+    # run in worker processes, see ProjectDB._derive_all()
+    return _observations_of(load(file, read_only=True))
 
-    obj_db = load(project.object_db(root))
-    return dict(obj_db['objects'])
 
+def obs_files(root: str, new: Iterable[str] = ()) -> List[str]:
+    """
+    The observation db files: obs.yml followed by the yearly shards
+    under db/obs, including the `new` ones not written yet. obs.yml
+    is optional once there are shards.
+    """
 
-def objects(root: str) -> Dict[str, Object]:
+    legacy = project.obs_db(root)
+    shards = {str(f.resolve()) for f in Path(project.obs_shard_dir(root)).glob('*.yml')}
+    shards |= {f for f in new if Path(f).parent == Path(project.obs_shard_dir(root))}
+    if shards and not Path(legacy).is_file():
+        return sorted(shards)
+    return [legacy] + sorted(shards)
+
+
+def _new_obs_db(year: str) -> YamlDict:
+
+    data = YamlDict()
+    data['observations'] = YamlList()
+    data.yaml_set_start_comment(f'Observation \'db\' of {year} - list of observations\n')
+    return data
+
+
+def obs_record(obs: ObsData) -> ObsRecord:
+
+    day, year = common.obs_day_and_year(obs.date)
+    slug = common.file_basename(obs.names, day)
+    return ObsRecord(obs=obs,
+                     day=day,
+                     year=year,
+                     slug=slug,
+                     page=project.obs_page(year, slug))
+
+
+def obs_records(obs_db: List[ObsData]) -> List[ObsRecord]:
+
+    records = [obs_record(o) for o in obs_db]
+
+    pages: Dict[str, ObsRecord] = {}
+    for r in records:
+        if r.page in pages:
+            other = pages[r.page].obs
+            raise ValueError(f'Duplicate observation page {r.page}: '
+                             f'{other.names} / {other.img} and {r.obs.names} / {r.obs.img}')
+        pages[r.page] = r
+
+    return records
+
+
+def _objects_of(object_db: Dict) -> Dict[str, Object]:
 
     def _map_of_obj_data(src: Dict[str, Dict]) -> Dict[str, ObjectData]:
         res = {}
@@ -79,7 +143,7 @@ def objects(root: str) -> Dict[str, Object]:
             res[k] = d
         return res
 
-    raw = objects_raw(root)
+    raw = {k: dict(v) for k, v in object_db['objects'].items()}
     for k, v in raw.items():
         v['name'] = k
         if 'components' in v.keys():
@@ -90,23 +154,340 @@ def objects(root: str) -> Dict[str, Object]:
     return {k: create(Object, v) for k, v in raw.items()}
 
 
-def save(db: str, data: Dict):
+class ProjectDB:
+    """
+    The db files of a project for the duration of a command: each file
+    is loaded on first use, at most once, and the round-trip document is
+    shared by the readers and the writers. The dataclasses derived from a
+    file are cached until it's modified. Only the modified files are saved,
+    once, by save() or at the end of a `with` block without an exception.
+    A `read_only` instance loads the files faster, but can't modify them.
+    With `cache` the dataclasses of an unmodified file are taken from the
+    db cache when it's up to date, without parsing the file at all.
+    """
+
+    def __init__(self, root: str, read_only: bool = False, cache: bool = True):
+        self.root = root
+        self.read_only = read_only
+        self.cache = cache
+        self._docs: Dict[str, Dict] = {}
+        self._derived: Dict[str, Any] = {}
+        self._modified: Set[str] = set()
+        # files only appended to, with the entries and their state when loaded
+        self._appended: Dict[str, List[Tuple[str, Dict]]] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._object_index: Optional[ObjectIndex] = None
+        self._lookups: Dict[str, Dict[Any, Dict]] = {}
+
+    def __enter__(self) -> 'ProjectDB':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.save()
+
+    @property
+    def sketch_file(self) -> str:
+        return project.sketch_db(self.root)
+
+    @property
+    def obs_file(self) -> str:
+        return project.obs_db(self.root)
+
+    @property
+    def object_file(self) -> str:
+        return project.object_db(self.root)
+
+    @property
+    def obs_files(self) -> List[str]:
+        return obs_files(self.root, new=self._docs.keys())
+
+    def obs_file_of(self, year: str) -> str:
+        """The observation db file to add the observations of a year to."""
+
+        if Path(project.obs_shard_dir(self.root)).is_dir():
+            return project.obs_shard(self.root, year)
+        return self.obs_file
+
+    def exists(self, file: str) -> bool:
+        return file in self._docs or Path(file).is_file()
+
+    def document(self, file: str) -> Dict:
+        if file not in self._docs:
+            if not self.read_only:
+                st = Path(file).stat()
+                self._stamps[file] = (st.st_mtime_ns, st.st_size)
+            self._docs[file] = load(file, read_only=self.read_only)
+        return self._docs[file]
+
+    def create(self, file: str, data: YamlDict) -> YamlDict:
+        """A new document, written on save()."""
+
+        assert not self.read_only, f'{file} created read-only'
+        assert not self.exists(file), f'{file} already exists'
+        self._docs[file] = data
+        self._modified.add(file)
+        self._appended.pop(file, None)
+        return data
+
+    def edit(self, file: str) -> YamlDict:
+        """The round-trip document of a file, to be modified."""
+
+        assert not self.read_only, f'{file} loaded read-only'
+        doc = self.document(file)
+        assert isinstance(doc, YamlDict)
+        return doc
+
+    def modified(self, file: str, keys_changed: bool = True):
+        """
+        Mark a document as changed, to be saved. Without `keys_changed`
+        the list entries were only updated in place, with the same keys.
+        """
+
+        assert not self.read_only, f'{file} loaded read-only'
+        assert file in self._docs, f'{file} not loaded'
+        self._modified.add(file)
+        self._appended.pop(file, None)
+        self._derived.pop(file, None)
+        if keys_changed:
+            self._lookups.pop(file, None)
+
+    def append(self, file: str, key: str, entry: Dict):
+        """
+        Append an entry to the list `key` of a document. Unless the
+        document is modified otherwise too, only the new entries are
+        written to the end of the file on save().
+        """
+
+        add_to_list(self.edit(file)[key], entry)
+        if file in self._lookups:
+            self._lookups[file].setdefault(LIST_KEYS[key](entry), entry)
+        if file not in self._modified:
+            self._appended[file] = []
+        if file in self._appended:
+            self._appended[file].append((key, entry))
+        self._modified.add(file)
+        self._derived.pop(file, None)
+
+    def lookup(self, file: str, key: str) -> Dict[Any, Dict]:
+        """
+        The entries of the list `key` of a document by their LIST_KEYS
+        key, the first one of duplicates. Built on first use, then kept
+        up to date by append().
+        """
+
+        if file not in self._lookups:
+            entries: Dict[Any, Dict] = {}
+            for e in self.edit(file)[key]:
+                entries.setdefault(LIST_KEYS[key](e), e)
+            self._lookups[file] = entries
+        return self._lookups[file]
+
+    def object_index(self) -> 'ObjectIndex':
+        """The sort index of the objects, kept up to date by merge_objects()."""
+
+        if self._object_index is None:
+            self._object_index = ObjectIndex(self.edit(self.object_file)['objects'].keys())
+        return self._object_index
+
+    def is_modified(self, file: str) -> bool:
+        return file in self._modified
+
+    def _derive(self, file: str, convert: Callable[[Dict], Any]) -> Any:
+        if file not in self._derived:
+            self._derive_all([file], convert)
+        return self._derived[file]
+
+    def _derive_all(self,
+                    files: List[str],
+                    convert: Callable[[Dict], Any],
+                    parse: Optional[Callable[[str], Any]] = None):
+        """
+        Derive the data of `files`, taken from the db cache when possible.
+        `parse` is a picklable function returning the data of a file, with
+        that the files not loaded yet are parsed in worker processes when
+        there are enough of them.
+        """
+
+        missing: List[Tuple[str, Optional[db_cache.Key]]] = []
+        for file in files:
+            if file in self._derived:
+                continue
+            if not self.cache or file in self._modified:
+                missing.append((file, None))
+                continue
+            file_key = db_cache.key(file)
+            data = db_cache.load(self.root, file_key)
+            if data is None:
+                missing.append((file, file_key))
+            else:
+                print(f'Loading {file} from cache ...')
+                self._derived[file] = data
+
+        to_parse = [f for f, _ in missing if f not in self._docs]
+        if parse and len(to_parse) >= PARALLEL_LOAD_MIN_FILES:
+            with ProcessPoolExecutor() as executor:
+                self._derived.update(zip(to_parse, executor.map(parse, to_parse)))
+
+        for file, key in missing:
+            if file not in self._derived:
+                self._derived[file] = convert(self.document(file))
+            if key:
+                try:
+                    db_cache.save(self.root, key, self._derived[file])
+                except OSError as e:
+                    print(f'Unable to cache {file}: {e}')
+
+    def sketches_raw(self) -> List[Dict]:
+        return list(self.document(self.sketch_file)['sketches'])
+
+    def sketches(self) -> List[SketchData]:
+        return self._derive(self.sketch_file, _sketches_of)
+
+    def observations_raw(self) -> List[Dict]:
+        return [o for f in self.obs_files for o in self.document(f)['observations']]
+
+    def observations(self) -> List[ObsData]:
+        files = self.obs_files
+        self._derive_all(files, _observations_of, parse=_parse_observations)
+        return [o for f in files for o in self._derived[f]]
+
+    def observation_records(self) -> List[ObsRecord]:
+        return obs_records(self.observations())
+
+    def objects_raw(self) -> Dict[str, Dict]:
+        return dict(self.document(self.object_file)['objects'])
+
+    def objects(self) -> Dict[str, Object]:
+        return self._derive(self.object_file, _objects_of)
+
+    def save(self):
+        for file in sorted(self._modified):
+            if file in self._appended and \
+                    append_to_file(file, self._docs[file], self._appended[file], self._stamps[file]):
+                continue
+            save(file, self._docs[file])
+        self._modified.clear()
+        self._appended.clear()
+
+
+# Shortcuts loading a single file, read-only
+
+def sketches_raw(root: str) -> List[Dict]:
+    return ProjectDB(root, read_only=True).sketches_raw()
 
-    print(f'Saving {db} ...')
+
+def sketches(root: str) -> List[SketchData]:
+    return ProjectDB(root, read_only=True).sketches()
+
+
+def observations_raw(root: str) -> List[Dict]:
+    return ProjectDB(root, read_only=True).observations_raw()
+
+
+def observations(root: str) -> List[ObsData]:
+    return ProjectDB(root, read_only=True).observations()
+
+
+def observation_records(root: str) -> List[ObsRecord]:
+    return ProjectDB(root, read_only=True).observation_records()
+
+
+def objects_raw(root: str) -> Dict[str, Dict]:
+    return ProjectDB(root, read_only=True).objects_raw()
+
+
+def objects(root: str) -> Dict[str, Object]:
+    return ProjectDB(root, read_only=True).objects()
+
+
+def _round_trip_yaml() -> YAML:
 
     yaml = YAML()
     yaml.indent(mapping=2, sequence=4, offset=2)
     yaml.width = 160
+    return yaml
+
+
+def save(db: str, data: Dict):
+
+    print(f'Saving {db} ...')
+
+    yaml = _round_trip_yaml()
     yaml.dump(data=data,
               stream=Path(db))
 
 
-def update_in_list(l: YamlList, entry: Dict, key_match: Callable) -> bool:
-    for e in l:
-        if key_match(e, entry):
-            e.update(**entry)
-            return True
-    return False
+def _render_entry(key: str, entry: Dict) -> str:
+    # as an item of the list `key` in save(), without the key
+    out = io.StringIO()
+    _round_trip_yaml().dump({key: [entry]}, out)
+    return out.getvalue().partition('\n')[2]
+
+
+def append_to_file(db: str, data: YamlDict, entries: List[Tuple[str, Dict]], stamp: Tuple[int, int]) -> bool:
+    """
+    Fast path of save() for a document changed only by appending
+    `entries` to the list of its last key: renders only the new entries
+    and appends them to the file, then checks the result by parsing the
+    tail from the last entry already there. Returns False if the entries
+    can't be appended this way or the check fails, leaving the file as
+    it was.
+    """
+
+    key = list(data.keys())[-1] if data else ''
+    items = data.get(key)
+    if not isinstance(items, YamlList) or items.fa.flow_style() \
+            or len(items) <= len(entries) \
+            or any(k != key for k, _ in entries) \
+            or [id(e) for e in items[-len(entries):]] != [id(e) for _, e in entries]:
+        return False
+
+    path = Path(db)
+    st = path.stat()
+    if (st.st_mtime_ns, st.st_size) != stamp:
+        return False
+
+    # the last entry before, as loaded, and its line in the file
+    last = len(items) - len(entries) - 1
+    last_line = items.lc.item(last)[0]
+
+    with open(path, 'rb') as f:
+        f.seek(max(st.st_size - 1, 0))
+        ends_with_newline = f.read() in (b'', b'\n')
+
+    # separated by a blank line as by add_to_list()
+    tail = '' if ends_with_newline else '\n'
+    tail += ''.join('\n' + _render_entry(key, e) for _, e in entries)
+
+    print(f'Appending to {db} ...')
+
+    with open(path, 'ab') as f:
+        f.write(tail.encode('utf8'))
+
+    try:
+        lines = path.read_text(encoding='utf8').splitlines(keepends=True)
+        parsed = YAML(typ='safe').load(f'{key}:\n' + ''.join(lines[last_line:]))
+        ok = parsed == {key: [items[last]] + [e for _, e in entries]}
+    except Exception as e:
+        print(f'Unable to check {db}: {e}')
+        ok = False
+
+    if not ok:
+        print(f'Appending to {db} failed, saving it entirely')
+        with open(path, 'r+b') as f:
+            f.truncate(st.st_size)
+    return ok
+
+
+def update_in_list(entries: Dict[Any, Dict], entry: Dict, key: Any) -> bool:
+    """Update the entry of `key` in a ProjectDB.lookup() if present."""
+
+    e = entries.get(key)
+    if e is None:
+        return False
+    e.update(**entry)
+    return True
 
 
 def add_to_list(l: YamlList, entry: Dict):
@@ -114,7 +495,7 @@ def add_to_list(l: YamlList, entry: Dict):
     l.yaml_set_comment_before_after_key(len(l) - 1, before='')
 
 
-def add_sketch(root: str,
+def add_sketch(pdb: ProjectDB,
                full: str,
                scan: str = '',
                sub: List[str] = [],
@@ -129,17 +510,16 @@ def add_sketch(root: str,
     if cmd:
         entry['_cmd'] = cmd
 
-    sdb = load(project.sketch_db(root))
-    sk_list: YamlList[YamlDict] = sdb['sketches']
+    sketches = pdb.lookup(pdb.sketch_file, 'sketches')
 
-    updated = update_in_list(sk_list, entry, lambda x, y: x['full'] == y['full'])
-    if not updated:
-        add_to_list(sk_list, entry)
-
-    save(project.sketch_db(root), sdb)
+    updated = update_in_list(sketches, entry, LIST_KEYS['sketches'](entry))
+    if updated:
+        pdb.modified(pdb.sketch_file, keys_changed=False)
+    else:
+        pdb.append(pdb.sketch_file, 'sketches', entry)
 
 
-def add_obs(root: str,
+def add_obs(pdb: ProjectDB,
             name: str,
             date: str):
 
@@ -151,10 +531,15 @@ def add_obs(root: str,
     date_in_file = date.replace('-', '')
     img = f'{year:04}/{common.sketch_name(entry_name, date_in_file)}'
 
-    odb = load(project.obs_db(root))
-    obs_list: YamlList[YamlDict] = odb['observations']
+    # with shards only the one of the observation night is touched, like
+    # split_obs() does, but the same observation may be in any of them:
+    # one after midnight is in the shard of the previous night
+    _, night_year = common.obs_day_and_year(date)
+    file = pdb.obs_file_of(night_year)
+    present = [f for f in dict.fromkeys(pdb.obs_files + [file]) if pdb.exists(f)]
 
-    if any(o['name'] == entry_name and o['img'] == img for o in obs_list):
+    key = _obs_key({'name': entry_name, 'img': img})
+    if any(key in pdb.lookup(f, 'observations') for f in present):
         print(f'Skipping {entry_name} / {img}, already present')
         return
 
@@ -171,8 +556,10 @@ def add_obs(root: str,
         'text': ''
     }
 
-    add_to_list(obs_list, entry)
-    save(project.obs_db(root), odb)
+    if file in present:
+        pdb.append(file, 'observations', entry)
+    else:
+        add_to_list(pdb.create(file, _new_obs_db(night_year))['observations'], entry)
 
 
 def _refresh_with_fetched(entry: Dict, fetched: ObjectData, comp: str = '') -> Dict:
@@ -204,62 +591,243 @@ def _refresh_with_fetched(entry: Dict, fetched: ObjectData, comp: str = '') -> D
     return e
 
 
-def add_object(obj_dict: YamlDict,
-               name: str,
-               fetched: Dict[str, ObjectData],
-               fetch_map: Dict[str, str] = {},
-               refresh: bool = False) -> bool:
+class ObjectIndex:
+    """
+    The names of the object db in natural sort order, to find
+    where a new object goes with a binary search.
+    """
 
-    def new_entry() -> Dict:
-        return {
-            'constellation': common.get_constellation(name),
-            'type': ''
-        }
+    def __init__(self, names: Iterable[str]):
+        self._keys = sorted(_natural_key(n) for n in names)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def position(self, name: str) -> int:
+        """The number of names sorted before a new one."""
+        return bisect_right(self._keys, _natural_key(name))
+
+    def add(self, name: str):
+        insort(self._keys, _natural_key(name))
+
+
+def _ends_with_blank_line(node: Any) -> bool:
+    """If the last line of a map or a list entry is followed by an empty line."""
+
+    if isinstance(node, YamlDict) and node:
+        last = next(reversed(node))
+        comment = node.ca.items.get(last)
+        if comment and len(comment) > 2 and comment[2]:
+            return comment[2].value.endswith('\n\n')
+        return _ends_with_blank_line(node[last])
+    if isinstance(node, YamlList) and node:
+        comment = node.ca.items.get(len(node) - 1)
+        if comment and comment[0]:
+            return comment[0].value.endswith('\n\n')
+        return _ends_with_blank_line(node[-1])
+    return False
+
+
+def _has_comment_before(obj_dict: YamlDict, name: str) -> bool:
+    comment = obj_dict.ca.items.get(name)
+    return bool(comment and len(comment) > 1 and comment[1])
+
+
+def _insert_sorted(obj_dict: YamlDict, new: Dict[str, Dict], index: ObjectIndex):
+    """
+    Insert the new entries at their natural sort position in one pass,
+    the existing entries stay in their order. The comments are kept with
+    their keys, each new entry is separated by an empty line.
+    """
+
+    assert len(index) == len(obj_dict), 'object index out of sync'
+
+    placed = sorted(new, key=lambda n: (index.position(n), _natural_key(n)))
+    positions = [index.position(n) for n in placed]
+
+    order: List[str] = []
+    old = list(obj_dict.keys())
+    j = 0
+    for i in range(len(old) + 1):
+        while j < len(placed) and positions[j] == i:
+            order.append(placed[j])
+            j += 1
+        if i < len(old):
+            order.append(old[i])
+
+    for name in placed:
+        obj_dict[name] = new[name]
+        index.add(name)
+    # ruamel keeps the comments by key, re-ordering doesn't lose them
+    for name in order:
+        obj_dict.move_to_end(name)
+
+    for i, name in enumerate(order):
+        if i == 0:
+            continue
+        prev = order[i - 1]
+        if (name in new or prev in new) and \
+                not _has_comment_before(obj_dict, name) and \
+                (prev in new or not _ends_with_blank_line(obj_dict[prev])):
+            obj_dict.yaml_set_comment_before_after_key(name, before='')
+
+
+def _object_entry(obj_dict: YamlDict,
+                  name: str,
+                  fetched: Dict[str, ObjectData],
+                  fetch_map: Dict[str, str],
+                  refresh: bool) -> Optional[Dict]:
+    """The new or refreshed entry of an object, None when it's to be skipped."""
 
     print(f'Adding {name} ...')
 
-    db_names = list(obj_dict.keys())
-    if name in db_names:
-        if refresh:
-            entry = obj_dict[name]
-            del obj_dict[name]
-            db_names.remove(name)
-        else:
+    if name in obj_dict:
+        if not refresh:
             print(f'Skipping {name}, already present')
-            return False
+            return None
+        entry = obj_dict[name]
     else:
-        entry = new_entry()
-
-    db_names.append(name)
-    db_names = natsorted(db_names)
-    pos = db_names.index(name)
+        entry = {
+            'constellation': common.get_constellation(name),
+            'type': ''
+        }
 
     if name in fetched.keys():
         entry = _refresh_with_fetched(entry, fetched[name])
     for k, v in fetch_map.items():
         entry = _refresh_with_fetched(entry, fetched=fetched[v], comp=k)
+    return entry
+
+
+def merge_objects(obj_dict: YamlDict,
+                  names: List[str],
+                  fetched: Dict[str, ObjectData],
+                  fetch_map: Dict[str, Dict[str, str]] = {},
+                  refresh: bool = False,
+                  index: Optional[ObjectIndex] = None) -> List[str]:
+    """
+    Add objects to the object db, or refresh the existing ones with
+    `refresh`. The new ones are inserted sorted in a single pass, a
+    refreshed one keeps its place. `index` is the one of `obj_dict`
+    if already built. Returns the objects added or refreshed.
+    """
+
+    new: Dict[str, Dict] = {}
+    changed = []
+    for name in dict.fromkeys(names):
+        entry = _object_entry(obj_dict, name, fetched, fetch_map.get(name, {}), refresh)
+        if entry is None:
+            continue
+        if name in obj_dict:
+            obj_dict[name] = entry
+        else:
+            new[name] = entry
+        changed.append(name)
 
-    obj_dict.insert(pos, name, entry)
-    if pos < (len(obj_dict) - 1):
-        obj_dict.yaml_set_comment_before_after_key(db_names[pos + 1], before='')
+    if new:
+        _insert_sorted(obj_dict, new, index if index is not None else ObjectIndex(obj_dict.keys()))
+    return changed
 
-    return True
 
+def add_object(obj_dict: YamlDict,
+               name: str,
+               fetched: Dict[str, ObjectData],
+               fetch_map: Dict[str, str] = {},
+               refresh: bool = False) -> bool:
+
+    return bool(merge_objects(obj_dict, [name], fetched, fetch_map={name: fetch_map}, refresh=refresh))
 
-def add_objects(root: str,
+
+def add_objects(pdb: ProjectDB,
                 name: str,
                 fetched: Dict[str, ObjectData] = {},
                 fetch_map: Dict[str, Dict[str, str]] = {},
                 refresh: bool = False):
 
-    odb = load(project.object_db(root))
-    obj_dict: YamlDict = odb['objects']
+    obj_dict: YamlDict = pdb.edit(pdb.object_file)['objects']
 
     names = name.replace(', ', ',').split(',')
-    added = False
-    for n in names:
-        map_of_obj = fetch_map.get(n, {})
-        added = add_object(obj_dict, n, fetched=fetched, fetch_map=map_of_obj, refresh=refresh) or added
+    if merge_objects(obj_dict, names, fetched=fetched, fetch_map=fetch_map, refresh=refresh,
+                     index=pdb.object_index()):
+        pdb.modified(pdb.object_file)
+
+
+def sketch_paths(sketches: Iterable[SketchData]) -> Dict[str, List[SketchData]]:
+    """The sketches by their full and sub image paths."""
+
+    res: Dict[str, List[SketchData]] = {}
+    for s in sketches:
+        for path in dict.fromkeys([s.full] + s.sub):
+            res.setdefault(path, []).append(s)
+    return res
+
+
+def _strip_trailing_blank_lines(entry: YamlDict) -> bool:
+    """
+    Drop the blank lines after a list entry, unless there are comments
+    too, e.g. the one of the next entry. Returns if a comment is left.
+    """
+
+    keys = list(entry.keys())
+    comment = entry.ca.items.get(keys[-1]) if keys else None
+    if not comment or len(comment) < 3 or not comment[2]:
+        return False
+    if not comment[2].value.strip():
+        comment[2] = None
+        return False
+    return True
+
 
-    if added:
-        save(project.object_db(root), odb)
+def split_obs(pdb: ProjectDB) -> List[str]:
+    """
+    Move the observations of obs.yml to the yearly shards under db/obs,
+    by the year of the observation night. The comments of the entries
+    and the header of obs.yml are kept. obs.yml is deleted once the
+    shards are saved and found to hold the same observations. Returns
+    the shards written.
+    """
+
+    legacy = pdb.obs_file
+    if not Path(legacy).is_file():
+        print(f'No {legacy} to split')
+        return []
+
+    before = sorted(pdb.observations(), key=repr)
+
+    odb = pdb.edit(legacy)
+    Path(project.obs_shard_dir(pdb.root)).mkdir(parents=True, exist_ok=True)
+
+    written = []
+    for entry in odb['observations']:
+        _, year = common.obs_day_and_year(str(entry['date']))
+        file = project.obs_shard(pdb.root, year)
+        if pdb.exists(file):
+            shard = pdb.edit(file)
+        else:
+            shard = pdb.create(file, YamlDict())
+            shard['observations'] = YamlList()
+            shard.ca.comment = deepcopy(odb.ca.comment)
+
+        # separated by add_to_list(), not by the blank lines of the source,
+        # except when a comment is in between - that's kept as it was
+        obs_list = shard['observations']
+        if obs_list and _strip_trailing_blank_lines(obs_list[-1]):
+            obs_list.append(entry)
+        else:
+            add_to_list(obs_list, entry)
+        pdb.modified(file)
+        if file not in written:
+            written.append(file)
+
+    for file in written:
+        _strip_trailing_blank_lines(pdb.edit(file)['observations'][-1])
+    pdb.save()
+
+    shards = [f for f in obs_files(pdb.root) if f != legacy]
+    after = sorted([o for f in shards for o in _parse_observations(f)], key=repr)
+    if after != before:
+        raise ValueError(f'Observations of the shards differ from {legacy}, keeping it')
+
+    Path(legacy).unlink()
+    print(f'Deleted {legacy}')
+    return written
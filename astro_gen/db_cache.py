@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+from . import datatypes
+from . import project
+
+from dataclasses import asdict, dataclass, fields
+import hashlib
+import os
+from pathlib import Path
+import pickle
+from typing import Any, Optional
+
+
+# The dataclasses parsed from a db file, pickled under the cache folder
+# of the project. An entry is used only if the file still has the same
+# path, size, mtime and content hash, and the format and the dataclasses
+# are the same as when it was written. Anything else, including an
+# unreadable entry, is a miss: the file is parsed and the entry replaced.
+
+VERSION = 2
+
+
+@dataclass(frozen=True)
+class Key:
+    path: str
+    size: int
+    mtime: int
+    digest: str
+
+
+def _schema() -> str:
+    classes = [datatypes.SketchData, datatypes.ObsData, datatypes.ObjectData, datatypes.Object]
+    return ';'.join(f'{c.__name__}:{",".join(f.name for f in fields(c))}' for c in classes)
+
+
+def key(file: str) -> Key:
+
+    path = Path(file).resolve()
+    st = path.stat()
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    return Key(path=str(path), size=st.st_size, mtime=st.st_mtime_ns, digest=digest)
+
+
+def cache_file(root: str, file: str) -> str:
+
+    return str(Path(project.cache_dir(root)) / 'db' / f'{Path(file).name}.pickle')
+
+
+def load(root: str, key: Key) -> Optional[Any]:
+    """The cached data of a db file, None on a miss."""
+
+    try:
+        with open(cache_file(root, key.path), 'rb') as f:
+            header = pickle.load(f)
+            if header != {'version': VERSION, 'schema': _schema(), 'key': asdict(key)}:
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f'Invalid db cache of {key.path}, ignored: {e}')
+        return None
+
+
+def save(root: str, key: Key, data: Any):
+
+    file = Path(cache_file(root, key.path))
+    file.parent.mkdir(parents=True, exist_ok=True)
+
+    # written aside and renamed, not to leave a partial entry behind
+    tmp = file.with_name(f'{file.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump({'version': VERSION, 'schema': _schema(), 'key': asdict(key)}, f)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, file)
+    finally:
+        tmp.unlink(missing_ok=True)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+from . import common
+from . import project
+from .timeline import Timeline
+
+from typing import Dict
+import xml.etree.ElementTree as ET
+
+
+# Atom feed of the latest observations and sitemap of the generated pages.
+# Dates are taken from the observations feeding a page, never from the
+# clock, so an unchanged db results in byte-identical files.
+
+FEED_FILE = 'feed.xml'
+SITEMAP_FILE = 'sitemap.xml'
+FEED_SIZE = 20
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def site_url(base: str, page: str) -> str:
+    """Absolute url of a generated page."""
+    return f'{base.rstrip('/')}/{project.html_page(page)}'
+
+
+def _timestamp(day: str) -> str:
+    return f'{day}T00:00:00Z'
+
+
+def _to_xml(root: ET.Element) -> str:
+    ET.indent(root)
+    return '<?xml version="1.0" encoding="utf-8"?>\n' + ET.tostring(root, encoding='unicode') + '\n'
+
+
+def _sub(parent: ET.Element, tag: str, text: str = '', **attrib: str) -> ET.Element:
+    e = ET.SubElement(parent, tag, attrib)
+    if text:
+        e.text = text
+    return e
+
+
+def atom(latest: Timeline, base_url: str, meta: Dict) -> str:
+    """Feed of the `latest` observations, the timeline order is kept."""
+
+    feed = ET.Element('feed', xmlns=ATOM_NS)
+    _sub(feed, 'title', meta.get('site_title', 'Observations'))
+    _sub(feed, 'id', site_url(base_url, 'index.md'))
+    _sub(feed, 'link', href=site_url(base_url, 'index.md'))
+    _sub(feed, 'link', rel='self', href=f'{base_url.rstrip('/')}/{FEED_FILE}')
+    if latest:
+        _sub(feed, 'updated', _timestamp(max(e.day for e in latest)))
+    if meta.get('author'):
+        author = _sub(feed, 'author')
+        _sub(author, 'name', meta['author'])
+
+    for e in reversed(latest):
+        url = site_url(base_url, e.page)
+        entry = _sub(feed, 'entry')
+        _sub(entry, 'title', f'{common.pretty_name_str(e.obs.names)} on {e.day}')
+        _sub(entry, 'id', url)
+        _sub(entry, 'link', href=url)
+        _sub(entry, 'updated', _timestamp(e.day))
+        if e.obs.text.strip():
+            _sub(entry, 'summary', e.obs.text.strip())
+
+    return _to_xml(feed)
+
+
+def sitemap(lastmods: Dict[str, str], base_url: str) -> str:
+    """Sitemap of the pages given as {page: last modification day}."""
+
+    urlset = ET.Element('urlset', xmlns=SITEMAP_NS)
+    for page in sorted(lastmods.keys()):
+        url = _sub(urlset, 'url')
+        _sub(url, 'loc', site_url(base_url, page))
+        if lastmods[page]:
+            _sub(url, 'lastmod', lastmods[page])
+
+    return _to_xml(urlset)
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 
-from . import common
-from .datatypes import ObsData, Object
+from .datatypes import Object
 from . import constellations
 from . import pages
+from .timeline import Timeline
 
 from collections import OrderedDict
 from natsort import natsorted
@@ -11,17 +11,21 @@ from operator import itemgetter
 from typing import Callable, Dict, List, Iterable
 
 
-def raw_data(obs_db: List[ObsData], object_db: Dict[str, Object]) -> List:
+def raw_data(tl: Timeline,
+             object_db: Dict[str, Object],
+             object_pages: Dict[str, str] = {}) -> List:
 
     data = {}
 
-    sorted_obs = natsorted(obs_db, key=lambda x: x.date)
-    for obs in sorted_obs:
-        for n in obs.names:
+    # the timeline is sorted by date, the latest observation wins
+    for e in tl:
+        for n in e.obs.names:
             data[n] = {
                 'name': n,
                 'obj': object_db[n],
-                'row': pages.index_row(n, obs.names, common.obs_day(obs.date), object_db[n])
+                'row': pages.index_row(n, e.obs.names, e.day, object_db[n],
+                                       page=e.page,
+                                       object_page=object_pages.get(n, ''))
             }
 
     return natsorted(data.values(), key=itemgetter('name'))
@@ -73,10 +77,11 @@ def subpage(title: str, content: List[str]) -> List[str]:
 
 
 
-def index_content(obs_db: Dict, object_db: Dict[str, Object]) -> List[str]:
-
-    raw = raw_data(obs_db, object_db)
+def index_content(tl: Timeline,
+                  object_db: Dict[str, Object],
+                  object_pages: Dict[str, str] = {}) -> List[str]:
 
+    raw = raw_data(tl, object_db, object_pages)
 
     def by_constellation(obj: Object) -> str:
         if constellations.is_constellation(obj.constellation):
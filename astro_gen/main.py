@@ -2,18 +2,91 @@
 
 from . import add
 from . import check
+from . import db
+from . import preview
+from . import query
 from . import regen
+from . import shards
+from . import static_site
+from . import timing
+from . import watch
 
 import argparse
+from contextlib import redirect_stdout
+import json
+from pathlib import Path
 import sys
 
 
+def _write_summary(summary: dict, file: str):
+
+    text = json.dumps(summary, indent=2) + '\n'
+    if file == '-':
+        sys.stdout.write(text)
+    else:
+        Path(file).write_text(text, encoding='utf8')
+
+
+def _dry_run_cmd(args: argparse.Namespace):
+
+    dry_run = regen.DryRun(with_diffs=args.diff)
+    # a summary to stdout doesn't mix with the progress and the report
+    with redirect_stdout(sys.stderr if args.summary == '-' else sys.stdout):
+        regen.regen(project_root=args.project_root,
+                    dry_run=dry_run,
+                    prune=args.prune,
+                    shard=args.shard,
+                    merge_shards=args.merge_shards)
+        print('\n'.join(dry_run.report()))
+    if args.summary:
+        _write_summary(dry_run.summary(), args.summary)
+
+
 def _regen_cmd(args: argparse.Namespace):
-    regen.regen(project_root=args.project_root)
-    if not args.skip_checks and not check.check(root=args.project_root):
+
+    if args.dry_run:
+        _dry_run_cmd(args)
+        return
+
+    with timing.profiling(out_file=args.profile_out) as profiler:
+        regen.regen(project_root=args.project_root,
+                    prune=args.prune,
+                    shard=args.shard,
+                    merge_shards=args.merge_shards)
+        if args.html:
+            with timing.phase('html'):
+                written = static_site.build(root=args.project_root, workers=args.jobs)
+            print(f'{len(written)} HTML site files written')
+        if args.skip_checks or args.shard:
+            # the pages of a shard link to pages of the merge step
+            ok = True
+        else:
+            with timing.phase('checks'):
+                ok = check.check(root=args.project_root)
+
+    if args.profile:
+        print('\n'.join(profiler.report(slowest=args.profile_slowest)))
+    if args.profile_out:
+        print(f'Profile stats written to {args.profile_out}')
+    if not ok:
         sys.exit(1)
 
 
+def _watch_cmd(args: argparse.Namespace):
+
+    watch.watch(project_root=args.project_root,
+                run_checks=not args.skip_checks,
+                poll_interval=args.interval,
+                debounce=args.debounce)
+
+
+def _preview_cmd(args: argparse.Namespace):
+
+    preview.preview(project_root=args.project_root,
+                    port=args.port,
+                    run_checks=args.checks)
+
+
 def _add_cmd(args: argparse.Namespace):
 
     add.add(project_root=args.project_root,
@@ -28,6 +101,13 @@ def _add_cmd(args: argparse.Namespace):
             simple=args.simple)
 
 
+def _add_batch_cmd(args: argparse.Namespace):
+
+    add.add_batch(project_root=args.project_root,
+                  manifest=args.manifest,
+                  workers=args.jobs)
+
+
 def _fetch_cmd(args: argparse.Namespace):
 
     add.fetch_objects(project_root=args.project_root,
@@ -43,6 +123,43 @@ def _reproc_cmd(args: argparse.Namespace):
                sketch=args.sketch)
 
 
+def _split_obs_cmd(args: argparse.Namespace):
+
+    with db.ProjectDB(args.project_root) as pdb:
+        db.split_obs(pdb)
+
+
+def _query_cmd(args: argparse.Namespace):
+
+    # the progress of loading the dbs doesn't mix with the results
+    with redirect_stdout(sys.stderr):
+        file = query.mirror(args.project_root)
+
+    if args.sql:
+        columns, rows = query.execute(file, args.sql)
+    else:
+        filters = query.Filters(name=args.name,
+                                type=args.type,
+                                constellation=args.constellation,
+                                year=args.year,
+                                since=args.since,
+                                until=args.until,
+                                loc=args.loc,
+                                ap=args.ap,
+                                min_ap=args.min_ap,
+                                min_mag=args.min_mag,
+                                max_mag=args.max_mag)
+        columns, rows = query.observations(file, filters)
+    sys.stdout.write(query.format_rows(columns, rows, fmt=args.format))
+
+
+def _shard(spec: str) -> shards.Shard:
+    try:
+        return shards.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
 def arg_parser() -> argparse.ArgumentParser:
 
     parser = argparse.ArgumentParser()
@@ -53,8 +170,42 @@ def arg_parser() -> argparse.ArgumentParser:
 
     regen_parser = cmd.add_parser('regen', help='Regenerate pages')
     regen_parser.add_argument('-s', '--skip-checks', action='store_true', help='Skip checks after generation')
+    regen_parser.add_argument('-n', '--dry-run', action='store_true',
+                              help='Report the pages to be added or changed without writing anything')
+    regen_parser.add_argument('--diff', action='store_true', help='Print unified diffs of the pages with --dry-run')
+    regen_parser.add_argument('--summary', default='', metavar='FILE',
+                              help='Write the --dry-run result as JSON to FILE, \'-\' for stdout')
+    regen_parser.add_argument('--prune', action='store_true',
+                              help='Delete the pages not generated anymore, they are only reported by default')
+    shard_args = regen_parser.add_mutually_exclusive_group()
+    shard_args.add_argument('--shard', type=_shard, default=None, metavar='i/N',
+                            help='Generate the observation and object pages of the i-th of N shards only')
+    shard_args.add_argument('--merge-shards', action='store_true',
+                            help='Generate the other pages after all the shards are done')
+    regen_parser.add_argument('--html', action='store_true',
+                              help='Build the HTML site to docs/_site too, without Jekyll')
+    regen_parser.add_argument('-j', '--jobs', type=int, default=None,
+                              help='Number of processes rendering HTML, defaults to the number of CPUs')
+    regen_parser.add_argument('--profile', action='store_true', help='Print the time spent in each phase')
+    regen_parser.add_argument('--profile-slowest', type=int, default=10, metavar='N',
+                              help='Number of the slowest pages listed with --profile')
+    regen_parser.add_argument('--profile-out', default='', metavar='FILE',
+                              help='Write cProfile stats to FILE, see the pstats module')
     regen_parser.set_defaults(func=_regen_cmd)
 
+    watch_parser = cmd.add_parser('watch', help='Regenerate pages on changes of the db or static files')
+    watch_parser.add_argument('-s', '--skip-checks', action='store_true', help='Skip checks after generation')
+    watch_parser.add_argument('--interval', type=float, default=watch.POLL_INTERVAL,
+                              help='Polling interval in seconds')
+    watch_parser.add_argument('--debounce', type=float, default=watch.DEBOUNCE,
+                              help='Time in seconds to wait for further changes before regenerating')
+    watch_parser.set_defaults(func=_watch_cmd)
+
+    preview_parser = cmd.add_parser('preview', help='Serve the pages locally, regenerated on changes')
+    preview_parser.add_argument('-p', '--port', type=int, default=preview.DEFAULT_PORT)
+    preview_parser.add_argument('--checks', action='store_true', help='Check the links of the regenerated pages')
+    preview_parser.set_defaults(func=_preview_cmd)
+
     add_parser = cmd.add_parser('add', help='Add new observations')
     add_parser.add_argument('-i', '--img', help='Source image')
     add_parser.add_argument('-c', '--scan', help='Scanned image')
@@ -68,6 +219,12 @@ def arg_parser() -> argparse.ArgumentParser:
                             action='store_true')
     add_parser.set_defaults(func=_add_cmd)
 
+    add_batch_parser = cmd.add_parser('add-batch', help='Add the scans listed in a manifest at once')
+    add_batch_parser.add_argument('manifest', help='YAML file with a list of \'scans\', see the README')
+    add_batch_parser.add_argument('-j', '--jobs', type=int, default=None,
+                                  help='Number of processes processing images, defaults to the number of CPUs')
+    add_batch_parser.set_defaults(func=_add_batch_cmd)
+
     fetch_parser = cmd.add_parser('fetch', help='Fetch object data from astronomyapi.com')
     fetch_parser.add_argument('object')
     fetch_parser.add_argument('-n', '--name', help='Alias on astronomyapi.com', default='')
@@ -78,6 +235,27 @@ def arg_parser() -> argparse.ArgumentParser:
     reproc_parser.add_argument('-s', '--sketch', help='Sketch file', default='')
     reproc_parser.set_defaults(func=_reproc_cmd)
 
+    split_obs_parser = cmd.add_parser('split-obs',
+                                      help='Move the observations of db/obs.yml to yearly files under db/obs')
+    split_obs_parser.set_defaults(func=_split_obs_cmd)
+
+    query_parser = cmd.add_parser('query', help='List the observations matching the filters given')
+    query_parser.add_argument('-n', '--name', default='', help='Observed object')
+    query_parser.add_argument('-t', '--type', default='', help='Type of an observed object, e.g. \'double star\'')
+    query_parser.add_argument('-c', '--constellation', default='', help='Constellation of an observed object')
+    query_parser.add_argument('-y', '--year', default='', help='Year of the observation night')
+    query_parser.add_argument('--since', default='', metavar='YYYY-MM-DD', help='First observation night')
+    query_parser.add_argument('--until', default='', metavar='YYYY-MM-DD', help='Last observation night')
+    query_parser.add_argument('-l', '--loc', default='', help='Location')
+    query_parser.add_argument('--ap', type=int, default=None, help='Aperture in mm')
+    query_parser.add_argument('--min-ap', type=int, default=None, help='Minimum aperture in mm')
+    query_parser.add_argument('--min-mag', type=int, default=None, help='Minimum magnification')
+    query_parser.add_argument('--max-mag', type=int, default=None, help='Maximum magnification')
+    query_parser.add_argument('--sql', default='',
+                              help='Run an SQL query on the mirror of the dbs instead, see the query module')
+    query_parser.add_argument('-f', '--format', choices=query.FORMATS, default='table')
+    query_parser.set_defaults(func=_query_cmd)
+
     return parser
 
 
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+from . import project
+
+import json
+from pathlib import Path
+from typing import Iterable, List
+
+
+# The files generated by the last regen, relative to the site root.
+# A file listed there but not produced anymore, e.g. the page of a
+# renamed object, is an orphan. Orphans are also looked for in the
+# folders holding generated files only, to catch the ones left by
+# versions without a manifest.
+
+VERSION = 1
+GENERATED_DIRS = ['obs', 'objects', 'pages/log', 'search']
+
+
+def load(root: str) -> List[str]:
+
+    file = Path(project.manifest_file(root))
+    if not file.is_file():
+        return []
+    try:
+        data = json.loads(file.read_text(encoding='utf8'))
+    except ValueError:
+        print(f'Invalid manifest {file}, ignored')
+        return []
+    if not isinstance(data, dict) or data.get('version') != VERSION:
+        return []
+    return list(data.get('files', []))
+
+
+def save(root: str, files: Iterable[str]):
+
+    file = Path(project.manifest_file(root))
+    file.parent.mkdir(parents=True, exist_ok=True)
+    data = {'version': VERSION, 'files': sorted(set(files))}
+    file.write_text(json.dumps(data, indent=1) + '\n', encoding='utf8')
+
+
+def orphans(root: str, previous: Iterable[str], produced: Iterable[str]) -> List[str]:
+    """Existing files of the site generated before but not now."""
+
+    site_root = Path(project.site_root(root))
+    candidates = set(previous)
+    for d in GENERATED_DIRS:
+        candidates |= {f.relative_to(site_root).as_posix()
+                       for f in (site_root / d).rglob('*') if f.is_file()}
+
+    produced = set(produced)
+    return sorted(f for f in candidates if f not in produced and (site_root / f).is_file())
+
+
+def prune(root: str, files: Iterable[str]) -> List[str]:
+    """Delete files of the site and the folders left empty, returns the files deleted."""
+
+    site_root = Path(project.site_root(root))
+    deleted = []
+    for f in files:
+        path = (site_root / f).resolve()
+        assert path.relative_to(site_root)
+        if not path.is_file():
+            continue
+        path.unlink()
+        deleted.append(f)
+
+        parent = path.parent
+        while parent != site_root and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+    return deleted
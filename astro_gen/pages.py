@@ -6,7 +6,7 @@ from . import project
 
 from copy import copy
 import re
-from typing import Any, Callable, Dict, List, Union, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union, Tuple
 
 
 SEPARATOR = [
@@ -239,7 +239,8 @@ def obj_table(objects: List[Object]) -> List[str]:
 
 
 def tag_line(name: str,
-             object_data: Object) -> str:
+             object_data: Object,
+             object_url: str = '') -> str:
 
     def name_tags(n: str) -> List[str]:
         tags: List[str] = []
@@ -266,6 +267,9 @@ def tag_line(name: str,
         sd = emph(sd[0].upper() + sd[1:])
         tags.append(sd)
 
+    if object_url:
+        tags.append(common.md_link('All observations', object_url))
+
     return ' -- '.join(tags)
 
 
@@ -306,20 +310,24 @@ def note_block(text: str) -> List[str]:
     return [f'> {n}' for n in text.splitlines()] + ['']
 
 
-def footer(notes: str = '', links: Dict[str, str] = {}) -> List[str]:
-
-    md: List[str] = []
+def iter_footer(notes: str = '', links: Dict[str, str] = {}) -> Iterator[str]:
 
     if notes:
-        md += note_block(notes)
+        yield from note_block(notes)
 
     if links:
-        md += [subtitle('Links'), ''] + [f'- {common.md_link(k, v)}' for k, v in links.items()]
+        yield subtitle('Links')
+        yield ''
+        for k, v in links.items():
+            yield f'- {common.md_link(k, v)}'
 
-    return md
 
+def footer(notes: str = '', links: Dict[str, str] = {}) -> List[str]:
 
-def join(content: List[str]) -> str:
+    return list(iter_footer(notes=notes, links=links))
+
+
+def join(content: Iterable[str]) -> str:
 
     return '\n'.join(content) + '\n'
 
@@ -341,83 +349,137 @@ def table_of_contents(content: List[str], max_level: int = 2) -> List[str]:
     return res
 
 
+def iter_page(title: str,
+              content: Iterable[str],
+              notes: str = '',
+              nav_links: Dict[str, str] = {},
+              content_links: Dict[str, str] = {},
+              toc_level: int = 0,
+              doc_level: int = 1) -> Iterator[str]:
+    """
+    Lines of a page, `content` is consumed lazily unless
+    a table of contents is requested.
+    """
+
+    yield from header(title, links=nav_links, doc_level=doc_level)
+
+    if toc_level >= 2:
+        # the toc needs the whole content up front
+        content = list(content)
+        if len(content) > 100:
+            toc = table_of_contents(content=content, max_level=toc_level)
+            if len(toc) > 1:
+                yield from SEPARATOR + toc + SEPARATOR
+    yield from content
+    yield from iter_footer(notes=notes, links=content_links)
+
+
 def page(title: str,
-         content: List[str],
+         content: Iterable[str],
          notes: str = '',
          nav_links: Dict[str, str] = {},
          content_links: Dict[str, str] = {},
          toc_level: int = 0,
          doc_level: int = 1) -> str:
 
-    md = header(title, links=nav_links, doc_level=doc_level)
-
-    if toc_level >= 2 and len(content) > 100:
-        toc = table_of_contents(content=content, max_level=toc_level)
-        if len(toc) > 1:
-            md += SEPARATOR + toc + SEPARATOR
-    md += content
-    md += footer(notes=notes, links=content_links)
-
-    return join(md)
-
-
-def obs_body(title: str,
-             names: List[str],
-             img: str,
-             obs_tab: List[str],
-             text: str,
-             object_data: Dict[str, Object],
-             sketch_notes: str) -> List[str]:
-
-    md = [tag_line(n, object_data.get(n, Object())) + '  ' for n in names]
-    md += [
+    return join(iter_page(title=title,
+                          content=content,
+                          notes=notes,
+                          nav_links=nav_links,
+                          content_links=content_links,
+                          toc_level=toc_level,
+                          doc_level=doc_level))
+
+
+def iter_obs_body(title: str,
+                  names: List[str],
+                  img: str,
+                  obs_tab: List[str],
+                  text: str,
+                  object_data: Dict[str, Object],
+                  sketch_notes: str,
+                  object_urls: Dict[str, str] = {}) -> Iterator[str]:
+
+    for n in names:
+        yield tag_line(n, object_data.get(n, Object()), object_urls.get(n, '')) + '  '
+    yield from [
         '',
         common.md_image(title, f'{img}'),
         ''
     ]
 
     if text:
-        md += text.splitlines() + ['']
+        yield from text.splitlines() + ['']
 
-    md += obs_tab + ['']
+    yield from obs_tab + ['']
 
     if sketch_notes:
-        md += note_block(sketch_notes)
+        yield from note_block(sketch_notes)
 
     obj_tab = obj_table(list(object_data.values()))
     if obj_tab:
-        md += [
-            subtitle('Object data', level=4),
-            ''
-        ] + obj_tab
+        yield subtitle('Object data', level=4)
+        yield ''
+        yield from obj_tab
+        if len(obj_tab[-1]) > 0:
+            yield ''
 
-    if len(md[-1]) > 0:
-        md.append('')
 
-    return md
+def obs_body(title: str,
+             names: List[str],
+             img: str,
+             obs_tab: List[str],
+             text: str,
+             object_data: Dict[str, Object],
+             sketch_notes: str,
+             object_urls: Dict[str, str] = {}) -> List[str]:
+
+    return list(iter_obs_body(title=title,
+                              names=names,
+                              img=img,
+                              obs_tab=obs_tab,
+                              text=text,
+                              object_data=object_data,
+                              sketch_notes=sketch_notes,
+                              object_urls=object_urls))
+
 
+def _obs_url(names: Union[str, List[str]], date: str, page: str, doc_level: int) -> str:
+    if page:
+        return project.page_url(page, from_doc_level=doc_level)
+    return project.obs_page_url(names, date, from_doc_level=doc_level)
 
-def log_row(names: Union[str, List[str]], date: str, from_main: bool = False) -> List[str]:
+
+def log_row(names: Union[str, List[str]],
+            date: str,
+            from_main: bool = False,
+            page: str = '',
+            doc_level: int = 1) -> List[str]:
 
     pretty_name = common.pretty_name_str(names)
     date_prefix = date + ':'
-    doc_level = 0 if from_main else 1
-    url = project.obs_page_url(names, date, from_doc_level=doc_level)
+    if from_main:
+        doc_level = 0
+    url = _obs_url(names, date, page, doc_level)
     return [date_prefix, pretty_name, url, '']
 
 
 def index_row(obj_name: str,
               all_names: Union[str, List[str]],
               date: str,
-              obj_data: Object) -> List[str]:
+              obj_data: Object,
+              page: str = '',
+              object_page: str = '') -> List[str]:
 
     pretty_name: str = common.pretty_name(obj_name)
-    url = project.obs_page_url(all_names, date, from_doc_level=1)
-    desc = common.short_desc(obj_data)
-    return ['', pretty_name, url, f'- {desc}']
+    url = _obs_url(all_names, date, page, doc_level=1)
+    desc = f'- {common.short_desc(obj_data)}'
+    if object_page:
+        desc += ' -- ' + common.md_link('all observations', project.page_url(object_page, from_doc_level=1))
+    return ['', pretty_name, url, desc]
 
 
-def index_data(data: Union[List, Dict]) -> List[str]:
+def iter_index_data(data: Union[List, Dict]) -> Iterator[str]:
 
     def list_line(d: List) -> str:
         assert d
@@ -434,15 +496,48 @@ def index_data(data: Union[List, Dict]) -> List[str]:
 
     if isinstance(data, list):
         assert isinstance(data[0], list)
-        return [list_line(d) for d in data]
+        yield from map(list_line, data)
+        return
 
     assert isinstance(data, dict)
-    md: List[str] = []
     for k, v in data.items():
         assert isinstance(k, str)
-        md += [subtitle(k, level=4), ''] + index_data(v) + ['']
+        yield subtitle(k, level=4)
+        yield ''
+        yield from iter_index_data(v)
+        yield ''
+
 
-    return md
+def index_data(data: Union[List, Dict]) -> List[str]:
+
+    return list(iter_index_data(data))
+
+
+def iter_observation_page(obs_data: ObsData,
+                          img: str,
+                          notes: str = '',
+                          nav_links: Dict[str, str] = {},
+                          content_links: Dict[str, str] = {},
+                          object_data: Dict[str, Object] = {},
+                          object_pages: Dict[str, str] = {}) -> Iterator[str]:
+
+    title = common.pretty_name_str(obs_data.names)
+
+    o_table = obs_table(obs_data)
+
+    md = iter_obs_body(title=title,
+                       names=obs_data.names,
+                       img=img,
+                       obs_tab=o_table,
+                       text=obs_data.text,
+                       object_data=object_data,
+                       sketch_notes=notes,
+                       object_urls={k: project.page_url(v, from_doc_level=2) for k, v in object_pages.items()})
+    return iter_page(title=title,
+                     content=md,
+                     nav_links=nav_links,
+                     content_links=content_links,
+                     doc_level=2)
 
 
 def observation_page(obs_data: ObsData,
@@ -450,24 +545,55 @@ def observation_page(obs_data: ObsData,
                      notes: str = '',
                      nav_links: Dict[str, str] = {},
                      content_links: Dict[str, str] = {},
-                     object_data: Dict[str, Object] = {}) -> str:
+                     object_data: Dict[str, Object] = {},
+                     object_pages: Dict[str, str] = {}) -> str:
 
-    title = common.pretty_name_str(obs_data.names)
+    return join(iter_observation_page(obs_data=obs_data,
+                                      img=img,
+                                      notes=notes,
+                                      nav_links=nav_links,
+                                      content_links=content_links,
+                                      object_data=object_data,
+                                      object_pages=object_pages))
 
-    o_table = obs_table(obs_data)
 
-    md = obs_body(title=title,
-                  names=obs_data.names,
-                  img=img,
-                  obs_tab=o_table,
-                  text=obs_data.text,
-                  object_data=object_data,
-                  sketch_notes=notes)
-    return page(title=title,
-                content=md,
-                nav_links=nav_links,
-                content_links=content_links,
-                doc_level=2)
+def iter_object_page(name: str,
+                     object_data: Object,
+                     obs_log: List) -> Iterator[str]:
+
+    def content() -> Iterator[str]:
+        tags = tag_line(name, object_data)
+        if tags:
+            yield from [tags, '']
+
+        yield from obj_table([object_data])
+        yield from [subtitle('Observations'), '']
+        yield from iter_index_data(obs_log)
+        yield ''
+
+    return iter_page(title=common.pretty_name_str(name),
+                     content=content(),
+                     doc_level=1)
+
+
+def object_page(name: str,
+                object_data: Object,
+                obs_log: List) -> str:
+
+    return join(iter_object_page(name=name, object_data=object_data, obs_log=obs_log))
+
+
+def iter_index_page(title: str,
+                    data: Union[List, Dict],
+                    notes: str = '',
+                    links: Dict[str, str] = {}) -> Iterator[str]:
+
+    return iter_page(title=title,
+                     content=iter_index_data(data),
+                     notes=notes,
+                     content_links=links,
+                     toc_level=0,
+                     doc_level=1)
 
 
 def index_page(title: str,
@@ -475,9 +601,4 @@ def index_page(title: str,
                notes: str = '',
                links: Dict[str, str] = {}) -> str:
 
-    return page(title=title,
-                content=index_data(data),
-                notes=notes,
-                content_links=links,
-                toc_level=0,
-                doc_level=1)
+    return join(iter_index_page(title=title, data=data, notes=notes, links=links))
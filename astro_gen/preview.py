@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+from . import project
+from . import render
+from . import watch
+
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+
+# Local preview of the site without Jekyll: the markdown pages are
+# rendered to HTML on request and kept in memory, any other file of the
+# site is served as is. Pages rewritten by the watcher are dropped from
+# the cache, and a page changed behind our back is noticed by its mtime.
+
+DEFAULT_PORT = 8000
+
+
+class PageCache:
+
+    def __init__(self):
+        self._pages: Dict[str, Tuple[int, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, md_file: Path) -> bytes:
+
+        key = str(md_file)
+        mtime = md_file.stat().st_mtime_ns
+        with self._lock:
+            cached = self._pages.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        html = render.html_page(md_file.read_text(encoding='utf8')).encode('utf8')
+        with self._lock:
+            self._pages[key] = (mtime, html)
+        return html
+
+    def invalidate(self, files: List[str]):
+        with self._lock:
+            for f in files:
+                self._pages.pop(f, None)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+def markdown_of(site_root: Path, url_path: str) -> Optional[Path]:
+    """The markdown page rendered for an url path, if any."""
+
+    path = unquote(url_path).lstrip('/')
+    if not path or path.endswith('/'):
+        path += 'index.md'
+    elif path.endswith('.html'):
+        path = path.removesuffix('.html') + '.md'
+
+    if not path.endswith('.md'):
+        return None
+
+    md = (site_root / path).resolve()
+    if not md.is_relative_to(site_root) or not md.is_file():
+        return None
+    return md
+
+
+class Handler(SimpleHTTPRequestHandler):
+
+    def __init__(self, *args, cache: PageCache, **kwargs):
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        md = markdown_of(Path(self.directory).resolve(), urlsplit(self.path).path)
+        if md is None:
+            super().do_GET()
+            return
+
+        content = self.cache.get(md)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def server(project_root: str, cache: PageCache, host: str = 'localhost', port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+
+    handler = partial(Handler, cache=cache, directory=project.site_root(project_root))
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def preview(project_root: str,
+            port: int = DEFAULT_PORT,
+            run_checks: bool = False):
+
+    cache = PageCache()
+    httpd = server(project_root, cache, port=port)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    print(f'Serving on http://localhost:{httpd.server_address[1]}/')
+
+    site_root = Path(project.site_root(project_root))
+
+    def invalidate(written: List[str]):
+        cache.invalidate([str(site_root / w) for w in written])
+
+    try:
+        watch.watch(project_root, run_checks=run_checks, on_update=invalidate)
+    finally:
+        httpd.shutdown()
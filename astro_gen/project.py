@@ -18,6 +18,12 @@ def site_images(project_root: str) -> str:
     return str(p.resolve())
 
 
+def html_root(project_root: str) -> str:
+    """Output of `regen --html`, where Jekyll would build the site."""
+    p = Path(site_root(project_root)) / '_site'
+    return str(p.resolve())
+
+
 def sketch_db(root: str) -> str:
     p = Path(root) / 'db' / 'sketch.yml'
     return str(p.resolve())
@@ -28,6 +34,16 @@ def obs_db(root: str) -> str:
     return str(p.resolve())
 
 
+def obs_shard_dir(root: str) -> str:
+    p = Path(root) / 'db' / 'obs'
+    return str(p.resolve())
+
+
+def obs_shard(root: str, year: str) -> str:
+    p = Path(obs_shard_dir(root)) / f'{year}.yml'
+    return str(p.resolve())
+
+
 def object_db(root: str) -> str:
     p = Path(root) / 'db' / 'objects.yml'
     return str(p.resolve())
@@ -48,6 +64,28 @@ def meta_file(root: str) -> str:
     return str(p.resolve())
 
 
+def layout_file(root: str) -> str:
+    p = Path(root) / 'static' / 'layout.html'
+    return str(p.resolve())
+
+
+def cache_dir(root: str) -> str:
+    """Local state of the generator, not part of the site."""
+    p = Path(root) / '.cache'
+    return str(p.resolve())
+
+
+def query_db(root: str) -> str:
+    """SQLite mirror of the db files, see the query module."""
+    p = Path(cache_dir(root)) / 'db.sqlite'
+    return str(p.resolve())
+
+
+def manifest_file(root: str) -> str:
+    p = Path(cache_dir(root)) / 'manifest.json'
+    return str(p.resolve())
+
+
 # Url for generated links in observation pages
 
 
@@ -59,15 +97,35 @@ def scan_url(file: str) -> str:
     return f'../../scan/{file}'
 
 
-def obs_page_url(obj: Union[str, List[str]],
-                 date: str,
-                 from_doc_level: int) -> str:
+def page_url(page: str, from_doc_level: int) -> str:
+    """Url of a page given relative to the site root."""
     assert from_doc_level >= 0 and from_doc_level <= 2
 
-    url = _obs_url(f'{common.obs_year(date)}/{common.obs_page_name(obj, date)}')
+    return '../'*from_doc_level + page
+
+
+def html_page(page: str) -> str:
+    """The rendered html of a generated markdown page."""
+    return page.removesuffix('.md') + '.html'
+
 
-    return url.removeprefix('../'*(2 - from_doc_level))
+def obs_page(year: str, basename: str) -> str:
+    return f'obs/{year}/{basename}.md'
 
 
-def _obs_url(file: str) -> str:
-    return f'../../obs/{file}'
+def object_page(name: str) -> str:
+    return f'objects/{common.name_slug(name)}.md'
+
+
+def log_page(year: str, part: int = 0) -> str:
+    """Page of the observation log of a year, `part` counts from 0."""
+    suffix = f'-{part + 1}' if part > 0 else ''
+    return f'pages/log/{year}{suffix}.md'
+
+
+def obs_page_url(obj: Union[str, List[str]],
+                 date: str,
+                 from_doc_level: int) -> str:
+
+    page = obs_page(common.obs_year(date), common.file_basename(obj, date))
+    return page_url(page, from_doc_level)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+
+from . import common
+from . import db
+from . import db_cache
+from . import project
+from .datatypes import ObjectData
+
+import csv
+from dataclasses import asdict, dataclass, fields
+import io
+import json
+import os
+from pathlib import Path
+import sqlite3
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+
+# SQLite mirror of the db files under the cache folder of the project,
+# to answer questions over the observations without ad-hoc scripts. The
+# YAML files stay the source of truth: the mirror is rebuilt whenever
+# the fingerprint of the db files differs from the one it was built from.
+# Names, constellations and types are compared case-insensitively.
+
+VERSION = 1
+FORMATS = ['table', 'csv', 'json']
+
+_OBJECT_COLUMNS = ', '.join(f'{f.name} TEXT COLLATE NOCASE' for f in fields(ObjectData) if f.name != 'name')
+
+SCHEMA = f"""
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+
+CREATE TABLE observations (
+    id INTEGER PRIMARY KEY,
+    names TEXT,
+    img TEXT,
+    date TEXT,
+    day TEXT,
+    year TEXT,
+    loc TEXT,
+    nelm REAL,
+    seeing INTEGER,
+    ap INTEGER,
+    mag INTEGER,
+    fov TEXT,
+    text TEXT,
+    data TEXT
+);
+CREATE TABLE observed_objects (obs_id INTEGER REFERENCES observations(id), name TEXT COLLATE NOCASE);
+
+CREATE TABLE objects (name TEXT COLLATE NOCASE PRIMARY KEY, {_OBJECT_COLUMNS});
+CREATE TABLE components (object TEXT COLLATE NOCASE, key TEXT, name TEXT COLLATE NOCASE, {_OBJECT_COLUMNS});
+CREATE TABLE fetched (object TEXT COLLATE NOCASE, key TEXT, name TEXT COLLATE NOCASE, {_OBJECT_COLUMNS});
+
+CREATE TABLE sketches (full TEXT PRIMARY KEY, scan TEXT, notes TEXT);
+CREATE TABLE sketch_images (full TEXT REFERENCES sketches(full), img TEXT);
+
+CREATE INDEX observations_day ON observations(day);
+CREATE INDEX observed_objects_name ON observed_objects(name);
+CREATE INDEX observed_objects_obs ON observed_objects(obs_id);
+CREATE INDEX objects_constellation ON objects(constellation);
+CREATE INDEX objects_type ON objects(type);
+CREATE INDEX components_object ON components(object);
+CREATE INDEX fetched_object ON fetched(object);
+CREATE INDEX sketch_images_img ON sketch_images(img);
+"""
+
+RESULT_COLUMNS = ['day', 'names', 'loc', 'ap', 'mag', 'nelm', 'seeing', 'img']
+
+
+def db_files(root: str) -> List[str]:
+    """The db files mirrored, the existing ones."""
+
+    files = [project.sketch_db(root)] + db.obs_files(root) + [project.object_db(root)]
+    return [f for f in files if Path(f).is_file()]
+
+
+def fingerprint(root: str) -> str:
+    """Identifies the content of the db files and the mirror format."""
+
+    keys = [asdict(db_cache.key(f)) for f in db_files(root)]
+    return json.dumps({'version': VERSION, 'schema': SCHEMA, 'files': keys}, sort_keys=True)
+
+
+def _object_row(o: ObjectData) -> Tuple:
+    """The ObjectData fields of an object or a component, lists and maps as JSON."""
+
+    values = (getattr(o, f.name) for f in fields(ObjectData))
+    return tuple(json.dumps(v, default=str) if isinstance(v, (list, dict)) else v for v in values)
+
+
+def _insert_objects(con: sqlite3.Connection, pdb: db.ProjectDB):
+
+    n = len(fields(ObjectData))
+    objects: List[Tuple] = []
+    components: List[Tuple] = []
+    fetched: List[Tuple] = []
+    for name, obj in pdb.objects().items():
+        objects.append(_object_row(obj))
+        components += [(name, k) + _object_row(c) for k, c in obj.components.items()]
+        fetched += [(name, k) + _object_row(f) for k, f in obj.fetched.items()]
+
+    con.executemany(f'INSERT INTO objects VALUES ({", ".join("?" * n)})', objects)
+    con.executemany(f'INSERT INTO components VALUES ({", ".join("?" * (n + 2))})', components)
+    con.executemany(f'INSERT INTO fetched VALUES ({", ".join("?" * (n + 2))})', fetched)
+
+
+def build(root: str, file: str, stamp: str):
+    """Build the mirror into `file` from the db files of the project."""
+
+    print(f'Building query db {file} ...')
+
+    pdb = db.ProjectDB(root, read_only=True)
+    path = Path(file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # built aside and renamed, not to leave a partial mirror behind
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp.unlink(missing_ok=True)
+    try:
+        con = sqlite3.connect(tmp)
+        try:
+            con.executescript(SCHEMA)
+
+            for i, o in enumerate(pdb.observations()):
+                day, year = common.obs_day_and_year(o.date)
+                con.execute('INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                            (i, ', '.join(o.names), o.img, str(o.date), day, year, o.loc, o.nelm,
+                             o.seeing, o.ap, o.mag, str(o.fov), o.text, json.dumps(o.data, default=str)))
+                con.executemany('INSERT INTO observed_objects VALUES (?, ?)', [(i, n) for n in o.names])
+
+            _insert_objects(con, pdb)
+
+            for s in pdb.sketches():
+                con.execute('INSERT INTO sketches VALUES (?, ?, ?)', (s.full, s.scan, s.notes))
+                con.executemany('INSERT INTO sketch_images VALUES (?, ?)',
+                                [(s.full, img) for img in dict.fromkeys([s.full] + s.sub)])
+
+            con.execute('INSERT INTO meta VALUES (?, ?)', ('fingerprint', stamp))
+            con.commit()
+        finally:
+            con.close()
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _connect_read_only(file: str) -> sqlite3.Connection:
+    return sqlite3.connect(f'{Path(file).as_uri()}?mode=ro', uri=True)
+
+
+def _stamp_of(file: str) -> Optional[str]:
+    try:
+        con = _connect_read_only(file)
+        try:
+            row = con.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        finally:
+            con.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def mirror(root: str) -> str:
+    """The mirror of the db files, rebuilt when out of date."""
+
+    file = project.query_db(root)
+    stamp = fingerprint(root)
+    if not Path(file).is_file() or _stamp_of(file) != stamp:
+        build(root, file, stamp)
+    return file
+
+
+@dataclass
+class Filters:
+    """Conditions on the observations, all of the given ones apply."""
+    name: str = ''              # an observed object
+    type: str = ''              # of an observed object
+    constellation: str = ''     # of an observed object
+    year: str = ''              # of the observation night
+    since: str = ''             # first night, ISO date
+    until: str = ''             # last night, ISO date
+    loc: str = ''
+    ap: Optional[int] = None
+    min_ap: Optional[int] = None
+    min_mag: Optional[int] = None
+    max_mag: Optional[int] = None
+
+    def where(self) -> Tuple[str, List[Any]]:
+        """The SQL condition on the `observations` table and its parameters."""
+
+        conds: List[str] = []
+        params: List[Any] = []
+
+        def add(cond: str, value: Any):
+            conds.append(cond)
+            params.append(value)
+
+        obj_conds: List[str] = []
+        obj_params: List[Any] = []
+        for column, value in [('n.name', self.name), ('o.type', self.type), ('o.constellation', self.constellation)]:
+            if value:
+                obj_conds.append(f'{column} = ?')
+                obj_params.append(value)
+        if obj_conds:
+            conds.append('EXISTS (SELECT 1 FROM observed_objects n LEFT JOIN objects o ON o.name = n.name '
+                         f'WHERE n.obs_id = observations.id AND {" AND ".join(obj_conds)})')
+            params += obj_params
+
+        if self.year:
+            add('year = ?', self.year)
+        if self.since:
+            add('day >= ?', self.since)
+        if self.until:
+            add('day <= ?', self.until)
+        if self.loc:
+            add('loc = ?', self.loc)
+        if self.ap is not None:
+            add('ap = ?', self.ap)
+        if self.min_ap is not None:
+            add('ap >= ?', self.min_ap)
+        if self.min_mag is not None:
+            add('mag >= ?', self.min_mag)
+        if self.max_mag is not None:
+            add('mag <= ?', self.max_mag)
+
+        return (' AND '.join(conds) if conds else '1', params)
+
+
+def execute(file: str, sql: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[Tuple]]:
+    """Run a query on a mirror, returns the column names and the rows."""
+
+    con = _connect_read_only(file)
+    try:
+        cur = con.execute(sql, params)
+        columns = [d[0] for d in cur.description] if cur.description else []
+        return (columns, cur.fetchall())
+    finally:
+        con.close()
+
+
+def observations(file: str, filters: Filters) -> Tuple[List[str], List[Tuple]]:
+    """The observations of a mirror matching `filters`, by observation night."""
+
+    cond, params = filters.where()
+    sql = f'SELECT {", ".join(RESULT_COLUMNS)} FROM observations WHERE {cond} ORDER BY day, id'
+    return execute(file, sql, params)
+
+
+def format_rows(columns: List[str], rows: Iterable[Sequence[Any]], fmt: str = 'table') -> str:
+
+    assert fmt in FORMATS, f'Unknown format {fmt}'
+
+    rows = [['' if v is None else v for v in r] for r in rows]
+    if fmt == 'json':
+        return json.dumps([dict(zip(columns, r)) for r in rows], indent=1, ensure_ascii=False) + '\n'
+    if fmt == 'csv':
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(columns)
+        writer.writerows(rows)
+        return out.getvalue()
+
+    cells = [columns] + [[str(v) for v in r] for r in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(columns))]
+    lines = ['  '.join(c.ljust(w) for c, w in zip(r, widths)).rstrip() for r in cells]
+    lines.insert(1, '  '.join('-' * w for w in widths))
+    return '\n'.join(lines) + '\n'
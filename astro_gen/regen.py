@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 
 from . import common
-from .datatypes import ObsData, Object, SketchData
+from .datatypes import ObsData, ObsRecord, Object, SketchData
 from . import db
+from . import feed
 from . import index
+from . import manifest
 from . import pages
 from . import project
+from . import search
+from . import shards
+from .shards import Shard
+from . import timeline
+from .timeline import Timeline
+from . import timing
 
 from copy import copy
-from natsort import natsorted
+from dataclasses import dataclass, field
+import difflib
+import filecmp
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import yaml
 
 
@@ -21,17 +31,120 @@ def _load_meta(root: str) -> Dict:
         return data
 
 
-def _write_file(root: str, cat: str, name: str, content: str):
-    doc_root = Path(project.site_root(root))
-    out_path = doc_root / cat / name
-    assert out_path.resolve().relative_to(doc_root)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(content, encoding='utf8')
-
-
-def _sketch_of_obs(sketch_db: List[SketchData], obs: ObsData) -> SketchData:
-
-    res = [s for s in sketch_db if obs.img in s.sub or obs.img == s.full]
+@dataclass
+class DryRun:
+    """Pages a regen would write, collected instead of writing them."""
+
+    with_diffs: bool = False
+    files: Dict[str, str] = field(default_factory=dict)     # path: 'added', 'changed' or 'unchanged'
+    diffs: Dict[str, List[str]] = field(default_factory=dict)
+
+    def record(self, path: str, old: Optional[str], new: str):
+
+        if old is None:
+            self.files[path] = 'added'
+        elif old == new:
+            self.files[path] = 'unchanged'
+            return
+        else:
+            self.files[path] = 'changed'
+
+        if self.with_diffs:
+            self.diffs[path] = list(difflib.unified_diff((old or '').splitlines(keepends=True),
+                                                         new.splitlines(keepends=True),
+                                                         fromfile=f'a/{path}',
+                                                         tofile=f'b/{path}'))
+
+    def summary(self) -> Dict[str, List[str]]:
+
+        res: Dict[str, List[str]] = {'added': [], 'changed': [], 'unchanged': []}
+        for path in sorted(self.files.keys()):
+            res[self.files[path]].append(path)
+        return res
+
+    def report(self) -> List[str]:
+
+        summary = self.summary()
+        lines = [f'{k}: {len(v)}' for k, v in summary.items()]
+        lines += [f'A {p}' for p in summary['added']]
+        lines += [f'M {p}' for p in summary['changed']]
+        for p in sorted(self.diffs.keys()):
+            lines += [l.rstrip('\n') for l in self.diffs[p]]
+        return lines
+
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+@dataclass
+class Writer:
+    """
+    Writes the pages of a regen run into the site of the project, or
+    records them into `dry_run` if given. Keeps the files produced,
+    written or not.
+    """
+
+    root: str
+    dry_run: Optional[DryRun] = None
+    produced: List[str] = field(default_factory=list)
+
+    def _out_path(self, cat: str, name: str) -> Tuple[Path, str]:
+
+        doc_root = Path(project.site_root(self.root))
+        out_path = doc_root / cat / name
+        assert out_path.resolve().relative_to(doc_root)
+        rel = out_path.relative_to(doc_root).as_posix()
+        self.produced.append(rel)
+        return (out_path, rel)
+
+    def write_file(self, cat: str, name: str, content: str) -> str:
+        """
+        Write a page of the site, skipping it when the content is unchanged
+        to keep the untouched pages as they are. Returns the path of the page
+        relative to the site root if written, '' otherwise.
+        """
+        out_path, rel = self._out_path(cat, name)
+        if self.dry_run is not None:
+            old = out_path.read_text(encoding='utf8') if out_path.is_file() else None
+            self.dry_run.record(rel, old, content)
+            return '' if old == content else rel
+        if out_path.is_file() and out_path.read_text(encoding='utf8') == content:
+            return ''
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(content, encoding='utf8')
+        return rel
+
+    def write_lines(self, cat: str, name: str, lines: Iterable[str]) -> str:
+        """
+        Stream the lines of a page to a temp file next to it, then replace the
+        page unless the content is unchanged. Same as `write_file()` without
+        holding the whole page in memory.
+        """
+        if self.dry_run is not None:
+            return self.write_file(cat, name, ''.join(l + '\n' for l in lines))
+
+        out_path, rel = self._out_path(cat, name)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = out_path.with_name(out_path.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf8', buffering=WRITE_BUFFER_SIZE) as f:
+                for l in lines:
+                    f.write(l)
+                    f.write('\n')
+            if out_path.is_file() and filecmp.cmp(tmp_path, out_path, shallow=False):
+                tmp_path.unlink()
+                return ''
+            tmp_path.replace(out_path)
+            return rel
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+
+def _sketch_of_obs(sketch_paths: Dict[str, List[SketchData]], obs: ObsData) -> SketchData:
+
+    res = sketch_paths.get(obs.img, [])
 
     assert len(res) == 1
     return res[0]
@@ -42,41 +155,22 @@ def _object_data(object_db: Dict[str, Object], names: List[str]) -> Dict[str, Ob
     return {n: object_db[n] for n in names if n in object_db.keys()}
 
 
-def _all_observations_of(name: str, obs_db: List[ObsData]) -> List[ObsData]:
-
-    return [obs for obs in obs_db if name in obs.names]
-
-
-def _get_prev_next_obs_index(ref: ObsData, obs_list: List[ObsData]) -> Tuple[int, int]:
-
-    if len(obs_list) < 2:
-        return (-1, -1)
+def _other_obs_link_data(e: ObsRecord) -> Tuple[str, str, str]:
+    return (common.pretty_name_str(e.obs.names), e.day, project.page_url(e.page, from_doc_level=2))
 
-    i = obs_list.index(ref)
-    prev_i = i - 1 if i > 0 else -1
-    next_i = i + 1 if i < len(obs_list) - 1 else -1
-    return (prev_i, next_i)
 
-
-def _other_obs_link_data(obs: ObsData) -> Tuple[str, str, str]:
-    date = common.obs_day(obs.date)
-    return (common.pretty_name_str(obs.names), date, project.obs_page_url(obs.names, date, from_doc_level=2))
-
-
-def _get_nav_links(obs: ObsData,
-                   obs_db: List[ObsData]) -> Dict[str, str]:
+def _get_nav_links(entry: ObsRecord,
+                   obs_by_name: Dict[str, Timeline]) -> Dict[str, str]:
 
     other_obs_before = []
     other_obs_after = []
-    for n in obs.names:
-        other_obs = _all_observations_of(n, obs_db=obs_db)
-        if other_obs:
-            other_obs = natsorted(other_obs, key=lambda o: o.date)
-            prev_i, next_i = _get_prev_next_obs_index(obs, other_obs)
-            if prev_i >= 0:
-                other_obs_before.append(_other_obs_link_data(other_obs[prev_i]))
-            if next_i >= 0:
-                other_obs_after.append(_other_obs_link_data(other_obs[next_i]))
+    for n in entry.obs.names:
+        other_obs = obs_by_name.get(n, [])
+        i = timeline.position(other_obs, entry)
+        if i > 0:
+            other_obs_before.append(_other_obs_link_data(other_obs[i - 1]))
+        if 0 <= i < len(other_obs) - 1:
+            other_obs_after.append(_other_obs_link_data(other_obs[i + 1]))
 
     def other_links(other: List[Tuple], prefix: str) -> Dict[str, str]:
         return {f'{prefix}: {o[0]} on {o[1]}': o[2] for o in other}
@@ -92,9 +186,9 @@ def _get_nav_links(obs: ObsData,
 
 
 def _get_links_notes(obs: ObsData,
-                     sketch_db: List[SketchData]) -> Tuple[Dict, str]:
+                     sketch_paths: Dict[str, List[SketchData]]) -> Tuple[Dict, str]:
 
-    sketch = _sketch_of_obs(sketch_db, obs)
+    sketch = _sketch_of_obs(sketch_paths, obs)
     links = {
         'Full sketch': project.image_url(sketch.full)
     }
@@ -105,21 +199,32 @@ def _get_links_notes(obs: ObsData,
     return (links, sketch.notes)
 
 
-def _obs_page_file(obs: ObsData) -> str:
-    return project.obs_page_url(obs.names, common.obs_day(obs.date), from_doc_level=0)
+def _object_pages(obs_by_name: Dict[str, Timeline]) -> Dict[str, str]:
+
+    res: Dict[str, str] = {}
+    names_of_page: Dict[str, str] = {}
+    for n in obs_by_name.keys():
+        page = project.object_page(n)
+        if page in names_of_page:
+            raise ValueError(f'Duplicate object page {page}: {names_of_page[page]} and {n}')
+        names_of_page[page] = n
+        res[n] = page
+    return res
 
 
-def _generate_obs(root: str,
-                  obs: ObsData,
-                  obs_db: List[ObsData],
-                  sketch_db: List[SketchData],
+def _generate_obs(out: Writer,
+                  entry: ObsRecord,
+                  obs_by_name: Dict[str, Timeline],
+                  sketch_paths: Dict[str, List[SketchData]],
                   object_db: Dict[str, Object],
-                  meta: Dict):
+                  object_pages: Dict[str, str],
+                  meta: Dict) -> str:
 
+    obs = entry.obs
     img = project.image_url(obs.img)
 
-    nav_links = _get_nav_links(obs=obs, obs_db=obs_db)
-    content_links, notes = _get_links_notes(obs=obs, sketch_db=sketch_db)
+    nav_links = _get_nav_links(entry=entry, obs_by_name=obs_by_name)
+    content_links, notes = _get_links_notes(obs=obs, sketch_paths=sketch_paths)
     content_links.update(nav_links)
 
     data = copy(obs)
@@ -130,34 +235,155 @@ def _generate_obs(root: str,
                                      notes=notes,
                                      nav_links=nav_links,
                                      content_links=content_links,
-                                     object_data=_object_data(object_db, data.names))
+                                     object_data=_object_data(object_db, data.names),
+                                     object_pages={n: object_pages[n] for n in data.names})
+
+    return out.write_file('', entry.page, content)
+
+
+# Observations per page of the yearly log. The pages of a year are filled
+# in chronological order, so a new observation changes the last one only.
+LOG_PAGE_SIZE = 250
+
+
+def _obs_log_data(tl: Timeline, doc_level: int) -> List:
+
+    return [pages.log_row(e.obs.names, e.day, page=e.page, doc_level=doc_level) for e in reversed(tl)]
+
+
+def _obs_by_year(tl: Timeline) -> Dict[str, Timeline]:
+
+    res: Dict[str, Timeline] = {}
+    for e in tl:
+        res.setdefault(e.year, []).append(e)
+    return res
+
+
+def _log_parts(tl: Timeline) -> List[Timeline]:
+
+    return [tl[i:i + LOG_PAGE_SIZE] for i in range(0, len(tl), LOG_PAGE_SIZE)]
+
+
+def _generate_year_log(out: Writer, year: str, tl: Timeline) -> List[str]:
+
+    written = []
+    parts = _log_parts(tl)
+    for i, part in enumerate(parts):
+
+        title = f'Observations in {year}'
+        links = {'All observations': '../log.md'}
+        if len(parts) > 1:
+            title += f' ({i + 1}/{len(parts)})'
+            if i > 0:
+                links['Previous page'] = Path(project.log_page(year, i - 1)).name
+            if i < len(parts) - 1:
+                links['Next page'] = Path(project.log_page(year, i + 1)).name
+
+        content = pages.iter_page(title=title,
+                                  content=pages.iter_index_data(_obs_log_data(part, doc_level=2)),
+                                  nav_links=links,
+                                  doc_level=2)
+        written.append(out.write_lines('', project.log_page(year, i), content))
 
-    _write_file(root, '', _obs_page_file(data), content)
+    return [w for w in written if w]
 
 
-def _obs_log_data(obs_db: List[ObsData], from_main: bool) -> List:
+def _generate_obs_log(out: Writer, tl: Timeline) -> List[str]:
 
-    def row(date: str, names: List[str]) -> List[str]:
-        obs_day = common.obs_day(date)
-        return pages.log_row(names, obs_day, from_main)
+    written = []
+    by_year = _obs_by_year(tl)
+    for year, year_tl in by_year.items():
+        written += _generate_year_log(out, year, year_tl)
 
-    rev_sorted_data = sorted(((o.date, o.names) for o in obs_db), reverse=True)
-    return [row(o[0], o[1]) for o in rev_sorted_data]
+    def year_row(year: str, count: int) -> List[str]:
+        desc = f'- {count} observation' + ('s' if count > 1 else '')
+        return ['', year, project.log_page(year).removeprefix('pages/'), desc]
 
+    years = sorted(by_year.keys(), reverse=True)
+    content = pages.iter_index_page(title='All observations',
+                                    data=[year_row(y, len(by_year[y])) for y in years])
+    written.append(out.write_lines('pages', 'log.md', content))
 
-def _generate_obs_log(root: str, obs_db: List[ObsData]):
+    return [w for w in written if w]
 
-    content = pages.index_page(title='All observations',
-                               data=_obs_log_data(obs_db, from_main=False))
-    _write_file(root, 'pages', 'log.md', content)
 
+def _generate_objects(out: Writer,
+                      obs_by_name: Dict[str, Timeline],
+                      object_db: Dict[str, Object],
+                      object_pages: Dict[str, str],
+                      shard: Optional[Shard] = None) -> List[str]:
 
-def _generate_index(root: str, obs_db: List[ObsData], object_db: Dict[str, Object]):
+    written = []
+    for n, obs_tl in obs_by_name.items():
+        if shard and not shard.has(object_pages[n]):
+            continue
+        content = pages.iter_object_page(name=n,
+                                         object_data=object_db.get(n, Object(name=n)),
+                                         obs_log=_obs_log_data(obs_tl, doc_level=1))
+        written.append(out.write_lines('', object_pages[n], content))
 
-    content = pages.page(title='Index',
-                         content=index.index_content(obs_db=obs_db, object_db=object_db),
-                         toc_level=2)
-    _write_file(root, 'pages', 'obj_index.md', content)
+    return [w for w in written if w]
+
+
+def _generate_search(out: Writer,
+                     obs_by_name: Dict[str, Timeline],
+                     object_db: Dict[str, Object],
+                     object_pages: Dict[str, str]) -> List[str]:
+
+    written = [out.write_file(search.SEARCH_DIR, f'{key}.json', search.shard_json(entries))
+               for key, entries in search.shards(obs_by_name, object_db, object_pages).items()]
+    written.append(out.write_file('', search.SEARCH_PAGE, search.search_page()))
+
+    return [w for w in written if w]
+
+
+def _generate_index(out: Writer, tl: Timeline, object_db: Dict[str, Object], object_pages: Dict[str, str]) -> str:
+
+    content = pages.iter_page(title='Index',
+                              content=index.index_content(tl=tl, object_db=object_db, object_pages=object_pages),
+                              toc_level=2)
+    return out.write_lines('pages', 'obj_index.md', content)
+
+
+def _site_pages(tl: Timeline,
+                obs_by_name: Dict[str, Timeline],
+                object_pages: Dict[str, str]) -> Dict[str, str]:
+    """
+    The generated pages with the day of their latest observation,
+    derived from the db only to keep the sitemap reproducible.
+    """
+
+    def last_day(tl: Timeline) -> str:
+        return max((e.day for e in tl), default='')
+
+    res = {e.page: e.day for e in tl}
+    res.update({object_pages[n]: last_day(obs_tl) for n, obs_tl in obs_by_name.items()})
+    for year, year_tl in _obs_by_year(tl).items():
+        for i, part in enumerate(_log_parts(year_tl)):
+            res[project.log_page(year, i)] = last_day(part)
+
+    latest = last_day(tl)
+    for page in ['index.md', 'pages/log.md', 'pages/obj_index.md']:
+        res[page] = latest
+    return res
+
+
+def _generate_feed(out: Writer,
+                   tl: Timeline,
+                   obs_by_name: Dict[str, Timeline],
+                   object_pages: Dict[str, str],
+                   meta: Dict) -> List[str]:
+
+    base_url = meta.get('site_url', '')
+    if not base_url:
+        print('No site_url in meta, skipping feed and sitemap')
+        return []
+
+    written = [
+        out.write_file('', feed.FEED_FILE, feed.atom(timeline.latest(tl, feed.FEED_SIZE), base_url, meta)),
+        out.write_file('', feed.SITEMAP_FILE, feed.sitemap(_site_pages(tl, obs_by_name, object_pages), base_url))
+    ]
+    return [w for w in written if w]
 
 
 def _load_md(file: str) -> List[str]:
@@ -172,12 +398,12 @@ def _load_md(file: str) -> List[str]:
         return []
 
 
-def _generate_main(root: str, obs_db: List[ObsData]):
+def _generate_main(out: Writer, tl: Timeline) -> str:
 
-    latest_obs = _obs_log_data(obs_db, from_main=True)[:10]
+    latest_obs = _obs_log_data(timeline.latest(tl, 10), doc_level=0)
 
-    main_pre = _load_md(project.main_pre_file(root))
-    main_post = _load_md(project.main_post_file(root))
+    main_pre = _load_md(project.main_pre_file(out.root))
+    main_post = _load_md(project.main_post_file(out.root))
 
     content = main_pre + pages.SEPARATOR
 
@@ -190,46 +416,223 @@ def _generate_main(root: str, obs_db: List[ObsData]):
         f'## {common.md_link('All observations', 'pages/log.md')}',
         '',
         f'## {common.md_link('Index', 'pages/obj_index.md')}',
+        '',
+        f'## {common.md_link('Search', search.SEARCH_PAGE)}',
         ''
     ] + pages.SEPARATOR
 
     content += main_post
 
-    _write_file(root, '', 'index.md', pages.join(content))
-
-
-def _regen_from_dbs(root: str, obs_db: List[ObsData], sketch_db: List[SketchData], object_db: Dict[str, Object]):
-
-    print('Generating ...')
-
+    return out.write_file('', 'index.md', pages.join(content))
+
+
+def _update_manifest(root: str, produced: List[str], prune: bool, dry_run: bool = False):
+    """
+    Report or delete the files generated earlier but not now,
+    then record the files of this run. Only reported with `dry_run`.
+    """
+
+    stale = manifest.orphans(root, manifest.load(root), produced)
+    if stale and prune and not dry_run:
+        for f in manifest.prune(root, stale):
+            print(f'Deleted orphaned file {f}')
+        stale = []
+    elif stale:
+        print(f'{len(stale)} orphaned file(s), not generated anymore:')
+        print('\n'.join(f'- {f}' for f in stale))
+        if not prune:
+            print('Use --prune to delete them')
+
+    if not dry_run:
+        # keep the orphans listed until deleted
+        manifest.save(root, produced + stale)
+
+
+def _generate_items(out: Writer,
+                    tl: Timeline,
+                    obs_by_name: Dict[str, Timeline],
+                    sketch_paths: Dict[str, List[SketchData]],
+                    object_db: Dict[str, Object],
+                    object_pages: Dict[str, str],
+                    meta: Dict,
+                    shard: Optional[Shard] = None) -> List[str]:
+    """The pages of the observations and the objects, of a shard only if given."""
+
+    written = []
+    for e in tl:
+        if shard and not shard.has(e.page):
+            continue
+        with timing.phase('obs pages', item=e.page):
+            written.append(_generate_obs(out=out,
+                                         entry=e,
+                                         obs_by_name=obs_by_name,
+                                         sketch_paths=sketch_paths,
+                                         object_db=object_db,
+                                         object_pages=object_pages,
+                                         meta=meta))
+
+    with timing.phase('object pages'):
+        written += _generate_objects(out=out,
+                                     obs_by_name=obs_by_name,
+                                     object_db=object_db,
+                                     object_pages=object_pages,
+                                     shard=shard)
+
+    return [w for w in written if w]
+
+
+def _generate_aggregates(out: Writer,
+                         tl: Timeline,
+                         obs_by_name: Dict[str, Timeline],
+                         object_db: Dict[str, Object],
+                         object_pages: Dict[str, str],
+                         meta: Dict) -> List[str]:
+    """The pages built of all the observations."""
+
+    written = []
+    with timing.phase('search'):
+        written += _generate_search(out=out,
+                                    obs_by_name=obs_by_name,
+                                    object_db=object_db,
+                                    object_pages=object_pages)
+    with timing.phase('log'):
+        written += _generate_obs_log(out=out, tl=tl)
+    with timing.phase('index'):
+        written.append(_generate_index(out=out,
+                                       tl=tl,
+                                       object_db=object_db,
+                                       object_pages=object_pages))
+    with timing.phase('main'):
+        written.append(_generate_main(out=out, tl=tl))
+    with timing.phase('feed'):
+        written += _generate_feed(out=out,
+                                  tl=tl,
+                                  obs_by_name=obs_by_name,
+                                  object_pages=object_pages,
+                                  meta=meta)
+
+    return [w for w in written if w]
+
+
+def _merged_items(root: str, tl: Timeline, object_pages: Dict[str, str]) -> List[str]:
+    """The item pages written by the shards, all expected to be present."""
+
+    files = shards.load_all(root)
+    expected = [e.page for e in tl] + list(object_pages.values())
+    missing = sorted(set(expected) - set(files))
+    if missing:
+        raise ValueError(f'Pages missing from the shard manifests: {', '.join(missing)}')
+
+    site_root = Path(project.site_root(root))
+    missing = [f for f in files if not (site_root / f).is_file()]
+    if missing:
+        raise ValueError(f'Pages of the shards missing from {site_root}: {', '.join(missing)}')
+
+    return files
+
+
+def _regen_from_dbs(root: str,
+                    obs_db: List[ObsRecord],
+                    sketch_db: List[SketchData],
+                    object_db: Dict[str, Object],
+                    dry_run: Optional[DryRun] = None,
+                    prune: bool = False,
+                    shard: Optional[Shard] = None,
+                    merge_shards: bool = False) -> List[str]:
+    """
+    Generate the site, returns the files written relative to the site root.
+    With `dry_run` nothing is written, the files are recorded into it.
+    With `shard` only the item pages of the shard are generated, with
+    `merge_shards` only the aggregate pages over the output of the shards.
+    """
+
+    assert not (shard and merge_shards)
+
+    print('Generating ...' if not shard else f'Generating shard {shard} ...')
+
+    out = Writer(root=root, dry_run=dry_run)
     meta = _load_meta(root=root)
 
-    for obs in obs_db:
-        _generate_obs(root=root,
-                      obs=obs,
-                      obs_db=obs_db,
-                      sketch_db=sketch_db,
-                      object_db=object_db,
-                      meta=meta)
-
-    _generate_obs_log(root=root, obs_db=obs_db)
-    _generate_index(root=root,
-                    obs_db=obs_db,
-                    object_db=object_db)
-    _generate_main(root=root, obs_db=obs_db)
-
-
-def regen(project_root: str):
+    with timing.phase('timeline'):
+        tl = timeline.build(obs_db)
+        obs_by_name = timeline.by_name(tl)
+        object_pages = _object_pages(obs_by_name)
+
+    written = []
+    if merge_shards:
+        out.produced.extend(_merged_items(root, tl, object_pages))
+    else:
+        written += _generate_items(out=out,
+                                   tl=tl,
+                                   obs_by_name=obs_by_name,
+                                   sketch_paths=db.sketch_paths(sketch_db),
+                                   object_db=object_db,
+                                   object_pages=object_pages,
+                                   meta=meta,
+                                   shard=shard)
+
+    if shard:
+        if dry_run is None:
+            shards.save(root, shard, out.produced)
+        return written
+
+    written += _generate_aggregates(out=out,
+                                    tl=tl,
+                                    obs_by_name=obs_by_name,
+                                    object_db=object_db,
+                                    object_pages=object_pages,
+                                    meta=meta)
+
+    _update_manifest(root, out.produced, prune=prune, dry_run=dry_run is not None)
+
+    return written
+
+
+def regen_loaded(project_root: str,
+                 observations: List[ObsRecord],
+                 sketches: List[SketchData],
+                 objects: Dict[str, Object]) -> List[str]:
+    """Regenerate the site from dbs loaded already, e.g. kept by watch, returns the files written."""
+
+    return _regen_from_dbs(root=project_root,
+                           obs_db=observations,
+                           sketch_db=sketches,
+                           object_db=objects)
+
+
+def regen(project_root: str,
+          dry_run: Optional[DryRun] = None,
+          prune: bool = False,
+          shard: Optional[Shard] = None,
+          merge_shards: bool = False) -> List[str]:
+    """
+    Regenerate the site, returns the files written. With `dry_run`
+    nothing is written, the files are recorded into it. With `prune`
+    the files not generated anymore are deleted. See `_regen_from_dbs()`
+    for `shard` and `merge_shards`.
+    """
 
     print(f'Project path: {project_root}')
 
-    sketches = db.sketches(project_root)
-    observations = db.observations(project_root)
-    objects = db.objects(project_root)
-
-    _regen_from_dbs(root=project_root,
-                    obs_db=observations,
-                    sketch_db=sketches,
-                    object_db=objects)
-
-    print('Done')
+    pdb = db.ProjectDB(project_root, read_only=True)
+    with timing.phase('db.sketches'):
+        sketches = pdb.sketches()
+    with timing.phase('db.observation_records'):
+        observations = pdb.observation_records()
+    with timing.phase('db.objects'):
+        objects = pdb.objects()
+
+    written = _regen_from_dbs(root=project_root,
+                              obs_db=observations,
+                              sketch_db=sketches,
+                              object_db=objects,
+                              dry_run=dry_run,
+                              prune=prune,
+                              shard=shard,
+                              merge_shards=merge_shards)
+
+    if dry_run is not None:
+        print(f'Done, {len(written)} files would be written')
+    else:
+        print(f'Done, {len(written)} files written')
+    return written
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+from . import common
+from . import project
+
+from html import escape
+import re
+from typing import Iterable, List, Tuple
+
+
+# Rendering of the generated markdown to plain HTML, covering the subset
+# of markdown the pages are made of: headings, paragraphs, lists, tables,
+# quotes, rules, links, images and emphasis. Links to markdown pages are
+# pointed to their HTML counterparts, like Jekyll does.
+
+# Bumped on changes of the HTML output, to render all the pages again
+VERSION = 1
+
+LINK_PATTERN = re.compile(r'(?P<img>!?)\[(?P<text>[^\]]*)\]\((?P<url>[^)\s]+)(?:\s+"(?P<title>[^"]*)")?\)')
+STRONG_PATTERN = re.compile(r'\*\*(.+?)\*\*')
+EMPH_PATTERN = re.compile(r'(?<!\w)_(.+?)_(?!\w)')
+TABLE_RULE_PATTERN = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*)$')
+LIST_PATTERN = re.compile(r'^(\s*)- (.*)$')
+
+
+def page_url(url: str) -> str:
+    """Url of the HTML page for links to markdown pages."""
+
+    if url.startswith(('http://', 'https://', 'mailto:', '#')):
+        return url
+    path, sep, anchor = url.partition('#')
+    if path.endswith('.md'):
+        path = project.html_page(path)
+    return path + sep + anchor
+
+
+def _text(s: str) -> str:
+    s = escape(s, quote=False)
+    s = STRONG_PATTERN.sub(r'<strong>\1</strong>', s)
+    return EMPH_PATTERN.sub(r'<em>\1</em>', s)
+
+
+def inline(s: str) -> str:
+
+    res: List[str] = []
+    pos = 0
+    for m in LINK_PATTERN.finditer(s):
+        res.append(_text(s[pos:m.start()]))
+        title = f' title="{escape(m.group('title'))}"' if m.group('title') else ''
+        if m.group('img'):
+            res.append(f'<img src="{escape(m.group('url'))}" alt="{escape(m.group('text'))}"{title}>')
+        else:
+            res.append(f'<a href="{escape(page_url(m.group('url')))}"{title}>{_text(m.group('text'))}</a>')
+        pos = m.end()
+    res.append(_text(s[pos:]))
+    return ''.join(res)
+
+
+def heading_id(title: str) -> str:
+    return common.md_anchor(title).removeprefix('#')
+
+
+def _cells(row: str) -> List[str]:
+    return [c.strip() for c in row.strip().strip('|').split('|')]
+
+
+def _table(rows: List[str]) -> List[str]:
+
+    html = ['<table>', '<thead>', '<tr>']
+    html += [f'<th>{inline(c)}</th>' for c in _cells(rows[0])]
+    html += ['</tr>', '</thead>', '<tbody>']
+    for r in rows[2:]:
+        html += ['<tr>'] + [f'<td>{inline(c)}</td>' for c in _cells(r)] + ['</tr>']
+    return html + ['</tbody>', '</table>']
+
+
+def _paragraph(lines: List[str]) -> str:
+
+    parts = []
+    for l in lines:
+        hard_break = l.endswith('  ')
+        parts.append(inline(l.strip()) + ('<br>' if hard_break else ''))
+    return ' '.join(parts).removesuffix('<br>')
+
+
+def _list(items: List[Tuple[int, str]]) -> List[str]:
+
+    html: List[str] = []
+    indents: List[int] = []
+    for indent, text in items:
+        if not indents or indent > indents[-1]:
+            html.append('<ul>')
+            indents.append(indent)
+        else:
+            while len(indents) > 1 and indent < indents[-1]:
+                html.append('</li></ul>')
+                indents.pop()
+            html.append('</li>')
+        html.append(f'<li>{inline(text)}')
+    html += ['</li></ul>'] * len(indents)
+    return html
+
+
+def to_html(md: Iterable[str]) -> List[str]:
+    """HTML lines of the body of a markdown page."""
+
+    lines = list(md)
+    html: List[str] = []
+    i = 0
+    while i < len(lines):
+        l = lines[i]
+
+        if not l.strip():
+            i += 1
+            continue
+
+        if l.strip() == '---':
+            html.append('<hr>')
+            i += 1
+            continue
+
+        m = HEADING_PATTERN.match(l)
+        if m:
+            level = len(m.group(1))
+            title = m.group(2).strip()
+            html.append(f'<h{level} id="{escape(heading_id(title))}">{inline(title)}</h{level}>')
+            i += 1
+            continue
+
+        if l.startswith('>'):
+            block = []
+            while i < len(lines) and lines[i].startswith('>'):
+                block.append(lines[i][1:].strip())
+                i += 1
+            html.append(f'<blockquote><p>{_paragraph(block)}</p></blockquote>')
+            continue
+
+        if LIST_PATTERN.match(l):
+            items = []
+            while i < len(lines) and (m := LIST_PATTERN.match(lines[i])):
+                items.append((len(m.group(1)), m.group(2)))
+                i += 1
+            html += _list(items)
+            continue
+
+        if '|' in l and i + 1 < len(lines) and TABLE_RULE_PATTERN.match(lines[i + 1]):
+            rows = []
+            while i < len(lines) and '|' in lines[i]:
+                rows.append(lines[i])
+                i += 1
+            html += _table(rows)
+            continue
+
+        para = []
+        while i < len(lines) and lines[i].strip() and not _starts_block(lines, i):
+            para.append(lines[i])
+            i += 1
+        html.append(f'<p>{_paragraph(para)}</p>')
+
+    return html
+
+
+def _starts_block(lines: List[str], i: int) -> bool:
+
+    l = lines[i]
+    return l.strip() == '---' \
+        or HEADING_PATTERN.match(l) is not None \
+        or l.startswith('>') \
+        or LIST_PATTERN.match(l) is not None \
+        or ('|' in l and i + 1 < len(lines) and TABLE_RULE_PATTERN.match(lines[i + 1]) is not None)
+
+
+def title_of(md: Iterable[str]) -> str:
+
+    for l in md:
+        m = HEADING_PATTERN.match(l)
+        if m and len(m.group(1)) == 1:
+            return m.group(2).strip()
+    return ''
+
+
+HTML_TEMPLATE = '''\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{{ title }}</title>
+<style>
+body { max-width: 60em; margin: 1em auto; padding: 0 1em; font-family: sans-serif; line-height: 1.4; }
+img { max-width: 100%; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #ccc; padding: 0.2em 0.5em; text-align: left; }
+blockquote { margin-left: 0; padding-left: 1em; border-left: 3px solid #ccc; color: #555; }
+</style>
+</head>
+<body>
+{{ content }}
+</body>
+</html>
+'''
+
+
+def html_page(md: str, template: str = HTML_TEMPLATE) -> str:
+    """A complete HTML document of a markdown page."""
+
+    lines = md.splitlines()
+    return template.replace('{{ title }}', escape(title_of(lines))) \
+                   .replace('{{ content }}', '\n'.join(to_html(lines)))
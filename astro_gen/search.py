@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+from . import common
+from .datatypes import Object
+from . import project
+from .timeline import Timeline
+
+import json
+from natsort import natsorted
+from operator import itemgetter
+from typing import Dict, List
+import unicodedata
+
+
+# Client-side search: the observed objects are written as JSON shards
+# keyed by the first letter of their names, so the search page fetches
+# only the shard of the entered text. An object is added to the shard
+# of each of its names.
+
+SEARCH_DIR = 'search'
+SEARCH_PAGE = 'search.html'
+OTHER_SHARD = '_'
+
+
+def shard_key(term: str) -> str:
+    """
+    Shard of a search term: its first letter without accents
+    or OTHER_SHARD, keep in sync with `shardKey()` of the search page.
+    """
+
+    first = unicodedata.normalize('NFKD', term.strip().lower())[:1]
+    if first.isascii() and first.isalnum():
+        return first
+    return OTHER_SHARD
+
+
+def terms_of(entry: Dict) -> List[str]:
+    """All the names an entry can be found by."""
+
+    terms = [entry['name'], entry['title'], entry.get('trad', '')] \
+        + entry.get('aka', []) \
+        + entry.get('fetched', [])
+    return [t for t in dict.fromkeys(terms) if t]
+
+
+def entry(name: str, obj: Object, obs_tl: Timeline, object_page: str) -> Dict:
+
+    trad = common.traditional_name(name)
+    fetched = list(dict.fromkeys(list(obj.fetched.keys()) + [f.name for f in obj.fetched.values()]))
+    data = {
+        'name': name,
+        'title': common.pretty_name(name),
+        'trad': trad if trad != name else '',
+        'aka': list(obj.aka),
+        'fetched': [f for f in fetched if f and f != name],
+        'constellation': obj.constellation,
+        'type': obj.type,
+        'url': project.html_page(object_page),
+        'obs': [[e.day, project.html_page(e.page)] for e in reversed(obs_tl)]
+    }
+
+    # drop the empty fields to keep the shards compact
+    return {k: v for k, v in data.items() if v}
+
+
+def shards(obs_by_name: Dict[str, Timeline],
+           object_db: Dict[str, Object],
+           object_pages: Dict[str, str]) -> Dict[str, List[Dict]]:
+
+    res: Dict[str, List[Dict]] = {}
+    for n, obs_tl in obs_by_name.items():
+        e = entry(n, object_db.get(n, Object(name=n)), obs_tl, object_pages[n])
+        for key in dict.fromkeys(shard_key(t) for t in terms_of(e)):
+            res.setdefault(key, []).append(e)
+
+    return {k: natsorted(res[k], key=itemgetter('name')) for k in sorted(res.keys())}
+
+
+def shard_json(entries: List[Dict]) -> str:
+
+    return json.dumps(entries, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def search_page() -> str:
+
+    return SEARCH_PAGE_TEMPLATE.replace('SEARCH_DIR', SEARCH_DIR).replace('OTHER_SHARD', OTHER_SHARD)
+
+
+SEARCH_PAGE_TEMPLATE = '''\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Search</title>
+</head>
+<body>
+<h1>Search</h1>
+<p><a href="index.html">Main page</a> -- <a href="pages/obj_index.html">Index</a></p>
+<input id="query" type="search" placeholder="Object name, e.g. M31 or Polaris" autofocus>
+<ul id="results"></ul>
+<script>
+const shards = {};
+
+function norm(s) {
+  return s.trim().toLowerCase().normalize('NFKD').replace(/[\\u0300-\\u036f]/g, '');
+}
+
+function shardKey(q) {
+  const first = norm(q).charAt(0);
+  return /^[a-z0-9]$/.test(first) ? first : 'OTHER_SHARD';
+}
+
+async function shard(key) {
+  if (!(key in shards)) {
+    const resp = await fetch(`SEARCH_DIR/${key}.json`);
+    shards[key] = resp.ok ? await resp.json() : [];
+  }
+  return shards[key];
+}
+
+function terms(e) {
+  return [e.name, e.title, e.trad || ''].concat(e.aka || [], e.fetched || []);
+}
+
+function item(e) {
+  const li = document.createElement('li');
+  const a = document.createElement('a');
+  a.href = e.url;
+  a.textContent = e.title;
+  li.appendChild(a);
+  const desc = [e.type, e.constellation].filter(Boolean).join(' in ');
+  const last = e.obs && e.obs.length ? `, last observed on ${e.obs[0][0]}` : '';
+  li.appendChild(document.createTextNode(desc ? ` - ${desc}${last}` : last));
+  return li;
+}
+
+async function search() {
+  const q = norm(document.getElementById('query').value);
+  const results = document.getElementById('results');
+  if (!q) {
+    results.replaceChildren();
+    return;
+  }
+  const entries = await shard(shardKey(q));
+  const found = entries.filter(e => terms(e).some(t => norm(t).startsWith(q)));
+  results.replaceChildren(...found.map(item));
+}
+
+document.getElementById('query').addEventListener('input', search);
+</script>
+</body>
+</html>
+'''
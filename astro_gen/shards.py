@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+from . import project
+
+from dataclasses import dataclass
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List
+
+
+# Sharded generation, e.g. on several CI runners: each shard writes the
+# observation and object pages assigned to it by a stable hash of the
+# page path, and lists them in a shard manifest. The aggregate pages are
+# generated by a final merge step once the outputs of all the shards
+# are collected into the same project.
+
+VERSION = 1
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int      # 1-based
+    count: int
+
+    def __str__(self) -> str:
+        return f'{self.index}/{self.count}'
+
+    def has(self, page: str) -> bool:
+        return shard_of(page, self.count) == self.index
+
+
+def parse(spec: str) -> Shard:
+    """A shard given as 'i/N', 1 <= i <= N."""
+
+    index, sep, count = spec.partition('/')
+    if not sep or not index.strip().isdigit() or not count.strip().isdigit():
+        raise ValueError(f'Invalid shard {spec}, expected i/N')
+    shard = Shard(index=int(index), count=int(count))
+    if not 1 <= shard.index <= shard.count:
+        raise ValueError(f'Invalid shard {spec}, expected 1 <= i <= N')
+    return shard
+
+
+def shard_of(page: str, count: int) -> int:
+    """The shard of a page, stable across runs and platforms."""
+
+    digest = hashlib.sha1(page.encode('utf8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def _manifest_dir(root: str) -> Path:
+    return Path(project.cache_dir(root)) / 'shards'
+
+
+def manifest_file(root: str, shard: Shard) -> str:
+    return str(_manifest_dir(root) / f'{shard.index}-of-{shard.count}.json')
+
+
+def save(root: str, shard: Shard, files: List[str]):
+    """Save the manifest of a shard, dropping the ones of other shard counts."""
+
+    d = _manifest_dir(root)
+    d.mkdir(parents=True, exist_ok=True)
+    for f in d.glob('*.json'):
+        if not f.name.endswith(f'-of-{shard.count}.json'):
+            f.unlink()
+
+    data = {'version': VERSION, 'shard': shard.index, 'count': shard.count, 'files': sorted(set(files))}
+    Path(manifest_file(root, shard)).write_text(json.dumps(data, indent=1) + '\n', encoding='utf8')
+
+
+def load_all(root: str) -> List[str]:
+    """
+    The files of all the shards. Raises ValueError
+    unless the manifests of a complete run are present.
+    """
+
+    manifests: Dict[int, Dict] = {}
+    counts = set()
+    for f in sorted(_manifest_dir(root).glob('*.json')):
+        data = json.loads(f.read_text(encoding='utf8'))
+        if data.get('version') != VERSION:
+            raise ValueError(f'Shard manifest {f} of another version')
+        manifests[data['shard']] = data
+        counts.add(data['count'])
+
+    if not manifests:
+        raise ValueError(f'No shard manifests in {_manifest_dir(root)}')
+    if len(counts) > 1:
+        raise ValueError(f'Shard manifests of different shard counts {sorted(counts)} in {_manifest_dir(root)}')
+
+    count = counts.pop()
+    missing = [str(i) for i in range(1, count + 1) if i not in manifests]
+    if missing:
+        raise ValueError(f'Missing shard(s) {', '.join(missing)} of {count}')
+
+    return sorted(f for m in manifests.values() for f in m['files'])
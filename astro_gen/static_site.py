@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+from . import project
+from . import render
+
+from concurrent.futures import ProcessPoolExecutor
+import json
+from pathlib import Path
+import shutil
+from typing import List, Optional, Set, Tuple
+
+
+# Deployable HTML site built from the generated markdown, without Jekyll.
+# The pages are rendered in worker processes with the layout template
+# of the project; the images and the other files of the site are copied.
+# Outputs newer than their sources and the layout are left as they are,
+# unless the renderer changed since the last build. Outputs without a
+# source anymore, e.g. of a pruned page, are deleted.
+
+RENDER_CHUNK_SIZE = 32
+
+
+def layout(root: str) -> str:
+    """The layout template of the project or the default one."""
+
+    file = Path(project.layout_file(root))
+    if file.is_file():
+        return file.read_text(encoding='utf8')
+    return render.HTML_TEMPLATE
+
+
+def _stamp_file(root: str) -> Path:
+    return Path(project.cache_dir(root)) / 'html.json'
+
+
+def _is_rendered_by_current_version(root: str) -> bool:
+    try:
+        data = json.loads(_stamp_file(root).read_text(encoding='utf8'))
+    except (OSError, ValueError):
+        return False
+    return isinstance(data, dict) and data.get('version') == render.VERSION
+
+
+def _save_stamp(root: str):
+    file = _stamp_file(root)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(json.dumps({'version': render.VERSION}) + '\n', encoding='utf8')
+
+
+def _prune(html_root: Path, outputs: Set[Path]) -> List[str]:
+    """Delete the files of the site not in `outputs` and the folders left empty."""
+
+    deleted = []
+    for f in sorted(html_root.rglob('*'), reverse=True):
+        if f.is_file() and f not in outputs:
+            f.unlink()
+            deleted.append(f.relative_to(html_root).as_posix())
+        elif f.is_dir() and not any(f.iterdir()):
+            f.rmdir()
+    return sorted(deleted)
+
+
+def _is_published(rel: Path) -> bool:
+    # Jekyll convention: '_' and '.' prefixed entries are not published
+    return not any(p.startswith(('_', '.')) for p in rel.parts)
+
+
+def _is_up_to_date(src: Path, dst: Path, min_mtime: int = 0) -> bool:
+    if not dst.is_file():
+        return False
+    mtime = dst.stat().st_mtime_ns
+    return mtime >= src.stat().st_mtime_ns and mtime >= min_mtime
+
+
+def render_page(job: Tuple[str, str, str]) -> str:
+    """Render a markdown file to an HTML file, returns the HTML file if written."""
+
+    md_file, html_file, template = job
+    html = render.html_page(Path(md_file).read_text(encoding='utf8'), template=template)
+
+    out = Path(html_file)
+    if out.is_file() and out.read_text(encoding='utf8') == html:
+        # keep the file, but mark it as up to date with its source
+        out.touch()
+        return ''
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(html, encoding='utf8')
+    return html_file
+
+
+def build(root: str, workers: Optional[int] = None) -> List[str]:
+    """Build the HTML site, returns the files written relative to its root."""
+
+    site_root = Path(project.site_root(root))
+    html_root = Path(project.html_root(root))
+    template = layout(root)
+    layout_file = Path(project.layout_file(root))
+    layout_mtime = layout_file.stat().st_mtime_ns if layout_file.is_file() else 0
+    rerender = not _is_rendered_by_current_version(root)
+
+    print(f'Building HTML site to {html_root} ...')
+
+    jobs: List[Tuple[str, str, str]] = []
+    written: List[str] = []
+    outputs: Set[Path] = set()
+    for src in sorted(site_root.rglob('*')):
+        rel = src.relative_to(site_root)
+        if not src.is_file() or not _is_published(rel):
+            continue
+
+        if src.suffix == '.md':
+            dst = html_root / project.html_page(rel.as_posix())
+            if rerender or not _is_up_to_date(src, dst, min_mtime=layout_mtime):
+                jobs.append((str(src), str(dst), template))
+        else:
+            dst = html_root / rel
+            if not _is_up_to_date(src, dst):
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(src, dst)
+                written.append(str(dst))
+        outputs.add(dst)
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            written += [w for w in executor.map(render_page, jobs, chunksize=RENDER_CHUNK_SIZE) if w]
+
+    if html_root.is_dir():
+        for f in _prune(html_root, outputs):
+            print(f'Deleted {f} of the HTML site, no source anymore')
+    _save_stamp(root)
+
+    return sorted(Path(w).relative_to(html_root).as_posix() for w in written)
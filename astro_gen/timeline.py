@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+from .datatypes import ObsData, ObsRecord
+
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+
+# The observation records sorted by date, built once after loading
+# the db and shared by all the generated pages: the observation pages
+# for navigation, the log, the index and the main page.
+
+Timeline = List[ObsRecord]
+
+
+def _sort_key(obs: ObsData) -> Tuple[str, List[str]]:
+    return (obs.date, obs.names)
+
+
+def build(records: List[ObsRecord]) -> Timeline:
+
+    return sorted(records, key=lambda r: _sort_key(r.obs))
+
+
+def latest(tl: Timeline, count: int) -> Timeline:
+    """The last `count` entries of the timeline."""
+
+    if count <= 0:
+        return []
+    return tl[-count:]
+
+
+def by_name(tl: Timeline) -> Dict[str, Timeline]:
+    """Entries of each observed object, keeping the order of the timeline."""
+
+    res: Dict[str, Timeline] = {}
+    for e in tl:
+        for n in e.obs.names:
+            res.setdefault(n, []).append(e)
+    return res
+
+
+def position(tl: Timeline, entry: ObsRecord) -> int:
+    """Index of `entry` in the sorted `tl`, -1 if not present."""
+
+    key = _sort_key(entry.obs)
+    i = bisect_left(tl, key, key=lambda e: _sort_key(e.obs))
+    while i < len(tl) and _sort_key(tl[i].obs) == key:
+        if tl[i] is entry:
+            return i
+        i += 1
+    return -1
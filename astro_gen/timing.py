@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+from contextlib import contextmanager
+import cProfile
+from dataclasses import dataclass, field
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Wall time of the phases of a command. Phases are recorded by wrapping
+# them into `phase()`, which does nothing unless a profiler is activated
+# with `profiling()`.
+
+@dataclass
+class Phase:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    items: List[Tuple[float, str]] = field(default_factory=list)
+
+
+class Profiler:
+
+    def __init__(self):
+        self.phases: Dict[str, Phase] = {}
+
+    def add(self, name: str, seconds: float, item: str = ''):
+        p = self.phases.setdefault(name, Phase(name=name))
+        p.calls += 1
+        p.seconds += seconds
+        if item:
+            p.items.append((seconds, item))
+
+    def slowest(self, name: str, count: int) -> List[Tuple[float, str]]:
+        """The `count` slowest items of a phase, the slowest first."""
+
+        if name not in self.phases:
+            return []
+        return sorted(self.phases[name].items, key=lambda i: i[0], reverse=True)[:count]
+
+    def report(self, slowest: int = 10) -> List[str]:
+
+        lines = [f'{'Phase':<28}{'Calls':>8}{'Time [s]':>12}']
+        lines += [f'{p.name:<28}{p.calls:>8}{p.seconds:>12.3f}' for p in self.phases.values()]
+
+        for p in self.phases.values():
+            items = self.slowest(p.name, slowest)
+            if items and p.calls > 1:
+                lines += ['', f'Slowest of {p.name}:']
+                lines += [f'{s:>12.4f}  {i}' for s, i in items]
+
+        return lines
+
+
+_active: Optional[Profiler] = None
+
+
+@contextmanager
+def phase(name: str, item: str = '') -> Iterator[None]:
+    """
+    Record the wall time of the block as phase `name`. Calls with an
+    `item` are also listed among the slowest of the phase.
+    """
+
+    if _active is None:
+        yield
+        return
+
+    profiler = _active
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add(name, time.perf_counter() - start, item)
+
+
+@contextmanager
+def profiling(out_file: str = '') -> Iterator[Profiler]:
+    """
+    Activate a profiler for the block. With `out_file` set the block
+    is run under cProfile too, the stats are dumped to the file.
+    """
+
+    global _active
+    prev = _active
+    _active = Profiler()
+    cprof = cProfile.Profile() if out_file else None
+    try:
+        if cprof:
+            cprof.enable()
+        yield _active
+    finally:
+        if cprof:
+            cprof.disable()
+            cprof.dump_stats(out_file)
+        _active = prev
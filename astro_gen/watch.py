@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+from . import check
+from .datatypes import ObsRecord, Object, SketchData
+from . import db
+from . import project
+from . import regen
+
+from dataclasses import dataclass, field
+from pathlib import Path
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Regenerate the site when an input changes. The dbs are kept parsed
+# between the rounds, only a changed db file is loaded again. Static
+# files are read by regen on each round anyway.
+
+POLL_INTERVAL = 0.2     # seconds
+DEBOUNCE = 0.2          # seconds without a change before regenerating
+
+Stamp = Optional[Tuple[int, int]]   # mtime and size, None for a missing file
+
+
+@dataclass
+class State:
+    root: str
+    sketches: List[SketchData] = field(default_factory=list)
+    observations: List[ObsRecord] = field(default_factory=list)
+    objects: Dict[str, Object] = field(default_factory=dict)
+    stamps: Dict[str, Stamp] = field(default_factory=dict)
+
+
+def _db_loaders(root: str) -> Dict[str, Callable[[State], None]]:
+
+    def load_sketches(s: State):
+        s.sketches = db.sketches(root)
+
+    def load_observations(s: State):
+        s.observations = db.observation_records(root)
+
+    def load_objects(s: State):
+        s.objects = db.objects(root)
+
+    loaders: Dict[str, Callable[[State], None]] = {project.sketch_db(root): load_sketches}
+    # obs.yml and / or the yearly shards, reloaded together
+    loaders.update({f: load_observations for f in db.obs_files(root)})
+    loaders[project.object_db(root)] = load_objects
+    return loaders
+
+
+def watched_files(root: str) -> List[str]:
+
+    static_dir = Path(project.meta_file(root)).parent
+    static = sorted(str(f.resolve()) for f in static_dir.glob('*') if f.is_file())
+    return list(_db_loaders(root).keys()) + static
+
+
+def _stamp(file: str) -> Stamp:
+    try:
+        st = Path(file).stat()
+        return (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+def stamps(root: str) -> Dict[str, Stamp]:
+
+    return {f: _stamp(f) for f in watched_files(root)}
+
+
+def changed_files(before: Dict[str, Stamp], after: Dict[str, Stamp]) -> List[str]:
+
+    return [f for f in dict.fromkeys(list(before.keys()) + list(after.keys()))
+            if before.get(f) != after.get(f)]
+
+
+def reload(state: State, files: List[str]) -> bool:
+    """
+    Load the changed dbs again. On an error, e.g. a file saved in
+    the middle of an edit, the previous data is kept.
+    """
+
+    loaders = _db_loaders(state.root)
+    ok = True
+    for f in files:
+        if f not in loaders:
+            continue
+        try:
+            loaders[f](state)
+        except Exception as e:
+            print(f'Unable to load {f}, keeping the previous data: {e}')
+            ok = False
+    return ok
+
+
+def load(root: str) -> State:
+
+    state = State(root=root, stamps=stamps(root))
+    reload(state, list(_db_loaders(root).keys()))
+    return state
+
+
+def update(state: State, changed: List[str], run_checks: bool = True) -> List[str]:
+    """
+    Regenerate after `changed` inputs, returns the files written.
+    On an error the pages written so far are kept, nothing else.
+    """
+
+    if not reload(state, changed):
+        return []
+
+    # the dbs may be inconsistent in the middle of an edit, e.g. an
+    # observation added before its sketch, keep watching anyway
+    try:
+        written = regen.regen_loaded(project_root=state.root,
+                                     observations=state.observations,
+                                     sketches=state.sketches,
+                                     objects=state.objects)
+
+        site_root = Path(project.site_root(state.root))
+        pages = [str(site_root / w) for w in written if w.endswith('.md')]
+        if run_checks and pages and not check.check_pages(state.root, pages):
+            print('Broken links found')
+    except Exception as e:
+        print(f'Unable to regenerate, keeping the previous output: {e!r}')
+        return []
+
+    return written
+
+
+def wait_for_change(state: State, poll_interval: float, debounce: float) -> List[str]:
+    """
+    Block until the watched files change and stay unchanged
+    for `debounce` seconds, returns the changed files.
+    """
+
+    while True:
+        time.sleep(poll_interval)
+        current = stamps(state.root)
+        if current == state.stamps:
+            continue
+
+        # wait for the editor to finish saving
+        while True:
+            time.sleep(debounce)
+            settled = stamps(state.root)
+            if settled == current:
+                break
+            current = settled
+
+        changed = changed_files(state.stamps, current)
+        state.stamps = current
+        return changed
+
+
+def watch(project_root: str,
+          run_checks: bool = True,
+          poll_interval: float = POLL_INTERVAL,
+          debounce: float = DEBOUNCE,
+          on_update: Optional[Callable[[List[str]], None]] = None):
+    """Regenerate on changes until interrupted, `on_update` gets the files written."""
+
+    print(f'Project path: {project_root}')
+
+    state = load(project_root)
+    written = update(state, [], run_checks=run_checks)
+    if on_update:
+        on_update(written)
+
+    print('Watching for changes, press Ctrl+C to stop')
+    try:
+        while True:
+            changed = wait_for_change(state, poll_interval=poll_interval, debounce=debounce)
+            start = time.perf_counter()
+            print(f'Changed: {", ".join(changed)}')
+            written = update(state, changed, run_checks=run_checks)
+            if on_update:
+                on_update(written)
+            print(f'{len(written)} files written in {time.perf_counter() - start:.2f} s')
+    except KeyboardInterrupt:
+        print('Stopped')
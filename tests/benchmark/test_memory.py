@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Memory benchmark of the observation datatypes.
+
+A large archive keeps every observation of the db loaded as ObsData. The
+workload below is a synthetic db of observations with a limited set of
+distinct objects, locations and fields of view, each record with its own
+copy of the strings as parsed from YAML. The slotted ObsData created with
+interned strings is compared to a regular dataclass of the same fields,
+the retained memory is printed, run with `pytest -s` to see it.
+"""
+
+from astro_gen.datatypes import ObsData, create
+
+from dataclasses import MISSING, field, fields, is_dataclass, make_dataclass
+import sys
+from typing import Any, Dict, List
+
+
+WORKLOAD_SIZE = 100_000
+
+LOCATIONS = ['Backyard', 'Dark site, Zselic', 'Observatory of the club', 'Balcony', 'Lake Balaton']
+
+# ObsData as it was: a regular dataclass with a __dict__ per instance
+PlainObsData = make_dataclass(
+    'PlainObsData',
+    [(f.name, f.type, field(default_factory=f.default_factory) if f.default_factory is not MISSING
+      else field(default=f.default)) for f in fields(ObsData)])
+
+
+def parsed(s: str) -> str:
+    """A copy of a string of its own, as the YAML parser creates it."""
+    return s.encode('utf8').decode('utf8')
+
+
+def workload() -> List[Dict]:
+    """Records as parsed from a db file: the strings aren't shared."""
+
+    return [{'names': [f'M{i % 110 + 1}'] if i % 4 else [f'STF {i % 300}', f'NGC {i % 200}'],
+             'img': f'{2000 + i % 25}/obs-{i}.jpg',
+             'date': f'{2000 + i % 25}-{i % 12 + 1:02}-{i % 28 + 1:02} 22:{i % 60:02}',
+             'loc': parsed(LOCATIONS[i % len(LOCATIONS)]),
+             'nelm': 5.2,
+             'seeing': i % 10,
+             'ap': 150,
+             'mag': 120,
+             'fov': f'{0.5 + (i % 3) / 10:.1f}',
+             'text': ''}
+            for i in range(WORKLOAD_SIZE)]
+
+
+def retained_bytes(records: List[Any]) -> int:
+    """Size of the records and of all they refer to, the shared objects counted once."""
+
+    seen = set()
+    total = 0
+    todo = list(records)
+    while todo:
+        o = todo.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, list):
+            todo += o
+        elif isinstance(o, dict):
+            todo += list(o.keys()) + list(o.values())
+        elif is_dataclass(o):
+            if hasattr(o, '__dict__'):
+                todo.append(o.__dict__)
+            else:
+                todo += [getattr(o, f.name) for f in fields(o)]
+    return total
+
+
+def test_obs_data_memory():
+
+    plain = retained_bytes([PlainObsData(**r) for r in workload()])
+    compact = retained_bytes([create(ObsData, r) for r in workload()])
+
+    print(f'\n{WORKLOAD_SIZE} observations: {plain / 2**20:.1f} MiB as regular dataclasses, '
+          f'{compact / 2**20:.1f} MiB slotted with interned strings ({100 * (1 - compact / plain):.0f}% less)')
+
+    assert compact < plain * 0.8
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Micro-benchmark of the name transformations of common.
+
+A generated site calls these for each name of every observation page,
+log and index row, the workload below simulates a large archive with
+a limited set of distinct object names. The memoized functions are
+compared to their uncached implementation, the per-call cost is printed,
+run with `pytest -s` to see it.
+"""
+
+from astro_gen import common
+
+from itertools import cycle, islice
+from time import perf_counter
+from typing import Callable, List
+import pytest
+
+
+WORKLOAD_SIZE = 50_000
+
+DISTINCT_NAMES = \
+    [f'{g} {c}' for g in ['Alpha', 'Beta', 'Gamma', 'Delta', 'Epsilon', 'Mu', 'Sigma']
+     for c in ['UMi', 'Cyg', 'Lyr', 'And', 'Ori', 'Cas', 'Per']] \
+    + [f'M{i}' for i in range(1, 111)] \
+    + [f'STF {i}' for i in range(1, 200)] \
+    + [f'NGC {i}' for i in range(1, 200)]
+
+
+def workload() -> List[str]:
+    return list(islice(cycle(DISTINCT_NAMES), WORKLOAD_SIZE))
+
+
+def per_call_us(func: Callable, names: List[str]) -> float:
+
+    start = perf_counter()
+    for n in names:
+        func(n)
+    return (perf_counter() - start) / len(names) * 1e6
+
+
+@pytest.mark.parametrize('name', ['pretty_name', 'traditional_name', 'greek_name', 'name_slug'])
+def test_name_transform_per_call_cost(name: str):
+
+    names = workload()
+    cached = getattr(common, f'_{name}')
+    uncached = cached.__wrapped__
+
+    cached.cache_clear()
+    uncached_us = per_call_us(uncached, names)
+    cached_us = per_call_us(getattr(common, name), names)
+
+    print(f'\n{name}() of {WORKLOAD_SIZE} names: '
+          f'{uncached_us:.2f} us/call uncached, {cached_us:.2f} us/call cached')
+
+    # all distinct names fit into the cache
+    assert cached.cache_info().currsize == len(DISTINCT_NAMES)
+    assert cached_us < uncached_us
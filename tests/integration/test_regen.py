@@ -14,8 +14,10 @@ from astro_gen import main, project, check
 from pathlib import Path
 import pytest
 import re
-from shutil import copytree
+import json
+from shutil import copytree, rmtree
 from typing import Dict, List, Set, Tuple
+import xml.etree.ElementTree as ET
 
 
 EXAMPLE_DIR = Path(__file__).resolve().parents[2] / 'example'
@@ -27,7 +29,8 @@ NOT_COPIED = {'orig', '_site', '_layout', '.jekyll-cache', '__pycache__',
 
 # Generated content of ./example/docs - it's git-ignored but may be
 # present in a working tree, drop it to generate from scratch.
-GENERATED_DOC_ENTRIES = {'obs', 'pages', 'index.md'}
+GENERATED_DOC_ENTRIES = {'obs', 'objects', 'pages', 'search', 'index.md', 'search.html',
+                         'feed.xml', 'sitemap.xml'}
 
 # The pages expected for the observations of ./example/db/obs.yml.
 # Note the observation _day_ in the names: an observation after midnight
@@ -43,13 +46,24 @@ EXPECTED_OBS_PAGES = {
     '2026/saturn-2026-08-15.md',         # 2026-08-16 01:00
 }
 
-EXPECTED_PAGES = {'log.md', 'obj_index.md'}
+EXPECTED_OBJECT_PAGES = {
+    'alpha-umi.md',
+    'archimedes.md',
+    'c-2025-r3.md',
+    'c47.md',
+    'gassendi.md',
+    'm31.md',
+    'saturn.md',
+}
+
+EXPECTED_PAGES = {'log.md', 'log/2025.md', 'log/2026.md', 'obj_index.md'}
 
 MAIN_PAGE = 'index.md'
 
 EXPECTED_FILES = {MAIN_PAGE} \
     | {f'pages/{p}' for p in EXPECTED_PAGES} \
-    | {f'obs/{p}' for p in EXPECTED_OBS_PAGES}
+    | {f'obs/{p}' for p in EXPECTED_OBS_PAGES} \
+    | {f'objects/{p}' for p in EXPECTED_OBJECT_PAGES}
 
 
 # Fixtures
@@ -133,3 +147,98 @@ def test_pages_have_links(pages: Dict[str, str]):
 def test_all_links_resolve(generated_project: Path):
 
     assert check.check(str(generated_project))
+
+
+def test_search_index_is_generated(docs_root: Path):
+
+    assert (docs_root / 'search.html').is_file()
+
+    shards = {f.stem: json.loads(f.read_text(encoding='utf8'))
+              for f in (docs_root / 'search').glob('*.json')}
+    # by a name, an alias and a designation
+    assert 'Alpha UMi' in [e['name'] for e in shards['a']]
+    assert 'Alpha UMi' in [e['name'] for e in shards['p']]
+    assert 'M31' in [e['name'] for e in shards['n']]
+
+    for entries in shards.values():
+        for e in entries:
+            assert (docs_root / e['url']).with_suffix('.md').is_file()
+
+
+def test_feed_and_sitemap_are_generated(docs_root: Path):
+
+    feed = ET.parse(docs_root / 'feed.xml').getroot()
+    entries = feed.findall('{http://www.w3.org/2005/Atom}entry')
+    assert len(entries) == len(EXPECTED_OBS_PAGES)
+
+    sitemap = ET.parse(docs_root / 'sitemap.xml').getroot()
+    locs = [e.text for e in sitemap.iter('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')]
+    pages = {str(f.relative_to(docs_root).with_suffix('.html')) for f in docs_root.rglob('*.md')}
+    assert {loc.removeprefix('https://example.com/astro/') for loc in locs} == pages
+
+
+def test_dry_run_reports_no_change(generated_project: Path, docs_root: Path, capsys):
+
+    summary = generated_project / 'summary.json'
+    args = main.arg_parser().parse_args([str(generated_project), 'regen', '--dry-run',
+                                         '--summary', str(summary)])
+    args.func(args)
+
+    result = json.loads(summary.read_text(encoding='utf8'))
+    assert result['added'] == []
+    assert result['changed'] == []
+    assert {p for p in result['unchanged'] if p.startswith('obs/')} == \
+        {f'obs/{p}' for p in EXPECTED_OBS_PAGES}
+
+
+def test_dry_run_summary_to_stdout(generated_project: Path, docs_root: Path, capsys):
+
+    capsys.readouterr()
+    args = main.arg_parser().parse_args([str(generated_project), 'regen', '--dry-run', '--summary', '-'])
+    args.func(args)
+
+    out = capsys.readouterr()
+    assert json.loads(out.out)['changed'] == []
+    # the progress and the report are printed to stderr
+    assert 'added: 0' in out.err
+
+
+def test_regen_again_rewrites_nothing(generated_project: Path, docs_root: Path):
+
+    def mtimes() -> Dict[str, int]:
+        files = list(docs_root.rglob('*.md')) + [docs_root / 'feed.xml', docs_root / 'sitemap.xml']
+        return {str(f): f.stat().st_mtime_ns for f in files}
+
+    before = mtimes()
+
+    args = main.arg_parser().parse_args([str(generated_project), 'regen', '--skip-checks'])
+    args.func(args)
+
+    # nothing changed in the db, all pages are kept untouched
+    assert mtimes() == before
+
+
+def test_feed_and_sitemap_independent_of_the_cache(tmp_path: Path):
+
+    root = tmp_path / 'example'
+    copytree(EXAMPLE_DIR, root, ignore=_copy_filter)
+    args = main.arg_parser().parse_args([str(root), 'regen', '--skip-checks'])
+    args.func(args)
+
+    # the observation text is edited, not its date
+    obs_db = root / 'db' / 'obs.yml'
+    text = obs_db.read_text(encoding='utf8')
+    obs_db.write_text(text.replace('    fov: 0.6\n', '    fov: 0.6\n    text: Edited later\n', 1), encoding='utf8')
+    args.func(args)
+
+    def outputs() -> Dict[str, str]:
+        return {f: (root / 'docs' / f).read_text(encoding='utf8') for f in ['feed.xml', 'sitemap.xml']}
+
+    incremental = outputs()
+    # a fresh checkout, e.g. of a CI run
+    rmtree(root / '.cache')
+    for f in incremental:
+        (root / 'docs' / f).unlink()
+    args.func(args)
+
+    assert outputs() == incremental
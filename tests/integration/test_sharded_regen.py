@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+Integration test of 'regen --shard' and 'regen --merge-shards'.
+
+The example project is generated once in a single run and once in
+shards merged at the end, both outputs must be the same.
+"""
+
+from astro_gen import main, project, shards
+
+from filecmp import dircmp
+import json
+from pathlib import Path
+import pytest
+from shutil import copytree
+from typing import List
+
+
+EXAMPLE_DIR = Path(__file__).resolve().parents[2] / 'example'
+
+
+def _copy(tmp_path: Path, name: str) -> Path:
+    root = tmp_path / name
+    copytree(EXAMPLE_DIR / 'db', root / 'db')
+    copytree(EXAMPLE_DIR / 'static', root / 'static')
+    (root / 'docs').mkdir()
+    return root
+
+
+def _regen(root: Path, *args: str):
+    parsed = main.arg_parser().parse_args([str(root), 'regen', '--skip-checks'] + list(args))
+    parsed.func(parsed)
+
+
+def _diff_files(cmp: dircmp) -> List[str]:
+    res = cmp.left_only + cmp.right_only + cmp.diff_files + cmp.funny_files
+    for sub in cmp.subdirs.values():
+        res += _diff_files(sub)
+    return res
+
+
+@pytest.mark.parametrize('count', [1, 3])
+def test_sharded_regen_is_identical(tmp_path: Path, count: int):
+
+    single = _copy(tmp_path, 'single')
+    _regen(single)
+
+    sharded = _copy(tmp_path, 'sharded')
+    for i in range(1, count + 1):
+        _regen(sharded, '--shard', f'{i}/{count}')
+    _regen(sharded, '--merge-shards')
+
+    assert _diff_files(dircmp(project.site_root(str(single)), project.site_root(str(sharded)))) == []
+    assert Path(project.manifest_file(str(single))).read_text() == \
+        Path(project.manifest_file(str(sharded))).read_text()
+
+
+def test_merge_shards_missing_shard(tmp_path: Path):
+
+    root = _copy(tmp_path, 'sharded')
+    _regen(root, '--shard', '1/2')
+
+    with pytest.raises(ValueError, match='Missing shard'):
+        _regen(root, '--merge-shards')
+
+
+def test_merge_shards_missing_pages(tmp_path: Path):
+
+    root = _copy(tmp_path, 'sharded')
+    _regen(root, '--shard', '1/1')
+    next(Path(project.site_root(str(root))).glob('obs/*/*.md')).unlink()
+
+    with pytest.raises(ValueError, match='Pages of the shards missing'):
+        _regen(root, '--merge-shards')
+
+
+def test_shard_and_merge_are_exclusive(tmp_path: Path):
+
+    with pytest.raises(SystemExit):
+        main.arg_parser().parse_args([str(tmp_path), 'regen', '--shard', '1/2', '--merge-shards'])
+
+
+def test_dry_run_of_shard(tmp_path: Path):
+
+    root = _copy(tmp_path, 'sharded')
+    summary = tmp_path / 'summary.json'
+    _regen(root, '--dry-run', '--shard', '1/3', '--summary', str(summary))
+
+    # nothing written, not even the list of the shard
+    assert not list((root / 'docs').iterdir())
+    assert not Path(shards.manifest_file(str(root), shards.parse('1/3'))).exists()
+
+    _regen(root, '--shard', '1/3')
+    pages = {f.relative_to(root / 'docs').as_posix() for f in (root / 'docs').rglob('*.md')}
+    assert set(json.loads(summary.read_text(encoding='utf8'))['added']) == pages
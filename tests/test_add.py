@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 
 from astro_gen import add
+from astro_gen import db
 from astro_gen.datatypes import ObjectData
 from astro_gen.main import arg_parser
 
 from datetime import datetime
 from pathlib import Path
+from shlex import split as shsplit
 from typing import Dict
 import pytest
 
@@ -63,7 +65,17 @@ def cp_mock(mocker):
 
 @pytest.fixture
 def db_mock(mocker):
-    return mocker.patch.object(add, 'db')
+    mock = mocker.patch.object(add, 'db')
+    # manifests are still read from the disk
+    mock.load.side_effect = db.load
+    return mock
+
+
+@pytest.fixture
+def pdb_mock(db_mock):
+    """The ProjectDB opened by the command under test."""
+
+    return db_mock.ProjectDB.return_value.__enter__.return_value
 
 
 @pytest.fixture
@@ -246,25 +258,25 @@ def test_add_images_scan_of_other_year(project_root,
 
 # _add_sketch()
 
-def test_add_sketch(db_mock):
+def test_add_sketch(db_mock, pdb_mock):
 
     data = split_data(second_name='Alpha UMi',
                       second_img='alpha-umi-20260816.jpg',
                       scan='scanned.jpg')
 
-    add._add_sketch(root='/the/root', data=data, cmd='astro-gen /the/root add -i x.jpg')
+    add._add_sketch(pdb=pdb_mock, data=data, cmd='astro-gen /the/root add -i x.jpg')
 
     db_mock.add_sketch.assert_called_once_with(
-        root='/the/root',
+        pdb_mock,
         full='c47-na-20260816.jpg',
         scan='scanned.jpg',
         sub=['c47-20260816.jpg', 'alpha-umi-20260816.jpg'],
         cmd=['astro-gen /the/root add -i x.jpg'])
 
 
-def test_add_sketch_single_object(db_mock):
+def test_add_sketch_single_object(db_mock, pdb_mock):
 
-    add._add_sketch(root='/the/root', data=split_data(), cmd='the cmd')
+    add._add_sketch(pdb=pdb_mock, data=split_data(), cmd='the cmd')
 
     kwargs = db_mock.add_sketch.call_args.kwargs
     # the missing second image is dropped
@@ -273,21 +285,21 @@ def test_add_sketch_single_object(db_mock):
     assert kwargs['scan'] == ''
 
 
-def test_add_sketch_full_page(db_mock):
+def test_add_sketch_full_page(db_mock, pdb_mock):
 
     data = split_data()
     del data['first_img']
 
-    add._add_sketch(root='/the/root', data=data, cmd='the cmd')
+    add._add_sketch(pdb=pdb_mock, data=data, cmd='the cmd')
 
     assert db_mock.add_sketch.call_args.kwargs['sub'] == []
 
 
-def test_add_sketch_cmd_from_argv(db_mock, monkeypatch):
+def test_add_sketch_cmd_from_argv(db_mock, pdb_mock, monkeypatch):
 
     monkeypatch.setattr(add.sys, 'argv', ['astro-gen', '/the/root', 'add', '-i', 'the img.jpg'])
 
-    add._add_sketch(root='/the/root', data=split_data())
+    add._add_sketch(pdb=pdb_mock, data=split_data())
 
     # the invocation is recorded, quoted to stay reusable
     assert db_mock.add_sketch.call_args.kwargs['cmd'] == \
@@ -296,44 +308,44 @@ def test_add_sketch_cmd_from_argv(db_mock, monkeypatch):
 
 # _add_observation()
 
-def test_add_observation(db_mock):
+def test_add_observation(db_mock, pdb_mock):
 
-    add._add_observation(root='/the/root', name='C47', img_date=IMG_DATE)
+    add._add_observation(pdb=pdb_mock, name='C47', img_date=IMG_DATE)
 
     # the time of the image is dropped, the date is stored in ISO format
-    db_mock.add_obs.assert_called_once_with('/the/root',
+    db_mock.add_obs.assert_called_once_with(pdb_mock,
                                             name='C47',
                                             date='2026-08-16')
 
 
 # _add_objects()
 
-def test_add_objects(db_mock, fetch_mock):
+def test_add_objects(db_mock, pdb_mock, fetch_mock):
 
-    add._add_objects(root='/the/root', name='C47')
+    add._add_objects(pdb=pdb_mock, name='C47')
 
     fetch_mock.fetch.assert_called_once_with('C47',
                                              app_id='the-id',
                                              app_secret='the-secret')
-    db_mock.add_objects.assert_called_once_with('/the/root',
+    db_mock.add_objects.assert_called_once_with(pdb_mock,
                                                 name='C47',
                                                 fetched={'C47': ObjectData(name='C47')})
 
 
-def test_add_objects_without_credentials(db_mock, fetch_mock):
+def test_add_objects_without_credentials(db_mock, pdb_mock, fetch_mock):
 
     fetch_mock.astronomyapi_access.return_value = ('', '')
 
-    add._add_objects(root='/the/root', name='C47')
+    add._add_objects(pdb=pdb_mock, name='C47')
 
     # the object is added even without fetched data
     fetch_mock.fetch.assert_not_called()
-    db_mock.add_objects.assert_called_once_with('/the/root', name='C47', fetched={})
+    db_mock.add_objects.assert_called_once_with(pdb_mock, name='C47', fetched={})
 
 
 # add()
 
-def test_add(project_root, split_mock, db_mock, fetch_mock):
+def test_add(project_root, split_mock, db_mock, pdb_mock, fetch_mock):
 
     add.add(project_root=project_root,
             img='./orig/cluster.jpg',
@@ -342,8 +354,8 @@ def test_add(project_root, split_mock, db_mock, fetch_mock):
 
     split_mock.assert_called_once()
     db_mock.add_sketch.assert_called_once()
-    db_mock.add_obs.assert_called_once_with(project_root, name='C47', date='2026-08-16')
-    db_mock.add_objects.assert_called_once_with(project_root,
+    db_mock.add_obs.assert_called_once_with(pdb_mock, name='C47', date='2026-08-16')
+    db_mock.add_objects.assert_called_once_with(pdb_mock,
                                                 name='C47',
                                                 fetched={'C47': ObjectData(name='C47')})
 
@@ -358,6 +370,8 @@ def test_add_two_objects(project_root, split_mock, db_mock, fetch_mock):
 
     # a single sketch with an observation of both objects
     db_mock.add_sketch.assert_called_once()
+    # all the changes go through the same db, saved once
+    db_mock.ProjectDB.assert_called_once_with(project_root)
     assert [c.kwargs['name'] for c in db_mock.add_obs.call_args_list] == ['C47', 'Alpha UMi']
     assert [c.kwargs['name'] for c in db_mock.add_objects.call_args_list] == ['C47', 'Alpha UMi']
 
@@ -372,6 +386,138 @@ def test_add_no_objects(project_root, split_mock, db_mock, fetch_mock):
     db_mock.add_objects.assert_not_called()
 
 
+# load_batch()
+
+BATCH = """\
+scans:
+  - img: orig/cluster.jpg
+    scan: orig/cluster-scan.jpg
+    x_offset: 10
+    scale: 0.5
+    objects: [C47, Alpha UMi]
+  - img: orig/galaxy.jpg
+    objects: M31
+"""
+
+
+@pytest.fixture
+def batch_file(tmp_path) -> str:
+    p = tmp_path / 'batch' / 'batch.yml'
+    p.parent.mkdir()
+    p.write_text(BATCH)
+    return str(p)
+
+
+def test_load_batch(batch_file):
+
+    items = add.load_batch(batch_file)
+    base = Path(batch_file).parent.resolve()
+
+    # paths are relative to the manifest
+    assert items[0] == add.BatchItem(img=str(base / 'orig/cluster.jpg'),
+                                     scan=str(base / 'orig/cluster-scan.jpg'),
+                                     x_offset=10,
+                                     scale=0.5,
+                                     objects=['C47', 'Alpha UMi'])
+    # a single object is taken as a list
+    assert items[1] == add.BatchItem(img=str(base / 'orig/galaxy.jpg'), objects=['M31'])
+
+
+@pytest.mark.parametrize('content, error', [
+    ('- img: a.jpg\n', 'No list of \'scans\''),
+    ('scans:\n  - scan: a.jpg\n', 'Scan #1 of .* has no \'img\''),
+    ('scans:\n  - img: a.jpg\n    x: 1\n', 'unknown keys x'),
+    ('scans:\n  - img: a.jpg\n    objects: [A, B, C]\n', 'more than two objects'),
+])
+def test_load_batch_invalid(content, error, batch_file):
+
+    Path(batch_file).write_text(content)
+    with pytest.raises(ValueError, match=error):
+        add.load_batch(batch_file)
+
+
+# _add_cmd_line()
+
+def test_add_cmd_line(batch_file):
+
+    item = add.load_batch(batch_file)[0]
+    cmd = add._add_cmd_line('/the/root', item)
+
+    # replayable by reproc()
+    assert ' add ' in cmd
+    args = arg_parser().parse_args(shsplit(cmd)[1:])
+    assert args.img == item.img
+    assert args.scan == item.scan
+    assert args.x_offset == 10
+    assert args.scale == 0.5
+    assert args.first_object == 'C47'
+    assert args.second_object == 'Alpha UMi'
+
+
+# _batch_groups()
+
+def test_batch_groups():
+
+    items = [add.BatchItem(img='a.jpg', objects=['C47', 'Alpha UMi']),
+             add.BatchItem(img='b.jpg', objects=['M31']),
+             add.BatchItem(img='c.jpg', objects=['alpha umi']),
+             add.BatchItem(img='d.jpg', objects=['M32'], scan='x/scan.jpg'),
+             add.BatchItem(img='e.jpg', objects=['M33'], scan='y/scan.jpg')]
+
+    # sharing an object or a scan name, the file names may clash
+    assert add._batch_groups(items) == [[0, 2], [1], [3, 4]]
+
+
+# add_batch()
+
+def test_add_batch(project_root, batch_file, split_mock, cp_mock, db_mock, pdb_mock, fetch_mock):
+
+    split_mock.side_effect = [split_data(second_name='Alpha UMi', cropped_img='a.jpg'),
+                              split_data(first_name='M31', cropped_img='b.jpg')]
+
+    add.add_batch(project_root=project_root, manifest=batch_file, workers=1)
+
+    assert [c.kwargs['first_object'] for c in split_mock.call_args_list] == ['C47', 'M31']
+    assert [c.kwargs['second_object'] for c in split_mock.call_args_list] == ['Alpha UMi', '']
+
+    # a single transaction
+    db_mock.ProjectDB.assert_called_once_with(project_root)
+    assert [c.kwargs['full'] for c in db_mock.add_sketch.call_args_list] == ['a.jpg', 'b.jpg']
+    assert [c.kwargs['name'] for c in db_mock.add_obs.call_args_list] == ['C47', 'Alpha UMi', 'M31']
+    # the objects merged at once
+    db_mock.add_objects.assert_called_once_with(pdb_mock,
+                                                name='C47, Alpha UMi, M31',
+                                                fetched={n: ObjectData(name=n) for n in ['C47', 'Alpha UMi', 'M31']})
+    # fetched once per object
+    assert sorted(c.args[0] for c in fetch_mock.fetch.call_args_list) == ['Alpha UMi', 'C47', 'M31']
+
+
+def test_add_batch_without_objects(project_root, tmp_path, split_mock, cp_mock, db_mock, pdb_mock, fetch_mock):
+
+    manifest = tmp_path / 'batch.yml'
+    manifest.write_text('scans:\n  - img: orig/nebula.jpg\n')
+    split_mock.side_effect = [split_data(first_name='', cropped_img='a.jpg')]
+
+    add.add_batch(project_root=project_root, manifest=str(manifest), workers=1)
+
+    assert [c.kwargs['full'] for c in db_mock.add_sketch.call_args_list] == ['a.jpg']
+    db_mock.add_obs.assert_not_called()
+    # no object with an empty name
+    db_mock.add_objects.assert_not_called()
+    fetch_mock.fetch.assert_not_called()
+
+
+def test_add_batch_failed_image(project_root, batch_file, split_mock, db_mock, fetch_mock):
+
+    split_mock.side_effect = [split_data(), FileNotFoundError('orig/galaxy.jpg')]
+
+    with pytest.raises(FileNotFoundError):
+        add.add_batch(project_root=project_root, manifest=batch_file, workers=1)
+
+    # nothing is added
+    db_mock.ProjectDB.assert_not_called()
+
+
 # fetch_astronomyapi_on_demand()
 
 def test_fetch_astronomyapi_on_demand(fetch_mock):
@@ -409,14 +555,14 @@ def test_fetch_astronomyapi_on_demand_without_credentials(access, fetch_mock):
 
 # fetch_objects()
 
-def test_fetch_objects(db_mock, fetch_mock):
+def test_fetch_objects(db_mock, pdb_mock, fetch_mock):
 
     add.fetch_objects(project_root='/the/root', obj='C47')
 
     fetch_mock.fetch.assert_called_once_with('C47',
                                              app_id='the-id',
                                              app_secret='the-secret')
-    db_mock.add_objects.assert_called_once_with(root='/the/root',
+    db_mock.add_objects.assert_called_once_with(pdb_mock,
                                                 name='C47',
                                                 fetched={'C47': ObjectData(name='C47')},
                                                 fetch_map={'C47': {'C47': 'C47'}},
@@ -483,11 +629,11 @@ def sketch_entry(full: str = 'c47-na-20260816.jpg', **overrides) -> Dict:
 
 
 @pytest.fixture
-def sketches_mock(db_mock):
+def sketches_mock(pdb_mock):
     """Return a single reprocessable sketch by default."""
 
-    db_mock.sketches_raw.return_value = [sketch_entry()]
-    return db_mock.sketches_raw
+    pdb_mock.sketches_raw.return_value = [sketch_entry()]
+    return pdb_mock.sketches_raw
 
 
 def test_reproc(project_root, sketches_mock, split_mock, db_mock):
@@ -204,6 +204,25 @@ def test_check_links_no_links(root: Path):
     assert check.check_links(str(root), page(root, '# Index\n')) == []
 
 
+# check_pages()
+
+def test_check_pages_only_the_given_pages(root: Path, capsys):
+
+    page(root, '[a](a.md)\n')
+    other = page(root, '[b](b.md)\n', name='docs/obs/2026/c47.md')
+
+    assert not check.check_pages(str(root), [other])
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 1
+    assert 'docs/obs/2026/c47.md' in out[0]
+
+
+def test_check_pages_no_pages(root: Path):
+
+    page(root, '[a](a.md)\n')
+    assert check.check_pages(str(root), [])
+
+
 # check()
 
 def test_check(root: Path, capsys):
@@ -239,6 +239,14 @@ def test_obs_day_after_midnight():
     assert common.obs_day('2026-08-17 11:59') == '2026-08-16'
 
 
+# obs_day_and_year()
+
+def test_obs_day_and_year():
+
+    assert common.obs_day_and_year('2026-08-16 23:30') == ('2026-08-16', '2026')
+    assert common.obs_day_and_year('2026-01-01 00:15') == ('2025-12-31', '2025')
+
+
 # get_constellation()
 
 def test_get_constellation():
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 
 from astro_gen import db, project
-from astro_gen.datatypes import ObjectData
+from astro_gen.datatypes import ObjectData, ObsData, SketchData
 
 from pathlib import Path
 from ruamel.yaml import YAML
-from typing import Callable, Dict
+from typing import Callable, Dict, List
 import pytest
 
 
@@ -145,6 +145,32 @@ def test_load_missing_file(project_root: str):
         db.load(str(Path(project_root) / 'db' / 'no-such.yml'))
 
 
+def test_load_read_only(project_root: str):
+
+    data = db.load(project.sketch_db(project_root), read_only=True)
+    # plain containers, no round-trip data
+    assert type(data) is dict
+    assert type(data['sketches'][0]) is dict
+    assert data == db.load(project.sketch_db(project_root))
+
+
+@pytest.mark.parametrize('c_parser', [True, False])
+def test_read_only_data_is_identical(c_parser: bool, project_root: str, monkeypatch):
+
+    if not c_parser:
+        # fall back to the pure Python parser
+        monkeypatch.setattr('ruamel.yaml.main.CParser', None)
+
+    rw = db.ProjectDB(project_root, cache=False)
+    ro = db.ProjectDB(project_root, read_only=True, cache=False)
+
+    assert ro.sketches() == rw.sketches()
+    assert ro.observations() == rw.observations()
+    assert ro.objects() == rw.objects()
+    # stringified fields are formatted the same way too
+    assert [o.fov for o in ro.observations()] == [o.fov for o in rw.observations()]
+
+
 # sketches()
 
 def test_sketches_raw(project_root: str):
@@ -212,6 +238,57 @@ def test_observations(project_root: str):
     assert obs[1].data == {'PA': '~150°'}
 
 
+def test_observations_share_repeated_strings(project_root: str):
+
+    obs = db.observations(project_root)
+
+    # the names of the records parsed separately are the same objects
+    assert obs[0].names[0] is obs[1].names[0]
+    # slotted, no per-instance dict
+    assert not hasattr(obs[0], '__dict__')
+
+
+# obs_record() / obs_records()
+
+def test_obs_record():
+
+    obs = ObsData(names=['C47', 'Alpha UMi'], date='2026-08-16 23:30')
+    r = db.obs_record(obs)
+
+    assert r.obs is obs
+    assert r.day == '2026-08-16'
+    assert r.year == '2026'
+    assert r.slug == 'c47-alpha-umi-2026-08-16'
+    assert r.page == 'obs/2026/c47-alpha-umi-2026-08-16.md'
+
+
+def test_obs_record_after_midnight():
+
+    # the observation belongs to the previous day - and year
+    r = db.obs_record(ObsData(names=['C47'], date='2026-01-01 01:00'))
+    assert r.day == '2025-12-31'
+    assert r.year == '2025'
+    assert r.page == 'obs/2025/c47-2025-12-31.md'
+
+
+def test_obs_records_duplicate_page():
+
+    # different observations, but the same object on the same night
+    obs_db = [ObsData(names=['C47'], img='a.jpg', date='2026-08-16 23:30'),
+              ObsData(names=['C47'], img='b.jpg', date='2026-08-17 00:30')]
+
+    with pytest.raises(ValueError, match='obs/2026/c47-2026-08-16.md'):
+        db.obs_records(obs_db)
+
+
+def test_observation_records(project_root: str):
+
+    records = db.observation_records(project_root)
+    assert [r.obs.names for r in records] == [['C47'], ['C47', 'Alpha UMi']]
+    assert [r.page for r in records] == ['obs/2025/c47-2025-07-15.md',
+                                         'obs/2025/c47-alpha-umi-2025-07-15.md']
+
+
 # objects()
 
 def test_objects_raw(project_root: str):
@@ -249,6 +326,20 @@ def test_objects(project_root: str):
     assert a_umi.fetched['HD 8890'].subtype == 'Main Sequence Supergiant'
 
 
+def test_objects_share_repeated_strings(tmp_path: Path):
+
+    (tmp_path / 'db').mkdir()
+    (tmp_path / 'db' / 'objects.yml').write_text('objects:\n'
+                                                 '  Gassendi:\n    constellation: Moon\n    type: crater\n'
+                                                 '  Archimedes:\n    constellation: Moon\n    type: crater\n',
+                                                 encoding='utf-8')
+    objs = db.objects(str(tmp_path))
+
+    assert objs['Gassendi'].constellation is objs['Archimedes'].constellation
+    assert objs['Gassendi'].type is objs['Archimedes'].type
+    assert not hasattr(objs['Gassendi'], '__dict__')
+
+
 # save()
 
 def test_save_roundtrip_keeps_comments(project_root: str):
@@ -271,32 +362,29 @@ def test_save_creates_file(tmp_path: Path):
 
 # update_in_list() / add_to_list()
 
-def match_full(x: Dict, y: Dict) -> bool:
-    return x['full'] == y['full']
-
-
 def test_update_in_list_hit(project_root: str):
 
-    sdb = db.load(project.sketch_db(project_root))
-    sk_list = sdb['sketches']
+    with db.ProjectDB(project_root) as pdb:
+        sk_list = pdb.edit(pdb.sketch_file)['sketches']
 
-    updated = db.update_in_list(sk_list,
-                                {'full': '2026/gassendi-20260816.jpg', 'scan': 'craters.jpg'},
-                                match_full)
-    assert updated
-    assert len(sk_list) == 2
-    assert sk_list[1]['scan'] == 'craters.jpg'
-    # fields not present in the update are kept
-    assert sk_list[1]['notes'] == '[sketch notes]\n'
+        updated = db.update_in_list(pdb.lookup(pdb.sketch_file, 'sketches'),
+                                    {'full': '2026/gassendi-20260816.jpg', 'scan': 'craters.jpg'},
+                                    '2026/gassendi-20260816.jpg')
+        assert updated
+        assert len(sk_list) == 2
+        assert sk_list[1]['scan'] == 'craters.jpg'
+        # fields not present in the update are kept
+        assert sk_list[1]['notes'] == '[sketch notes]\n'
 
 
 def test_update_in_list_miss(project_root: str):
 
-    sdb = db.load(project.sketch_db(project_root))
-    sk_list = sdb['sketches']
+    with db.ProjectDB(project_root) as pdb:
+        sk_list = pdb.edit(pdb.sketch_file)['sketches']
 
-    assert not db.update_in_list(sk_list, {'full': 'm31-20260816.jpg'}, match_full)
-    assert len(sk_list) == 2
+        assert not db.update_in_list(pdb.lookup(pdb.sketch_file, 'sketches'),
+                                     {'full': 'm31-20260816.jpg'}, 'm31-20260816.jpg')
+        assert len(sk_list) == 2
 
 
 def test_add_to_list(project_root: str):
@@ -312,15 +400,30 @@ def test_add_to_list(project_root: str):
     assert written.endswith('\n\n  - full: m31-20260816.jpg\n')
 
 
+# sketch_paths()
+
+def test_sketch_paths():
+
+    pair = SketchData(full='2026/c47-alpha-umi.jpg', sub=['2026/c47.jpg', '2026/alpha-umi.jpg'])
+    single = SketchData(full='2026/gassendi.jpg', sub=['2026/gassendi.jpg'])
+
+    paths = db.sketch_paths([pair, single])
+    assert paths == {'2026/c47-alpha-umi.jpg': [pair],
+                     '2026/c47.jpg': [pair],
+                     '2026/alpha-umi.jpg': [pair],
+                     '2026/gassendi.jpg': [single]}
+
+
 # add_sketch()
 
 def test_add_sketch_new(project_root: str):
 
-    db.add_sketch(project_root,
-                  full='m31-saturn-20260816.jpg',
-                  scan='galaxy_planet.jpg',
-                  sub=['m31-20260816.jpg', 'saturn-20260816.jpg'],
-                  cmd=['astro-gen . add -i x.jpg'])
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb,
+                      full='m31-saturn-20260816.jpg',
+                      scan='galaxy_planet.jpg',
+                      sub=['m31-20260816.jpg', 'saturn-20260816.jpg'],
+                      cmd=['astro-gen . add -i x.jpg'])
 
     sketches = read_back(project.sketch_db(project_root))['sketches']
     assert len(sketches) == 3
@@ -332,7 +435,8 @@ def test_add_sketch_new(project_root: str):
 
 def test_add_sketch_optional_fields_omitted(project_root: str):
 
-    db.add_sketch(project_root, full='m31-20260816.jpg')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb, full='m31-20260816.jpg')
 
     sketches = read_back(project.sketch_db(project_root))['sketches']
     assert sketches[-1] == {'full': 'm31-20260816.jpg'}
@@ -340,9 +444,10 @@ def test_add_sketch_optional_fields_omitted(project_root: str):
 
 def test_add_sketch_existing_is_updated(project_root: str):
 
-    db.add_sketch(project_root,
-                  full='2026/gassendi-20260816.jpg',
-                  scan='craters.jpg')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb,
+                      full='2026/gassendi-20260816.jpg',
+                      scan='craters.jpg')
 
     sketches = read_back(project.sketch_db(project_root))['sketches']
     # no new entry, matched by 'full'
@@ -351,11 +456,24 @@ def test_add_sketch_existing_is_updated(project_root: str):
     assert sketches[1]['notes'] == '[sketch notes]\n'
 
 
+def test_add_sketch_twice_in_one_session(project_root: str):
+
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb, full='m31-20260816.jpg')
+        db.add_sketch(pdb, full='m31-20260816.jpg', scan='galaxy.jpg')
+
+    sketches = read_back(project.sketch_db(project_root))['sketches']
+    # the appended entry is found by the lookup
+    assert len(sketches) == 3
+    assert sketches[-1] == {'full': 'm31-20260816.jpg', 'scan': 'galaxy.jpg'}
+
+
 # add_obs()
 
 def test_add_obs_new(project_root: str):
 
-    db.add_obs(project_root, name='M31', date='2026-08-15')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_obs(pdb, name='M31', date='2026-08-15')
 
     obs = read_back(project.obs_db(project_root))['observations']
     assert len(obs) == 3
@@ -375,7 +493,8 @@ def test_add_obs_new(project_root: str):
 
 def test_add_obs_multiple_names(project_root: str):
 
-    db.add_obs(project_root, name='M31, Saturn', date='2026-08-15')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_obs(pdb, name='M31, Saturn', date='2026-08-15')
 
     entry = read_back(project.obs_db(project_root))['observations'][-1]
     # more than one name is stored as a list
@@ -385,7 +504,8 @@ def test_add_obs_multiple_names(project_root: str):
 
 def test_add_obs_single_name_kept_as_string(project_root: str):
 
-    db.add_obs(project_root, name='Alpha UMi', date='2026-08-15')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_obs(pdb, name='Alpha UMi', date='2026-08-15')
 
     entry = read_back(project.obs_db(project_root))['observations'][-1]
     assert entry['name'] == 'Alpha UMi'
@@ -398,11 +518,23 @@ def test_add_obs_duplicate_is_skipped(project_root: str):
     original = Path(file).read_text(encoding='utf-8')
 
     # same name and img as the first fixture entry
-    db.add_obs(project_root, name='C47', date='2026-08-16')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_obs(pdb, name='C47', date='2026-08-16')
 
     assert Path(file).read_text(encoding='utf-8') == original
 
 
+def test_add_obs_duplicate_in_one_session(project_root: str):
+
+    with db.ProjectDB(project_root) as pdb:
+        db.add_obs(pdb, name='M31, Saturn', date='2026-08-15')
+        db.add_obs(pdb, name='M31, Saturn', date='2026-08-15')
+        db.add_obs(pdb, name='M31', date='2026-08-15')
+
+    obs = read_back(project.obs_db(project_root))['observations']
+    assert [o['name'] for o in obs[2:]] == [['M31', 'Saturn'], 'M31']
+
+
 # _refresh_with_fetched()
 
 def fetched_m31() -> ObjectData:
@@ -561,11 +693,82 @@ def test_add_object_with_fetch_map(project_root: str):
     assert entry['type'] == 'star'
 
 
+def test_add_object_appended_separated(project_root: str):
+
+    file = project.object_db(project_root)
+    objs = db.load(file)
+    db.add_object(objs['objects'], 'M31', fetched={})
+    db.save(file, objs)
+
+    assert Path(file).read_text(encoding='utf-8') == \
+        OBJECTS_DB + "\n  M31:\n    constellation: ''\n    type: ''\n"
+
+
+# ObjectIndex
+
+def test_object_index_natural_order():
+
+    index = db.ObjectIndex(['M13', 'M2', 'C47'])
+    assert index.position('M3') == 2
+    assert index.position('M100') == 3
+    assert index.position('A') == 0
+
+    index.add('M3')
+    assert len(index) == 4
+    assert index.position('M4') == 3
+
+
+# merge_objects()
+
+def test_merge_objects_many(project_root: str):
+
+    file = project.object_db(project_root)
+    objs = db.load(file)
+    added = db.merge_objects(objs['objects'], ['M31', 'B Obj', 'A0', 'C47', 'M2'], fetched={})
+    db.save(file, objs)
+
+    assert added == ['M31', 'B Obj', 'A0', 'M2']
+    text = Path(file).read_text(encoding='utf-8')
+    data = read_back(file)['objects']
+    assert list(data.keys()) == ['A0', 'Alpha UMi', 'Archimedes', 'B Obj', 'C47', 'M2', 'M31']
+    # the comments and the fields of the existing entries are kept
+    assert text.startswith("# Object 'db' - map of object data\n\nobjects:\n\n  A0:\n")
+    assert data['Archimedes']['data'] == {'size': '81 km'}
+    # a single empty line between all the entries
+    assert '\n\n\n' not in text
+    assert text.count('\n\n  ') == 7
+
+
+def test_merge_objects_refresh_keeps_separators(project_root: str):
+
+    file = project.object_db(project_root)
+    objs = db.load(file)
+    fetched = {'Archimedes': ObjectData(name='Archimedes', type='Crater')}
+    assert db.merge_objects(objs['objects'], ['Archimedes'], fetched=fetched, refresh=True) == ['Archimedes']
+    db.save(file, objs)
+
+    text = Path(file).read_text(encoding='utf-8')
+    assert list(read_back(file)['objects'].keys()) == ['Alpha UMi', 'Archimedes', 'C47']
+    assert '\n\n\n' not in text
+
+
+def test_merge_objects_with_index(project_root: str):
+
+    objs = object_dict(project_root)
+    index = db.ObjectIndex(objs.keys())
+    db.merge_objects(objs, ['M31'], fetched={}, index=index)
+    db.merge_objects(objs, ['B Obj'], fetched={}, index=index)
+
+    assert list(objs.keys()) == ['Alpha UMi', 'Archimedes', 'B Obj', 'C47', 'M31']
+    assert len(index) == 5
+
+
 # add_objects()
 
 def test_add_objects_single(project_root: str):
 
-    db.add_objects(project_root, name='M31')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_objects(pdb, name='M31')
 
     objs = read_back(project.object_db(project_root))['objects']
     assert list(objs.keys()) == ['Alpha UMi', 'Archimedes', 'C47', 'M31']
@@ -573,7 +776,8 @@ def test_add_objects_single(project_root: str):
 
 def test_add_objects_comma_separated_list(project_root: str):
 
-    db.add_objects(project_root, name='M31, Saturn')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_objects(pdb, name='M31, Saturn')
 
     objs = read_back(project.object_db(project_root))['objects']
     assert 'M31' in objs.keys()
@@ -585,14 +789,16 @@ def test_add_objects_no_write_when_all_present(project_root: str):
     file = project.object_db(project_root)
     original = Path(file).read_text(encoding='utf-8')
 
-    db.add_objects(project_root, name='C47, Archimedes')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_objects(pdb, name='C47, Archimedes')
 
     assert Path(file).read_text(encoding='utf-8') == original
 
 
 def test_add_objects_writes_when_any_added(project_root: str):
 
-    db.add_objects(project_root, name='C47, M31')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_objects(pdb, name='C47, M31')
 
     objs = read_back(project.object_db(project_root))['objects']
     assert 'M31' in objs.keys()
@@ -601,11 +807,435 @@ def test_add_objects_writes_when_any_added(project_root: str):
 def test_add_objects_with_fetch_map(project_root: str):
 
     fetched = {'HD 8890': ObjectData(name='HD 8890', type='Star')}
-    db.add_objects(project_root,
-                   name='Beta Cyg',
-                   fetched=fetched,
-                   fetch_map={'Beta Cyg': {'Beta Cyg A': 'HD 8890'}})
+    with db.ProjectDB(project_root) as pdb:
+        db.add_objects(pdb,
+                       name='Beta Cyg',
+                       fetched=fetched,
+                       fetch_map={'Beta Cyg': {'Beta Cyg A': 'HD 8890'}})
 
     entry = read_back(project.object_db(project_root))['objects']['Beta Cyg']
     assert entry['components']['Beta Cyg A']['name'] == 'HD 8890'
     assert entry['fetched']['HD 8890']['type'] == 'Star'
+
+
+# ProjectDB
+
+def test_project_db_loads_each_file_once(project_root: str, mocker):
+
+    load = mocker.spy(db, 'load')
+
+    with db.ProjectDB(project_root) as pdb:
+        pdb.sketches()
+        pdb.observation_records()
+        pdb.objects()
+        db.add_objects(pdb, name='M31')
+        db.add_objects(pdb, name='Saturn')
+        db.add_obs(pdb, name='M31', date='2026-08-15')
+
+    assert sorted(c.args[0] for c in load.call_args_list) == \
+        sorted([project.sketch_db(project_root),
+                project.obs_db(project_root),
+                project.object_db(project_root)])
+
+
+def test_project_db_saves_modified_files_once(project_root: str, mocker):
+
+    save = mocker.spy(db, 'save')
+
+    with db.ProjectDB(project_root) as pdb:
+        pdb.sketches()
+        db.add_objects(pdb, name='M31')
+        db.add_objects(pdb, name='Saturn')
+        # nothing saved before the end
+        save.assert_not_called()
+
+    # the sketch db is only read
+    assert [c.args[0] for c in save.call_args_list] == [project.object_db(project_root)]
+    objs = read_back(project.object_db(project_root))['objects']
+    assert 'M31' in objs.keys() and 'Saturn' in objs.keys()
+
+
+def test_project_db_object_index_built_once(project_root: str, mocker):
+
+    index = mocker.spy(db, 'ObjectIndex')
+
+    with db.ProjectDB(project_root) as pdb:
+        db.add_objects(pdb, name='M31')
+        db.add_objects(pdb, name='B Obj, Saturn')
+
+    index.assert_called_once()
+    objs = read_back(project.object_db(project_root))['objects']
+    assert list(objs.keys()) == ['Alpha UMi', 'Archimedes', 'B Obj', 'C47', 'M31', 'Saturn']
+
+
+def test_project_db_lookup(project_root: str):
+
+    with db.ProjectDB(project_root) as pdb:
+        sketches = pdb.lookup(pdb.sketch_file, 'sketches')
+        assert list(sketches.keys()) == ['2026/c47-alpha-umi-20260816.jpg', '2026/gassendi-20260816.jpg']
+
+        # kept up to date by append()
+        pdb.append(pdb.sketch_file, 'sketches', {'full': 'm31.jpg'})
+        assert pdb.lookup(pdb.sketch_file, 'sketches') is sketches
+        assert sketches['m31.jpg'] == {'full': 'm31.jpg'}
+
+        # rebuilt after any other change
+        pdb.edit(pdb.sketch_file)['sketches'][0]['full'] = 'c47.jpg'
+        pdb.modified(pdb.sketch_file)
+        assert 'c47.jpg' in pdb.lookup(pdb.sketch_file, 'sketches')
+
+        obs = pdb.lookup(pdb.obs_file, 'observations')
+        assert ('C47', '2026/c47-20260816.jpg') in obs
+
+
+def test_project_db_not_saved_on_error(project_root: str):
+
+    file = project.object_db(project_root)
+    original = Path(file).read_text(encoding='utf-8')
+
+    with pytest.raises(RuntimeError):
+        with db.ProjectDB(project_root) as pdb:
+            db.add_objects(pdb, name='M31')
+            raise RuntimeError('failed')
+
+    assert Path(file).read_text(encoding='utf-8') == original
+
+
+def test_project_db_derived_data_follows_changes(project_root: str):
+
+    pdb = db.ProjectDB(project_root)
+    assert 'M31' not in pdb.objects().keys()
+    # cached while unchanged
+    assert pdb.objects() is pdb.objects()
+
+    db.add_objects(pdb, name='M31')
+
+    assert 'M31' in pdb.objects().keys()
+    assert pdb.is_modified(pdb.object_file)
+
+
+def test_project_db_derived_data_keeps_documents(project_root: str):
+
+    pdb = db.ProjectDB(project_root)
+    pdb.observations()
+    pdb.objects()
+
+    # the round-trip documents are left as loaded
+    assert 'name' in pdb.observations_raw()[0].keys()
+    assert 'names' not in pdb.observations_raw()[0].keys()
+    assert 'name' not in pdb.objects_raw()['C47'].keys()
+
+
+def test_project_db_read_only_cannot_be_modified(project_root: str):
+
+    pdb = db.ProjectDB(project_root, read_only=True)
+    with pytest.raises(AssertionError):
+        db.add_objects(pdb, name='M31')
+
+
+def test_project_db_uses_cache(project_root: str, mocker):
+
+    first = db.ProjectDB(project_root, read_only=True)
+    objs = first.objects()
+
+    load = mocker.spy(db, 'load')
+    # parsed once, then taken from the cache
+    assert db.ProjectDB(project_root, read_only=True).objects() == objs
+    load.assert_not_called()
+
+    with db.ProjectDB(project_root) as pdb:
+        db.add_objects(pdb, name='M31')
+
+    # the modified file is parsed again
+    assert 'M31' in db.ProjectDB(project_root, read_only=True).objects().keys()
+    load.assert_called_with(project.object_db(project_root), read_only=True)
+
+
+# obs_files() / yearly observation shards
+
+OBS_2024_SHARD = """\
+observations:
+
+  - name: M42
+    img: 2024/m42-20240110.jpg
+    date: 2024-01-10 21:00
+"""
+
+
+@pytest.fixture
+def sharded_root(project_root: str) -> str:
+    """The project with its observations moved to shards, obs.yml deleted."""
+
+    shard_dir = Path(project.obs_shard_dir(project_root))
+    shard_dir.mkdir()
+    Path(project.obs_db(project_root)).rename(shard_dir / '2025.yml')
+    (shard_dir / '2024.yml').write_text(OBS_2024_SHARD, encoding='utf-8')
+    return project_root
+
+
+def test_obs_files_single_file(project_root: str):
+
+    assert db.obs_files(project_root) == [project.obs_db(project_root)]
+
+
+def test_obs_files_shards(sharded_root: str):
+
+    assert db.obs_files(sharded_root) == [project.obs_shard(sharded_root, '2024'),
+                                          project.obs_shard(sharded_root, '2025')]
+
+
+def test_obs_files_shards_and_single_file(sharded_root: str):
+
+    Path(project.obs_db(sharded_root)).write_text(OBS_DB, encoding='utf-8')
+    assert db.obs_files(sharded_root)[0] == project.obs_db(sharded_root)
+    assert len(db.obs_files(sharded_root)) == 3
+
+
+def test_observations_of_shards(sharded_root: str):
+
+    obs = db.observations(sharded_root)
+    # merged in the order of the shards
+    assert [o.img for o in obs] == ['2024/m42-20240110.jpg',
+                                    '2026/c47-20260816.jpg',
+                                    '2026/c47-alpha-umi-20260816.jpg']
+
+
+def test_observations_of_shards_in_parallel(sharded_root: str, monkeypatch):
+
+    expected = db.ProjectDB(sharded_root, cache=False).observations()
+
+    monkeypatch.setattr(db, 'PARALLEL_LOAD_MIN_FILES', 2)
+    assert db.ProjectDB(sharded_root, read_only=True, cache=False).observations() == expected
+
+
+def test_add_obs_to_shard(sharded_root: str):
+
+    shard_2024 = Path(project.obs_shard(sharded_root, '2024'))
+    original = shard_2024.read_text(encoding='utf-8')
+
+    with db.ProjectDB(sharded_root) as pdb:
+        db.add_obs(pdb, name='M31', date='2025-08-15')
+
+    # only the shard of the year is touched
+    assert shard_2024.read_text(encoding='utf-8') == original
+    obs = read_back(project.obs_shard(sharded_root, '2025'))['observations']
+    assert [o['img'] for o in obs][-1] == '2025/m31-20250815.jpg'
+    assert not Path(project.obs_db(sharded_root)).exists()
+
+
+def test_add_obs_new_shard(sharded_root: str):
+
+    with db.ProjectDB(sharded_root) as pdb:
+        db.add_obs(pdb, name='M31', date='2026-08-15')
+        # a new shard is part of the db before it's saved
+        assert project.obs_shard(sharded_root, '2026') in pdb.obs_files
+
+    obs = read_back(project.obs_shard(sharded_root, '2026'))['observations']
+    assert [o['name'] for o in obs] == ['M31']
+    assert db.observations(sharded_root)[-1].names == ['M31']
+
+
+def test_add_obs_duplicate_in_shard_is_skipped(sharded_root: str):
+
+    file = Path(project.obs_shard(sharded_root, '2024'))
+    original = file.read_text(encoding='utf-8')
+
+    with db.ProjectDB(sharded_root) as pdb:
+        db.add_obs(pdb, name='M42', date='2024-01-10')
+
+    assert file.read_text(encoding='utf-8') == original
+
+
+def test_add_obs_duplicate_after_midnight_is_skipped(project_root: str):
+
+    Path(project.obs_db(project_root)).write_text(OBS_DB_OF_YEARS, encoding='utf-8')
+    with db.ProjectDB(project_root) as pdb:
+        db.split_obs(pdb)
+
+    # in the shard of the night of 2024
+    with db.ProjectDB(project_root) as pdb:
+        db.add_obs(pdb, name='M1', date='2025-01-01')
+
+    assert [o.names for o in db.observations(project_root)].count(['M1']) == 1
+    assert not Path(project.obs_db(project_root)).exists()
+
+
+# split_obs()
+
+OBS_DB_OF_YEARS = """\
+# Observation 'db' - list of observations
+
+observations:
+
+  - name: M42
+    img: 2024/m42-20240110.jpg
+    date: 2024-01-10 21:00
+
+  # after midnight, still the night of 2024
+  - name: M1
+    img: 2025/m1-20250101.jpg
+    date: 2025-01-01 00:30
+    text: |
+      [observation notes]
+  - name: M31
+    img: 2025/m31-20250815.jpg
+    date: 2025-08-15 22:00
+"""
+
+
+def test_split_obs(project_root: str):
+
+    Path(project.obs_db(project_root)).write_text(OBS_DB_OF_YEARS, encoding='utf-8')
+    before = db.observations(project_root)
+
+    with db.ProjectDB(project_root) as pdb:
+        written = db.split_obs(pdb)
+
+    assert written == [project.obs_shard(project_root, '2024'),
+                       project.obs_shard(project_root, '2025')]
+    assert not Path(project.obs_db(project_root)).exists()
+    assert db.observations(project_root) == before
+
+    # the header and the comments are kept, the entries are separated
+    assert Path(written[0]).read_text(encoding='utf-8') == """\
+# Observation 'db' - list of observations
+
+observations:
+
+  - name: M42
+    img: 2024/m42-20240110.jpg
+    date: 2024-01-10 21:00
+
+  # after midnight, still the night of 2024
+  - name: M1
+    img: 2025/m1-20250101.jpg
+    date: 2025-01-01 00:30
+    text: |
+      [observation notes]
+"""
+    assert Path(written[1]).read_text(encoding='utf-8').endswith("""\
+observations:
+
+  - name: M31
+    img: 2025/m31-20250815.jpg
+    date: 2025-08-15 22:00
+""")
+
+
+def test_split_obs_into_existing_shards(sharded_root: str):
+
+    Path(project.obs_db(sharded_root)).write_text(OBS_DB_OF_YEARS, encoding='utf-8')
+
+    with db.ProjectDB(sharded_root) as pdb:
+        db.split_obs(pdb)
+
+    obs = read_back(project.obs_shard(sharded_root, '2024'))['observations']
+    assert [o['name'] for o in obs] == ['M42', 'M42', 'M1']
+
+
+def test_split_obs_no_file(sharded_root: str):
+
+    with db.ProjectDB(sharded_root) as pdb:
+        assert db.split_obs(pdb) == []
+
+
+# append_to_file()
+
+def saved_entirely(file: str, key: str, entries: List[Dict]) -> str:
+    """The file content if saved by a full round trip after appending `entries`."""
+
+    data = db.load(file)
+    for e in entries:
+        db.add_to_list(data[key], e)
+    out = Path(file).with_suffix('.full.yml')
+    db.save(str(out), data)
+    return out.read_text(encoding='utf-8')
+
+
+def test_append_same_as_full_save(project_root: str, mocker):
+
+    file = project.obs_db(project_root)
+    expected = saved_entirely(file, 'observations', [
+        {'name': 'M31', 'img': '2026/m31-20260815.jpg', 'date': '2026-08-15', 'loc': '',
+         'nelm': 0, 'seeing': 0, 'ap': 0, 'mag': 0, 'fov': 0, 'text': ''},
+        {'name': ['M31', 'Saturn'], 'img': '2026/m31-saturn-20260815.jpg', 'date': '2026-08-15', 'loc': '',
+         'nelm': 0, 'seeing': 0, 'ap': 0, 'mag': 0, 'fov': 0, 'text': ''}])
+
+    save = mocker.spy(db, 'save')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_obs(pdb, name='M31', date='2026-08-15')
+        db.add_obs(pdb, name='M31, Saturn', date='2026-08-15')
+
+    save.assert_not_called()
+    assert Path(file).read_text(encoding='utf-8') == expected
+
+
+def test_append_to_file_without_final_newline(project_root: str, mocker):
+
+    file = Path(project.sketch_db(project_root))
+    file.write_text(SKETCH_DB.replace('|\n      [sketch notes]\n', 'x'), encoding='utf-8')
+    expected = saved_entirely(str(file), 'sketches', [{'full': 'm31-20260816.jpg'}])
+
+    save = mocker.spy(db, 'save')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb, full='m31-20260816.jpg')
+
+    save.assert_not_called()
+    assert file.read_text(encoding='utf-8') == expected
+
+
+@pytest.mark.parametrize('notes', ['|\n      [sketch notes]', '|+\n      [sketch notes]\n'])
+def test_append_to_file_changing_last_entry(notes: str, project_root: str, mocker):
+
+    file = Path(project.sketch_db(project_root))
+    # a block scalar at the end would get the line breaks appended
+    file.write_text(SKETCH_DB.replace('|\n      [sketch notes]\n', notes), encoding='utf-8')
+    expected = saved_entirely(str(file), 'sketches', [{'full': 'm31-20260816.jpg'}])
+
+    save = mocker.spy(db, 'save')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb, full='m31-20260816.jpg')
+
+    save.assert_called_once()
+    assert file.read_text(encoding='utf-8') == expected
+
+
+def test_append_after_update_saves_entirely(project_root: str, mocker):
+
+    save = mocker.spy(db, 'save')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb, full='m31-20260816.jpg')
+        db.add_sketch(pdb, full='2026/gassendi-20260816.jpg', scan='craters.jpg')
+
+    save.assert_called_once()
+    sketches = read_back(project.sketch_db(project_root))['sketches']
+    assert [s['full'] for s in sketches][-1] == 'm31-20260816.jpg'
+    assert sketches[1]['scan'] == 'craters.jpg'
+
+
+def test_append_to_file_changed_since_load(project_root: str):
+
+    file = Path(project.sketch_db(project_root))
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb, full='m31-20260816.jpg')
+        file.write_text(SKETCH_DB + '\n', encoding='utf-8')
+
+        assert not db.append_to_file(str(file), pdb.edit(str(file)), [], (0, 0))
+
+    # saved entirely, the loaded data wins as before
+    assert [s['full'] for s in read_back(str(file))['sketches']][-1] == 'm31-20260816.jpg'
+
+
+def test_append_to_file_failed_check(project_root: str, mocker):
+
+    file = project.sketch_db(project_root)
+    expected = saved_entirely(file, 'sketches', [{'full': 'm31-20260816.jpg'}])
+
+    # rendered wrong, e.g. by another indentation
+    mocker.patch.object(db, '_render_entry', return_value='- full: m31-20260816.jpg\n- x\n')
+    save = mocker.spy(db, 'save')
+    with db.ProjectDB(project_root) as pdb:
+        db.add_sketch(pdb, full='m31-20260816.jpg')
+
+    save.assert_called_once()
+    assert Path(file).read_text(encoding='utf-8') == expected
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+from astro_gen import db_cache
+from astro_gen.datatypes import SketchData
+
+import os
+from pathlib import Path
+import pytest
+
+
+DATA = [SketchData(full='2026/c47-20260816.jpg', sub=['2026/c47.jpg'])]
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> str:
+    (tmp_path / 'db').mkdir()
+    (tmp_path / 'db' / 'sketch.yml').write_text('sketches:\n  - full: a.jpg\n')
+    return str(tmp_path)
+
+
+def db_file(root: str) -> str:
+    return str(Path(root) / 'db' / 'sketch.yml')
+
+
+# key()
+
+def test_key(project_root: str):
+
+    k = db_cache.key(db_file(project_root))
+    assert k.path == str(Path(db_file(project_root)).resolve())
+    assert k.size == Path(db_file(project_root)).stat().st_size
+    assert k == db_cache.key(db_file(project_root))
+
+
+# load() / save()
+
+def test_save_and_load(project_root: str):
+
+    k = db_cache.key(db_file(project_root))
+    db_cache.save(project_root, k, DATA)
+
+    assert db_cache.load(project_root, k) == DATA
+    # no temporary files left
+    assert [f.name for f in Path(db_cache.cache_file(project_root, k.path)).parent.iterdir()] == \
+        ['sketch.yml.pickle']
+
+
+def test_load_no_cache(project_root: str):
+
+    assert db_cache.load(project_root, db_cache.key(db_file(project_root))) is None
+
+
+def test_load_after_change(project_root: str):
+
+    file = Path(db_file(project_root))
+    db_cache.save(project_root, db_cache.key(str(file)), DATA)
+
+    file.write_text('sketches:\n  - full: b.jpg\n')
+
+    assert db_cache.load(project_root, db_cache.key(str(file))) is None
+
+
+def test_load_after_change_keeping_size_and_mtime(project_root: str):
+
+    file = Path(db_file(project_root))
+    st = file.stat()
+    db_cache.save(project_root, db_cache.key(str(file)), DATA)
+
+    file.write_text('sketches:\n  - full: b.jpg\n')
+    os.utime(file, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    # caught by the content hash
+    assert db_cache.load(project_root, db_cache.key(str(file))) is None
+
+
+def test_load_other_version(project_root: str, monkeypatch):
+
+    k = db_cache.key(db_file(project_root))
+    db_cache.save(project_root, k, DATA)
+
+    monkeypatch.setattr(db_cache, 'VERSION', db_cache.VERSION + 1)
+    assert db_cache.load(project_root, k) is None
+
+
+def test_load_other_schema(project_root: str, monkeypatch):
+
+    k = db_cache.key(db_file(project_root))
+    db_cache.save(project_root, k, DATA)
+
+    monkeypatch.setattr(db_cache, '_schema', lambda: 'SketchData:full')
+    assert db_cache.load(project_root, k) is None
+
+
+def test_load_corrupt_cache(project_root: str, capsys):
+
+    k = db_cache.key(db_file(project_root))
+    db_cache.save(project_root, k, DATA)
+    file = Path(db_cache.cache_file(project_root, k.path))
+    file.write_bytes(file.read_bytes()[:-10])
+
+    assert db_cache.load(project_root, k) is None
+    assert 'Invalid db cache' in capsys.readouterr().out
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+from astro_gen import db, feed, timeline
+from astro_gen.datatypes import ObsData
+
+import xml.etree.ElementTree as ET
+
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+SITEMAP = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+def timeline_of(*obs: ObsData) -> timeline.Timeline:
+    return timeline.build(db.obs_records(list(obs)))
+
+
+# site_url()
+
+def test_site_url():
+
+    assert feed.site_url('https://example.com/astro', 'obs/2026/m31-2026-08-15.md') == \
+        'https://example.com/astro/obs/2026/m31-2026-08-15.html'
+    assert feed.site_url('https://example.com/', 'index.md') == 'https://example.com/index.html'
+
+
+# atom()
+
+def test_atom():
+
+    tl = timeline_of(ObsData(names=['M31'], date='2026-08-16 01:00', text='Faint halo.\n'),
+                     ObsData(names=['C47', 'Alpha UMi'], date='2025-07-15 23:30'))
+
+    root = ET.fromstring(feed.atom(tl, 'https://example.com', {'author': 'John Doe'}))
+    assert root.tag == f'{ATOM}feed'
+    assert root.findtext(f'{ATOM}updated') == '2026-08-15T00:00:00Z'
+    assert root.findtext(f'{ATOM}author/{ATOM}name') == 'John Doe'
+
+    entries = root.findall(f'{ATOM}entry')
+    # the latest first
+    assert [e.findtext(f'{ATOM}title') for e in entries] == [
+        'Messier 31 on 2026-08-15',
+        'C47, Alpha Ursae Minoris on 2025-07-15'
+    ]
+    assert entries[0].findtext(f'{ATOM}id') == 'https://example.com/obs/2026/m31-2026-08-15.html'
+    assert entries[0].find(f'{ATOM}link').get('href') == entries[0].findtext(f'{ATOM}id')
+    assert entries[0].findtext(f'{ATOM}summary') == 'Faint halo.'
+    # no empty summary
+    assert entries[1].find(f'{ATOM}summary') is None
+
+
+def test_atom_is_reproducible():
+
+    tl = timeline_of(ObsData(names=['M31'], date='2026-08-16 01:00'))
+    assert feed.atom(tl, 'https://example.com', {}) == feed.atom(tl, 'https://example.com', {})
+
+
+def test_atom_no_data():
+
+    root = ET.fromstring(feed.atom([], 'https://example.com', {}))
+    assert root.find(f'{ATOM}entry') is None
+    assert root.find(f'{ATOM}updated') is None
+    assert root.findtext(f'{ATOM}title') == 'Observations'
+
+
+# sitemap()
+
+def test_sitemap():
+
+    root = ET.fromstring(feed.sitemap({'objects/m31.md': '2026-08-15',
+                                       'index.md': '2026-08-15',
+                                       'pages/log.md': ''},
+                                      'https://example.com'))
+
+    urls = root.findall(f'{SITEMAP}url')
+    # sorted by page
+    assert [u.findtext(f'{SITEMAP}loc') for u in urls] == [
+        'https://example.com/index.html',
+        'https://example.com/objects/m31.html',
+        'https://example.com/pages/log.html'
+    ]
+    assert urls[0].findtext(f'{SITEMAP}lastmod') == '2026-08-15'
+    # no date, no lastmod
+    assert urls[2].find(f'{SITEMAP}lastmod') is None
@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 
+from astro_gen import db
 from astro_gen import index
 from astro_gen import pages
+from astro_gen import timeline
 from astro_gen.datatypes import Object, ObsData
 
+from typing import List
+
+
+def timeline_of(obs_db: List[ObsData]) -> timeline.Timeline:
+    return timeline.build(db.obs_records(obs_db))
+
 
 # raw_data()
 
@@ -12,7 +20,7 @@ def test_raw_data():
     obs_db = [ObsData(names=['C47'], date='2026-08-16 23:30')]
     object_db = {'C47': Object(name='C47', constellation='Del', type='globular cluster')}
 
-    raw = index.raw_data(obs_db, object_db)
+    raw = index.raw_data(timeline_of(obs_db), object_db)
     assert len(raw) == 1
     assert raw[0]['name'] == 'C47'
     assert raw[0]['obj'] == object_db['C47']
@@ -24,7 +32,7 @@ def test_raw_data_entry_per_name():
     obs_db = [ObsData(names=['C47', 'Alpha UMi'], date='2026-08-16')]
     object_db = {'C47': Object(name='C47'), 'Alpha UMi': Object(name='Alpha UMi')}
 
-    raw = index.raw_data(obs_db, object_db)
+    raw = index.raw_data(timeline_of(obs_db), object_db)
     # an entry for each observed object, sorted by name
     assert [d['name'] for d in raw] == ['Alpha UMi', 'C47']
     # both link to the common observation page
@@ -36,7 +44,8 @@ def test_raw_data_sorted_naturally():
     obs_db = [ObsData(names=['M110', 'M13', 'M3'], date='2026-08-16')]
     object_db = {n: Object(name=n) for n in ['M110', 'M13', 'M3']}
 
-    assert [d['name'] for d in index.raw_data(obs_db, object_db)] == ['M3', 'M13', 'M110']
+    raw = index.raw_data(timeline_of(obs_db), object_db)
+    assert [d['name'] for d in raw] == ['M3', 'M13', 'M110']
 
 
 def test_raw_data_latest_observation_wins():
@@ -45,15 +54,26 @@ def test_raw_data_latest_observation_wins():
               ObsData(names=['C47'], date='2025-01-02')]
     object_db = {'C47': Object(name='C47')}
 
-    raw = index.raw_data(obs_db, object_db)
+    raw = index.raw_data(timeline_of(obs_db), object_db)
     # a single entry, pointing to the latest observation
     assert len(raw) == 1
     assert raw[0]['row'][2] == '../obs/2026/c47-2026-08-16.md'
 
 
+def test_raw_data_object_pages():
+
+    obs_db = [ObsData(names=['C47', 'Alpha UMi'], date='2026-08-16')]
+    object_db = {'C47': Object(name='C47'), 'Alpha UMi': Object(name='Alpha UMi')}
+
+    raw = index.raw_data(timeline_of(obs_db), object_db, {'C47': 'objects/c47.md'})
+    assert raw[1]['row'][3].endswith('[all observations](../objects/c47.md)')
+    # no link without a page
+    assert raw[0]['row'][3] == '- '
+
+
 def test_raw_data_no_data():
 
-    assert index.raw_data([], {}) == []
+    assert index.raw_data(timeline_of([]), {}) == []
 
 
 # get_type()
@@ -205,7 +225,7 @@ def test_index_content():
     obs_db = [ObsData(names=['C47'], date='2026-08-16')]
     object_db = {'C47': Object(name='C47', constellation='Del', type='globular cluster')}
 
-    assert index.index_content(obs_db, object_db) == [
+    assert index.index_content(timeline_of(obs_db), object_db) == [
         '## Categories',
         '',
         '#### Deep space',
@@ -229,14 +249,14 @@ def test_index_content_unknown_constellation_is_other():
     object_db = {'Archimedes': Object(name='Archimedes', constellation='Moon',
                                       type='crater')}
 
-    md = index.index_content(obs_db, object_db)
+    md = index.index_content(timeline_of(obs_db), object_db)
     # the Moon is no constellation
     assert md[md.index('## By constellation') + 2] == '#### Other'
 
 
 def test_index_content_no_data():
 
-    assert index.index_content([], {}) == [
+    assert index.index_content(timeline_of([]), {}) == [
         '## Categories', '', '',
         '## By constellation', '', ''
     ]
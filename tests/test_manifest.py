@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+from astro_gen import manifest, project
+
+from pathlib import Path
+import pytest
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> str:
+    (tmp_path / 'docs').mkdir()
+    return str(tmp_path)
+
+
+def add_file(root: str, name: str) -> Path:
+    p = Path(project.site_root(root)) / name
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text('content\n')
+    return p
+
+
+# load() / save()
+
+def test_save_and_load(project_root: str):
+
+    manifest.save(project_root, ['obs/2026/b.md', 'index.md', 'index.md'])
+    assert manifest.load(project_root) == ['index.md', 'obs/2026/b.md']
+
+
+def test_load_no_manifest(project_root: str):
+
+    assert manifest.load(project_root) == []
+
+
+def test_load_invalid_manifest(project_root: str):
+
+    file = Path(project.manifest_file(project_root))
+    file.parent.mkdir(parents=True)
+    file.write_text('{"files": [')
+    assert manifest.load(project_root) == []
+
+
+def test_load_other_version(project_root: str):
+
+    file = Path(project.manifest_file(project_root))
+    file.parent.mkdir(parents=True)
+    file.write_text('{"version": 0, "files": ["index.md"]}')
+    assert manifest.load(project_root) == []
+
+
+# orphans()
+
+def test_orphans(project_root: str):
+
+    add_file(project_root, 'index.md')
+    add_file(project_root, 'pages/about.md')
+
+    assert manifest.orphans(project_root, ['index.md', 'pages/about.md'], ['index.md']) == ['pages/about.md']
+
+
+def test_orphans_must_exist(project_root: str):
+
+    assert manifest.orphans(project_root, ['obs/2026/a.md'], []) == []
+
+
+def test_orphans_of_generated_dirs(project_root: str):
+
+    add_file(project_root, 'obs/2026/a.md')
+    add_file(project_root, 'objects/a.md')
+    add_file(project_root, 'search/a.json')
+    add_file(project_root, 'pages/log/2026.md')
+    # any other folder may hold hand-written pages
+    add_file(project_root, 'pages/about.md')
+
+    assert manifest.orphans(project_root, [], ['objects/a.md']) == \
+        ['obs/2026/a.md', 'pages/log/2026.md', 'search/a.json']
+
+
+# prune()
+
+def test_prune(project_root: str):
+
+    add_file(project_root, 'obs/2025/a.md')
+    add_file(project_root, 'obs/2026/a.md')
+    kept = add_file(project_root, 'obs/2026/b.md')
+
+    assert manifest.prune(project_root, ['obs/2025/a.md', 'obs/2026/a.md', 'obs/2024/x.md']) == \
+        ['obs/2025/a.md', 'obs/2026/a.md']
+    assert kept.is_file()
+    # empty folders are removed
+    assert not (Path(project.site_root(project_root)) / 'obs' / '2025').exists()
+
+
+def test_prune_outside_of_the_site(project_root: str):
+
+    with pytest.raises(ValueError):
+        manifest.prune(project_root, ['../a.md'])
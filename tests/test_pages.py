@@ -402,6 +402,16 @@ def test_tag_line_no_data():
     assert pages.tag_line('C47', Object()) == ''
 
 
+def test_tag_line_object_page():
+
+    obj = Object(name='C47', constellation='Del', type='globular cluster')
+    assert pages.tag_line('C47', obj, object_url='../../objects/c47.md') == \
+        '_C47_ -- _Globular cluster in Delphinus_ -- [All observations](../../objects/c47.md)'
+    # the link alone, when there's no other data
+    assert pages.tag_line('C47', Object(), object_url='../../objects/c47.md') == \
+        '[All observations](../../objects/c47.md)'
+
+
 # subtitle() / fetch_subtitle()
 
 def test_subtitle():
@@ -555,6 +565,34 @@ def test_page_no_toc_for_single_subtitle():
     assert '- [First](#first)' not in md.splitlines()
 
 
+# iter_page()
+
+def test_iter_page_lines_of_page():
+
+    content = ['## First'] + ['text'] * 100 + ['## Second']
+    lines = pages.iter_page(title='Index', content=iter(content), notes='Note',
+                            content_links={'Link': 'a.md'}, toc_level=2)
+
+    assert pages.join(lines) == pages.page(title='Index', content=content, notes='Note',
+                                           content_links={'Link': 'a.md'}, toc_level=2)
+
+
+def test_iter_page_content_is_consumed_lazily():
+
+    consumed = []
+
+    def content():
+        for l in ['a', 'b']:
+            consumed.append(l)
+            yield l
+
+    lines = pages.iter_page(title='Index', content=content())
+    assert next(lines) == '# Index'
+    assert consumed == []
+    assert 'b' in lines
+    assert consumed == ['a', 'b']
+
+
 # obs_body()
 
 def test_obs_body():
@@ -640,6 +678,19 @@ def test_log_row_from_main():
     assert row[2] == 'obs/2026/c47-2026-08-16.md'
 
 
+def test_log_row_doc_level():
+
+    row = pages.log_row('C47', '2026-08-16', doc_level=2)
+    assert row[2] == '../../obs/2026/c47-2026-08-16.md'
+
+
+def test_log_row_precomputed_page():
+
+    # the url is made of the given page, not of the name and the date
+    row = pages.log_row('C47', '2026-08-16', page='obs/2026/the-page.md')
+    assert row[2] == '../obs/2026/the-page.md'
+
+
 # index_row()
 
 def test_index_row():
@@ -653,6 +704,13 @@ def test_index_row():
     ]
 
 
+def test_index_row_object_page():
+
+    obj = Object(name='C47', constellation='Del', type='globular cluster')
+    row = pages.index_row('C47', ['C47'], '2026-08-16', obj, object_page='objects/c47.md')
+    assert row[3] == '- globular cluster in Delphinus -- [all observations](../objects/c47.md)'
+
+
 # index_data()
 
 def test_index_data_list():
@@ -727,6 +785,54 @@ def test_observation_page_title_of_multiple_objects():
     assert md.startswith('# C47, Alpha Ursae Minoris\n')
 
 
+def test_observation_page_object_pages():
+
+    obs = ObsData(names=['C47', 'Alpha UMi'], date='2026-08-16', loc='Apajpuszta')
+    md = pages.observation_page(obs,
+                                img='../img/x.jpg',
+                                object_pages={'C47': 'objects/c47.md',
+                                              'Alpha UMi': 'objects/alpha-umi.md'})
+
+    # linked from the tag line of each object
+    assert '[All observations](../../objects/c47.md)  \n' in md
+    assert '[All observations](../../objects/alpha-umi.md)  \n' in md
+
+
+# object_page()
+
+def test_object_page():
+
+    obj = Object(name='C47', constellation='Del', type='globular cluster',
+                 ra='20h 34m 11s')
+    log = [pages.log_row(['C47', 'Alpha UMi'], '2026-08-16'),
+           pages.log_row('C47', '2025-07-15')]
+
+    assert pages.object_page('C47', obj, log) == pages.join([
+        '# C47',
+        '',
+        '[Main page](../index.md) -- [Index](../pages/obj_index.md)',
+        '',
+        '_C47_ -- _Globular cluster in Delphinus_',
+        '',
+        'Object | C47',
+        '-|-',
+        'Desc. | Globular cluster',
+        'RA | 20h 34m 11s',
+        '',
+        '## Observations',
+        '',
+        '- 2026-08-16: [C47, Alpha Ursae Minoris](../obs/2026/c47-alpha-umi-2026-08-16.md)',
+        '- 2025-07-15: [C47](../obs/2025/c47-2025-07-15.md)',
+        ''
+    ])
+
+
+def test_object_page_no_object_data():
+
+    md = pages.object_page('C47', Object(name='C47'), [pages.log_row('C47', '2025-07-15')])
+    assert md.startswith('# C47\n\n[Main page](../index.md) -- [Index](../pages/obj_index.md)\n\n## Observations\n')
+
+
 # index_page()
 
 def test_index_page():
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+from astro_gen import preview
+
+from pathlib import Path
+import pytest
+import threading
+from typing import Iterator
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> str:
+    docs = tmp_path / 'docs'
+    (docs / 'pages').mkdir(parents=True)
+    (docs / 'index.md').write_text('# Main\n\n[Log](pages/log.md)\n', encoding='utf8')
+    (docs / 'pages' / 'log.md').write_text('# Log\n', encoding='utf8')
+    (docs / 'feed.xml').write_text('<feed/>\n', encoding='utf8')
+    return str(tmp_path)
+
+
+def site_of(root: str) -> Path:
+    return (Path(root) / 'docs').resolve()
+
+
+# markdown_of()
+
+def test_markdown_of(project_root: str):
+
+    site = site_of(project_root)
+    assert preview.markdown_of(site, '/') == site / 'index.md'
+    assert preview.markdown_of(site, '/pages/log.html') == site / 'pages' / 'log.md'
+    assert preview.markdown_of(site, '/pages/log.md') == site / 'pages' / 'log.md'
+
+
+def test_markdown_of_other_files(project_root: str):
+
+    site = site_of(project_root)
+    assert preview.markdown_of(site, '/feed.xml') is None
+    assert preview.markdown_of(site, '/missing.html') is None
+    assert preview.markdown_of(site, '/../../etc/passwd.md') is None
+
+
+# PageCache
+
+def test_page_cache(project_root: str):
+
+    cache = preview.PageCache()
+    page = site_of(project_root) / 'pages' / 'log.md'
+
+    html = cache.get(page)
+    assert b'<h1 id="log">Log</h1>' in html
+    # served from the cache
+    assert cache.get(page) is html
+
+    cache.invalidate([str(page)])
+    assert len(cache) == 0
+
+
+def test_page_cache_changed_file(project_root: str):
+
+    cache = preview.PageCache()
+    page = site_of(project_root) / 'pages' / 'log.md'
+    cache.get(page)
+
+    page.write_text('# Changed\n', encoding='utf8')
+    assert b'Changed' in cache.get(page)
+
+
+# server()
+
+@pytest.fixture
+def base_url(project_root: str) -> Iterator[str]:
+    httpd = preview.server(project_root, preview.PageCache(), port=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://localhost:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_server_renders_pages(base_url: str):
+
+    with urlopen(f'{base_url}/') as resp:
+        assert resp.headers['Content-Type'] == 'text/html; charset=utf-8'
+        assert '<a href="pages/log.html">Log</a>' in resp.read().decode('utf8')
+
+
+def test_server_serves_other_files(base_url: str):
+
+    with urlopen(f'{base_url}/feed.xml') as resp:
+        assert resp.read() == b'<feed/>\n'
+
+
+def test_server_missing_page(base_url: str):
+
+    with pytest.raises(HTTPError) as e:
+        urlopen(f'{base_url}/missing.html')
+    assert e.value.code == 404
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+from astro_gen import project
+from astro_gen import query
+from astro_gen.main import arg_parser
+
+import json
+from pathlib import Path
+import pytest
+import sqlite3
+
+
+SKETCH_DB = """\
+sketches:
+  - full: 2025/c47-alpha-umi-20250716.jpg
+    sub:
+      - 2025/c47-20250716.jpg
+      - 2025/alpha-umi-20250716.jpg
+  - full: 2026/m31-20260815.jpg
+"""
+
+OBS_DB = """\
+observations:
+  - name: C47
+    img: 2025/c47-20250716.jpg
+    date: 2025-07-15 23:30
+    ap: 150
+    mag: 120
+  - name: Alpha UMi
+    img: 2025/alpha-umi-20250716.jpg
+    date: 2025-07-16 00:15
+    loc: Backyard
+    ap: 150
+    mag: 120
+  - name: Alpha UMi
+    img: 2026/alpha-umi-20260801.jpg
+    date: 2026-08-01 22:00
+    ap: 150
+    mag: 75
+  - name:
+      - M31
+      - M32
+    img: 2026/m31-20260815.jpg
+    date: 2026-08-15 23:00
+    ap: 70
+    mag: 30
+"""
+
+OBJECTS_DB = """\
+objects:
+  Alpha UMi:
+    constellation: UMi
+    type: double star
+    components:
+      ~ B:
+        desc: Main sequence star
+    fetched:
+      HD 8890:
+        type: Star
+  C47:
+    constellation: Del
+    type: globular cluster
+  M31:
+    constellation: And
+    type: galaxy
+"""
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> str:
+
+    db_dir = tmp_path / 'db'
+    db_dir.mkdir()
+    (db_dir / 'sketch.yml').write_text(SKETCH_DB, encoding='utf-8')
+    (db_dir / 'obs.yml').write_text(OBS_DB, encoding='utf-8')
+    (db_dir / 'objects.yml').write_text(OBJECTS_DB, encoding='utf-8')
+    return str(tmp_path)
+
+
+def names_of(root: str, **filters) -> list:
+    columns, rows = query.observations(query.mirror(root), query.Filters(**filters))
+    return [r[columns.index('names')] for r in rows]
+
+
+# mirror()
+
+def test_mirror(project_root: str):
+
+    file = query.mirror(project_root)
+
+    assert file == project.query_db(project_root)
+    con = sqlite3.connect(file)
+    assert con.execute('SELECT count(*) FROM observations').fetchone() == (4,)
+    assert con.execute('SELECT name FROM observed_objects WHERE obs_id = 3').fetchall() == [('M31',), ('M32',)]
+    assert con.execute('SELECT name, type FROM objects ORDER BY name').fetchall() == \
+        [('Alpha UMi', 'double star'), ('C47', 'globular cluster'), ('M31', 'galaxy')]
+    assert con.execute('SELECT object, key, desc FROM components').fetchall() == \
+        [('Alpha UMi', '~ B', 'Main sequence star')]
+    assert con.execute('SELECT object, key, type FROM fetched').fetchall() == [('Alpha UMi', 'HD 8890', 'Star')]
+    assert con.execute('SELECT full FROM sketch_images WHERE img = ?', ('2025/c47-20250716.jpg',)).fetchall() == \
+        [('2025/c47-alpha-umi-20250716.jpg',)]
+    con.close()
+
+
+def test_mirror_built_once(project_root: str, mocker):
+
+    build = mocker.spy(query, 'build')
+
+    query.mirror(project_root)
+    query.mirror(project_root)
+
+    build.assert_called_once()
+
+
+def test_mirror_rebuilt_on_change(project_root: str, mocker):
+
+    query.mirror(project_root)
+    build = mocker.spy(query, 'build')
+
+    file = Path(project.obs_db(project_root))
+    file.write_text(file.read_text(encoding='utf-8').replace('mag: 30', 'mag: 40'), encoding='utf-8')
+
+    query.mirror(project_root)
+    build.assert_called_once()
+    assert names_of(project_root, min_mag=40) == ['C47', 'Alpha UMi', 'Alpha UMi', 'M31, M32']
+
+
+def test_mirror_with_obs_shards(project_root: str):
+
+    shard = Path(project.obs_shard(project_root, '2027'))
+    shard.parent.mkdir()
+    shard.write_text('observations:\n  - name: M31\n    img: 2027/m31.jpg\n    date: 2027-01-02 20:00\n',
+                     encoding='utf-8')
+
+    assert names_of(project_root, year='2027') == ['M31']
+
+
+def test_mirror_invalid_file_rebuilt(project_root: str):
+
+    file = Path(project.query_db(project_root))
+    file.parent.mkdir(parents=True)
+    file.write_bytes(b'not a database')
+
+    assert query.mirror(project_root) == str(file)
+    assert len(names_of(project_root)) == 4
+
+
+# observations()
+
+def test_observations_all(project_root: str):
+
+    columns, rows = query.observations(query.mirror(project_root), query.Filters())
+
+    assert columns == query.RESULT_COLUMNS
+    # by observation night
+    assert [r[0] for r in rows] == ['2025-07-15', '2025-07-15', '2026-08-01', '2026-08-15']
+
+
+def test_observations_filters(project_root: str):
+
+    assert names_of(project_root, type='Double Star', ap=150, min_mag=100, year='2025') == ['Alpha UMi']
+    assert names_of(project_root, name='m32') == ['M31, M32']
+    assert names_of(project_root, constellation='UMi', since='2026-01-01') == ['Alpha UMi']
+    assert names_of(project_root, until='2025-12-31', loc='Backyard') == ['Alpha UMi']
+    assert names_of(project_root, min_ap=100, max_mag=100) == ['Alpha UMi']
+    assert names_of(project_root, type='galaxy', name='M32') == []
+
+
+# execute()
+
+def test_execute(project_root: str):
+
+    columns, rows = query.execute(query.mirror(project_root),
+                                  'SELECT constellation, count(*) AS n FROM objects GROUP BY 1 ORDER BY 1')
+
+    assert columns == ['constellation', 'n']
+    assert rows == [('And', 1), ('Del', 1), ('UMi', 1)]
+
+
+def test_execute_read_only(project_root: str):
+
+    with pytest.raises(sqlite3.OperationalError):
+        query.execute(query.mirror(project_root), 'DELETE FROM observations')
+
+
+# format_rows()
+
+def test_format_rows():
+
+    columns = ['names', 'ap']
+    rows = [('Alpha UMi', 150), ('M31, M32', None)]
+
+    assert query.format_rows(columns, rows) == \
+        'names      ap\n' \
+        '---------  ---\n' \
+        'Alpha UMi  150\n' \
+        'M31, M32\n'
+    assert query.format_rows(columns, rows, fmt='csv') == 'names,ap\nAlpha UMi,150\n"M31, M32",\n'
+    assert json.loads(query.format_rows(columns, rows, fmt='json')) == \
+        [{'names': 'Alpha UMi', 'ap': 150}, {'names': 'M31, M32', 'ap': ''}]
+
+
+# query command
+
+def test_query_cmd(project_root: str, capsys):
+
+    args = arg_parser().parse_args([project_root, 'query', '-t', 'double star', '--min-mag', '100', '-f', 'json'])
+    args.func(args)
+
+    out = capsys.readouterr()
+    assert [r['day'] for r in json.loads(out.out)] == ['2025-07-15']
+    # the progress is printed to stderr
+    assert 'Building query db' in out.err
+
+
+def test_query_cmd_sql(project_root: str, capsys):
+
+    args = arg_parser().parse_args([project_root, 'query', '--sql', 'SELECT count(*) AS n FROM sketches',
+                                    '-f', 'csv'])
+    args.func(args)
+
+    assert capsys.readouterr().out == 'n\n2\n'
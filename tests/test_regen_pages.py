@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+from astro_gen import db, manifest, regen, timeline
+from astro_gen.datatypes import ObsData
+
+from pathlib import Path
+import pytest
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> str:
+    (tmp_path / 'docs').mkdir()
+    return str(tmp_path)
+
+
+def docs_of(root: str) -> Path:
+    return Path(root) / 'docs'
+
+
+def timeline_of(*dates: str) -> timeline.Timeline:
+    obs_db = [ObsData(names=[f'M{i}'], date=d) for i, d in enumerate(dates, start=1)]
+    return timeline.build(db.obs_records(obs_db))
+
+
+# Writer.write_file()
+
+def test_write_file(project_root: str):
+
+    assert regen.Writer(project_root).write_file('pages', 'a/b.md', 'content\n')
+    assert (docs_of(project_root) / 'pages' / 'a' / 'b.md').read_text() == 'content\n'
+
+
+def test_write_file_unchanged_is_skipped(project_root: str):
+
+    regen.Writer(project_root).write_file('', 'a.md', 'content\n')
+    page = docs_of(project_root) / 'a.md'
+    mtime = page.stat().st_mtime_ns
+
+    assert not regen.Writer(project_root).write_file('', 'a.md', 'content\n')
+    assert page.stat().st_mtime_ns == mtime
+
+    assert regen.Writer(project_root).write_file('', 'a.md', 'other\n')
+    assert page.read_text() == 'other\n'
+
+
+def test_write_file_outside_of_the_site(project_root: str):
+
+    with pytest.raises(ValueError):
+        regen.Writer(project_root).write_file('', '../a.md', 'content\n')
+
+
+# Writer.write_lines()
+
+def test_write_lines(project_root: str):
+
+    assert regen.Writer(project_root).write_lines('pages', 'a/b.md', iter(['line', '', 'other']))
+    assert (docs_of(project_root) / 'pages' / 'a' / 'b.md').read_text() == 'line\n\nother\n'
+    # no temp file remains
+    assert [f.name for f in (docs_of(project_root) / 'pages' / 'a').iterdir()] == ['b.md']
+
+
+def test_write_lines_produced(project_root: str):
+
+    out = regen.Writer(project_root)
+    out.write_lines('pages', 'a.md', ['line'])
+    out.write_lines('pages', 'a.md', ['line'])
+
+    # written or not
+    assert out.produced == ['pages/a.md', 'pages/a.md']
+
+
+def test_write_lines_unchanged_is_skipped(project_root: str):
+
+    regen.Writer(project_root).write_file('', 'a.md', 'line\n')
+    page = docs_of(project_root) / 'a.md'
+    mtime = page.stat().st_mtime_ns
+
+    assert not regen.Writer(project_root).write_lines('', 'a.md', ['line'])
+    assert page.stat().st_mtime_ns == mtime
+    assert [f.name for f in docs_of(project_root).iterdir()] == ['a.md']
+
+    assert regen.Writer(project_root).write_lines('', 'a.md', ['line', 'other'])
+    assert page.read_text() == 'line\nother\n'
+
+
+def test_write_lines_failure_keeps_the_page(project_root: str):
+
+    regen.Writer(project_root).write_file('', 'a.md', 'line\n')
+
+    def lines():
+        yield 'other'
+        raise RuntimeError('render error')
+
+    with pytest.raises(RuntimeError):
+        regen.Writer(project_root).write_lines('', 'a.md', lines())
+    assert (docs_of(project_root) / 'a.md').read_text() == 'line\n'
+    assert [f.name for f in docs_of(project_root).iterdir()] == ['a.md']
+
+
+# DryRun
+
+def test_dry_run_record():
+
+    dry_run = regen.DryRun()
+    dry_run.record('b.md', None, 'new\n')
+    dry_run.record('a.md', 'old\n', 'new\n')
+    dry_run.record('c.md', 'same\n', 'same\n')
+
+    assert dry_run.summary() == {'added': ['b.md'], 'changed': ['a.md'], 'unchanged': ['c.md']}
+    assert dry_run.diffs == {}
+    assert dry_run.report() == ['added: 1', 'changed: 1', 'unchanged: 1', 'A b.md', 'M a.md']
+
+
+def test_dry_run_record_diffs():
+
+    dry_run = regen.DryRun(with_diffs=True)
+    dry_run.record('a.md', 'old\n', 'new\n')
+    dry_run.record('c.md', 'same\n', 'same\n')
+
+    assert dry_run.diffs == {'a.md': ['--- a/a.md\n', '+++ b/a.md\n', '@@ -1 +1 @@\n', '-old\n', '+new\n']}
+    assert dry_run.report()[-5:] == ['--- a/a.md', '+++ b/a.md', '@@ -1 +1 @@', '-old', '+new']
+
+
+def test_write_file_dry_run(project_root: str):
+
+    regen.Writer(project_root).write_file('', 'a.md', 'content\n')
+    dry_run = regen.DryRun()
+    out = regen.Writer(project_root, dry_run=dry_run)
+
+    assert not out.write_file('', 'a.md', 'content\n')
+    assert out.write_file('pages', 'b.md', 'content\n') == 'pages/b.md'
+    assert out.write_lines('', 'a.md', ['other']) == 'a.md'
+
+    assert out.produced == ['a.md', 'pages/b.md', 'a.md']
+    assert dry_run.files == {'a.md': 'changed', 'pages/b.md': 'added'}
+    # nothing written
+    assert (docs_of(project_root) / 'a.md').read_text() == 'content\n'
+    assert not (docs_of(project_root) / 'pages').exists()
+
+
+# _update_manifest()
+
+def test_update_manifest(project_root: str, capsys):
+
+    regen.Writer(project_root).write_file('', 'old.md', 'content\n')
+    manifest.save(project_root, ['old.md', 'index.md'])
+
+    regen._update_manifest(project_root, ['index.md'], prune=False)
+    assert 'old.md' in capsys.readouterr().out
+    assert (docs_of(project_root) / 'old.md').is_file()
+    # still listed to be reported again
+    assert manifest.load(project_root) == ['index.md', 'old.md']
+
+    regen._update_manifest(project_root, ['index.md'], prune=True)
+    assert not (docs_of(project_root) / 'old.md').exists()
+    assert manifest.load(project_root) == ['index.md']
+
+
+def test_update_manifest_dry_run(project_root: str):
+
+    regen.Writer(project_root).write_file('', 'old.md', 'content\n')
+    manifest.save(project_root, ['old.md'])
+
+    regen._update_manifest(project_root, ['index.md'], prune=True, dry_run=True)
+    assert (docs_of(project_root) / 'old.md').is_file()
+    assert manifest.load(project_root) == ['old.md']
+
+
+# _generate_obs_log()
+
+def test_generate_obs_log(project_root: str):
+
+    regen._generate_obs_log(regen.Writer(project_root), timeline_of('2025-07-15', '2026-08-01', '2026-08-15'))
+
+    docs = docs_of(project_root)
+    landing = (docs / 'pages' / 'log.md').read_text()
+    # the latest year first, with the count of observations
+    assert '- [2026](log/2026.md) - 2 observations\n- [2025](log/2025.md) - 1 observation\n' in landing
+
+    year = (docs / 'pages' / 'log' / '2026.md').read_text()
+    assert year.startswith('# Observations in 2026\n')
+    assert '[All observations](../log.md)' in year
+    # the latest observation first
+    assert '- 2026-08-15: [Messier 3](../../obs/2026/m3-2026-08-15.md)\n' \
+        '- 2026-08-01: [Messier 2](../../obs/2026/m2-2026-08-01.md)\n' in year
+
+
+def test_generate_obs_log_paginated(project_root: str, monkeypatch):
+
+    monkeypatch.setattr(regen, 'LOG_PAGE_SIZE', 2)
+    regen._generate_obs_log(regen.Writer(project_root), timeline_of('2026-08-01', '2026-08-02', '2026-08-03'))
+
+    log_dir = docs_of(project_root) / 'pages' / 'log'
+    assert sorted(p.name for p in log_dir.iterdir()) == ['2026-2.md', '2026.md']
+
+    # the pages are filled in chronological order
+    first = (log_dir / '2026.md').read_text()
+    assert first.startswith('# Observations in 2026 (1/2)\n')
+    assert '[Next page](2026-2.md)' in first
+    assert 'm2-2026-08-02' in first and 'm1-2026-08-01' in first
+
+    second = (log_dir / '2026-2.md').read_text()
+    assert '[Previous page](2026.md)' in second
+    assert 'm3-2026-08-03' in second
+
+
+def test_generate_obs_log_new_observation_changes_its_year_only(project_root: str):
+
+    regen._generate_obs_log(regen.Writer(project_root), timeline_of('2025-07-15', '2026-08-01'))
+    page_2025 = docs_of(project_root) / 'pages' / 'log' / '2025.md'
+    mtime = page_2025.stat().st_mtime_ns
+
+    regen._generate_obs_log(regen.Writer(project_root), timeline_of('2025-07-15', '2026-08-01', '2026-08-15'))
+
+    assert page_2025.stat().st_mtime_ns == mtime
+
+
+# _object_pages()
+
+def test_object_pages():
+
+    tl = timeline_of('2026-08-01', '2026-08-02')
+    assert regen._object_pages(timeline.by_name(tl)) == {'M1': 'objects/m1.md',
+                                                        'M2': 'objects/m2.md'}
+
+
+def test_object_pages_duplicate():
+
+    obs_db = [ObsData(names=['Alpha UMi'], date='2026-08-01'),
+              ObsData(names=['alpha umi'], date='2026-08-02')]
+    tl = timeline.build(db.obs_records(obs_db))
+
+    with pytest.raises(ValueError, match='objects/alpha-umi.md'):
+        regen._object_pages(timeline.by_name(tl))
+
+
+# _site_pages()
+
+def test_site_pages():
+
+    tl = timeline_of('2025-07-15', '2026-08-01 00:15')
+    obs_by_name = timeline.by_name(tl)
+    pages = regen._site_pages(tl, obs_by_name, regen._object_pages(obs_by_name))
+
+    assert pages == {
+        'obs/2025/m1-2025-07-15.md': '2025-07-15',
+        'obs/2026/m2-2026-07-31.md': '2026-07-31',
+        'objects/m1.md': '2025-07-15',
+        'objects/m2.md': '2026-07-31',
+        'pages/log/2025.md': '2025-07-15',
+        'pages/log/2026.md': '2026-07-31',
+        'index.md': '2026-07-31',
+        'pages/log.md': '2026-07-31',
+        'pages/obj_index.md': '2026-07-31'
+    }
+
+
+# _generate_feed()
+
+def test_generate_feed_without_site_url(project_root: str):
+
+    tl = timeline_of('2026-08-01')
+    regen._generate_feed(regen.Writer(project_root), tl, timeline.by_name(tl), {'M1': 'objects/m1.md'}, meta={})
+    assert not (docs_of(project_root) / 'feed.xml').exists()
+    assert not (docs_of(project_root) / 'sitemap.xml').exists()
+
+
+def test_generate_feed(project_root: str):
+
+    tl = timeline_of('2026-08-01')
+    regen._generate_feed(regen.Writer(project_root), tl, timeline.by_name(tl), {'M1': 'objects/m1.md'},
+                         meta={'site_url': 'https://example.com'})
+    assert 'https://example.com/obs/2026/m1-2026-08-01.html' in \
+        (docs_of(project_root) / 'feed.xml').read_text()
+    assert 'https://example.com/objects/m1.html' in \
+        (docs_of(project_root) / 'sitemap.xml').read_text()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+from astro_gen import pages, render
+from astro_gen.datatypes import ObsData
+
+import pytest
+
+
+# page_url()
+
+@pytest.mark.parametrize('url, expected', [('../obs/2026/c47.md', '../obs/2026/c47.html'),
+                                           ('pages/log.md#2026', 'pages/log.html#2026'),
+                                           ('#latest', '#latest'),
+                                           ('../../img/c47.jpg', '../../img/c47.jpg'),
+                                           ('https://example.com/a.md', 'https://example.com/a.md')])
+def test_page_url(url: str, expected: str):
+
+    assert render.page_url(url) == expected
+
+
+# inline()
+
+def test_inline_links_and_images():
+
+    assert render.inline('see [C47](c47.md "Globular") and ![C47](c47.jpg)') == \
+        'see <a href="c47.html" title="Globular">C47</a> and <img src="c47.jpg" alt="C47">'
+
+
+def test_inline_emphasis():
+
+    assert render.inline('_M31_ -- **Other data**') == '<em>M31</em> -- <strong>Other data</strong>'
+    # not inside words
+    assert render.inline('file_name_here') == 'file_name_here'
+
+
+def test_inline_is_escaped():
+
+    assert render.inline('a < b & [x<y](a.md)') == 'a &lt; b &amp; <a href="a.html">x&lt;y</a>'
+
+
+# to_html()
+
+def test_to_html_headings_and_paragraphs():
+
+    assert render.to_html(['# Title', '', 'first  ', 'second', 'third', '', '## Sub title']) == [
+        '<h1 id="title">Title</h1>',
+        '<p>first<br> second third</p>',
+        '<h2 id="sub-title">Sub title</h2>'
+    ]
+
+
+def test_to_html_rule_and_quote():
+
+    assert render.to_html(['> note', '> more', '', '---', '']) == [
+        '<blockquote><p>note more</p></blockquote>',
+        '<hr>'
+    ]
+
+
+def test_to_html_list():
+
+    assert render.to_html(['- a', ' - b', '- c']) == [
+        '<ul>', '<li>a', '<ul>', '<li>b', '</li></ul>', '</li>', '<li>c', '</li></ul>'
+    ]
+
+
+def test_to_html_table():
+
+    md = pages.md_table([['a', 'b']], make_col=lambda d: d, row_headers=['Head', 'Row'])
+    assert render.to_html(md) == [
+        '<table>', '<thead>', '<tr>', '<th>Head</th>', '<th>a</th>', '</tr>', '</thead>',
+        '<tbody>', '<tr>', '<td>Row</td>', '<td>b</td>', '</tr>', '</tbody>', '</table>'
+    ]
+
+
+def test_to_html_text_before_a_list():
+
+    assert render.to_html(['text', '- item']) == ['<p>text</p>', '<ul>', '<li>item', '</li></ul>']
+
+
+# html_page()
+
+def test_html_page():
+
+    md = pages.observation_page(ObsData(names=['C47'], date='2026-08-16'), img='../../img/c47.jpg')
+    html = render.html_page(md)
+
+    assert '<title>C47</title>' in html
+    assert '<h1 id="c47">C47</h1>' in html
+    assert '<a href="../../index.html">Main page</a>' in html
+    assert '<img src="../../img/c47.jpg" alt="C47">' in html
+
+
+def test_html_page_custom_template():
+
+    assert render.html_page('# C47\n', template='{{ title }}: {{ content }}') == \
+        'C47: <h1 id="c47">C47</h1>'
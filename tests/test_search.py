@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+from astro_gen import db, search, timeline
+from astro_gen.datatypes import Object, ObjectData, ObsData
+
+import json
+import pytest
+
+
+@pytest.mark.parametrize('term, key', [('M31', 'm'),
+                                       ('  alpha UMi', 'a'),
+                                       ('Éta Cas', 'e'),
+                                       ('61 Cyg', '6'),
+                                       ('α UMi', search.OTHER_SHARD),
+                                       ('', search.OTHER_SHARD)])
+def test_shard_key(term: str, key: str):
+
+    assert search.shard_key(term) == key
+
+
+# entry()
+
+def alpha_umi() -> Object:
+    return Object(name='Alpha UMi', constellation='UMi', type='double star',
+                  aka=['Polaris'],
+                  fetched={'HD 8890': ObjectData(name='HD 8890')})
+
+
+def timeline_of(*obs: ObsData) -> timeline.Timeline:
+    return timeline.build(db.obs_records(list(obs)))
+
+
+def test_entry():
+
+    tl = timeline_of(ObsData(names=['Alpha UMi'], date='2025-07-16 00:15'),
+                     ObsData(names=['Alpha UMi', 'C47'], date='2026-08-02'))
+
+    assert search.entry('Alpha UMi', alpha_umi(), tl, 'objects/alpha-umi.md') == {
+        'name': 'Alpha UMi',
+        'title': 'Alpha Ursae Minoris',
+        'trad': 'α UMi',
+        'aka': ['Polaris'],
+        'fetched': ['HD 8890'],
+        'constellation': 'UMi',
+        'type': 'double star',
+        'url': 'objects/alpha-umi.html',
+        # the latest first
+        'obs': [['2026-08-02', 'obs/2026/alpha-umi-c47-2026-08-02.html'],
+                ['2025-07-15', 'obs/2025/alpha-umi-2025-07-15.html']]
+    }
+
+
+def test_entry_empty_fields_are_dropped():
+
+    tl = timeline_of(ObsData(names=['C47'], date='2026-08-02'))
+
+    assert set(search.entry('C47', Object(name='C47'), tl, 'objects/c47.md').keys()) == \
+        {'name', 'title', 'url', 'obs'}
+
+
+def test_terms_of():
+
+    e = {'name': 'Alpha UMi', 'title': 'Alpha Ursae Minoris', 'trad': 'α UMi',
+         'aka': ['Polaris'], 'fetched': ['HD 8890', 'Polaris']}
+    assert search.terms_of(e) == ['Alpha UMi', 'Alpha Ursae Minoris', 'α UMi', 'Polaris', 'HD 8890']
+
+
+# shards()
+
+def test_shards():
+
+    tl = timeline_of(ObsData(names=['Alpha UMi'], date='2026-08-02'),
+                     ObsData(names=['M31'], date='2026-08-15'))
+    object_db = {'Alpha UMi': alpha_umi(), 'M31': Object(name='M31')}
+    object_pages = {'Alpha UMi': 'objects/alpha-umi.md', 'M31': 'objects/m31.md'}
+
+    res = search.shards(timeline.by_name(tl), object_db, object_pages)
+
+    # an object is in the shard of each of its names
+    assert list(res.keys()) == [search.OTHER_SHARD, 'a', 'h', 'm', 'p']
+    assert [e['name'] for e in res['a']] == ['Alpha UMi']
+    assert [e['name'] for e in res['p']] == ['Alpha UMi']
+    assert [e['name'] for e in res['m']] == ['M31']
+
+
+def test_shard_json_is_compact():
+
+    assert search.shard_json([{'name': 'α UMi', 'obs': [['d', 'u']]}]) == \
+        '[{"name":"α UMi","obs":[["d","u"]]}]\n'
+    assert json.loads(search.shard_json([])) == []
+
+
+def test_search_page():
+
+    page = search.search_page()
+    assert page.startswith('<!DOCTYPE html>')
+    assert f'`{search.SEARCH_DIR}/${{key}}.json`' in page
+    assert f"'{search.OTHER_SHARD}'" in page
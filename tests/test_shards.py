@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+from astro_gen import shards
+from astro_gen.shards import Shard
+
+import json
+from pathlib import Path
+import pytest
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> str:
+    return str(tmp_path)
+
+
+# parse()
+
+def test_parse():
+
+    assert shards.parse('1/3') == Shard(index=1, count=3)
+    assert shards.parse('3/3') == Shard(index=3, count=3)
+    assert str(shards.parse('2/3')) == '2/3'
+
+
+@pytest.mark.parametrize('spec', ['', '1', '0/3', '4/3', 'a/3', '1/b', '-1/3'])
+def test_parse_invalid(spec: str):
+
+    with pytest.raises(ValueError):
+        shards.parse(spec)
+
+
+# shard_of()
+
+def test_shard_of_is_stable():
+
+    # pinned, as the shards of distributed runs must agree
+    assert shards.shard_of('obs/2026/m31-2026-08-15.md', 4) == 3
+    assert shards.shard_of('objects/m31.md', 4) == 1
+    assert shards.shard_of('index.md', 4) == 4
+
+
+def test_shard_of_all_pages_are_assigned_once():
+
+    pages = [f'obs/2026/m{i}.md' for i in range(100)]
+    selected = [p for i in range(1, 4) for p in pages if Shard(index=i, count=3).has(p)]
+    assert sorted(selected) == sorted(pages)
+
+
+# save() / load_all()
+
+def test_save_and_load_all(project_root: str):
+
+    shards.save(project_root, Shard(1, 2), ['obs/a.md', 'objects/a.md'])
+    shards.save(project_root, Shard(2, 2), ['obs/b.md'])
+
+    assert shards.load_all(project_root) == ['objects/a.md', 'obs/a.md', 'obs/b.md']
+
+
+def test_save_drops_other_shard_counts(project_root: str):
+
+    shards.save(project_root, Shard(1, 3), ['obs/a.md'])
+    shards.save(project_root, Shard(1, 1), ['obs/b.md'])
+
+    assert [f.name for f in Path(shards.manifest_file(project_root, Shard(1, 1))).parent.iterdir()] == \
+        ['1-of-1.json']
+
+
+def test_load_all_no_manifests(project_root: str):
+
+    with pytest.raises(ValueError, match='No shard manifests'):
+        shards.load_all(project_root)
+
+
+def test_load_all_missing_shard(project_root: str):
+
+    shards.save(project_root, Shard(2, 3), ['obs/a.md'])
+
+    with pytest.raises(ValueError, match='Missing shard\\(s\\) 1, 3 of 3'):
+        shards.load_all(project_root)
+
+
+def test_load_all_different_counts(project_root: str):
+
+    shards.save(project_root, Shard(1, 1), ['obs/a.md'])
+    other = Path(shards.manifest_file(project_root, Shard(1, 2)))
+    other.write_text(json.dumps({'version': shards.VERSION, 'shard': 1, 'count': 2, 'files': []}))
+
+    with pytest.raises(ValueError, match='different shard counts'):
+        shards.load_all(project_root)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+from astro_gen import project, render, static_site
+
+import os
+from pathlib import Path
+import pytest
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> str:
+    docs = tmp_path / 'docs'
+    (docs / 'obs' / '2026').mkdir(parents=True)
+    (docs / 'img').mkdir()
+    (docs / 'index.md').write_text('# Main\n\n[C47](obs/2026/c47.md)\n', encoding='utf8')
+    (docs / 'obs' / '2026' / 'c47.md').write_text('# C47\n\n![C47](../../img/c47.jpg)\n', encoding='utf8')
+    (docs / 'img' / 'c47.jpg').write_bytes(b'jpg')
+    (docs / '_config.yml').write_text('theme: none\n', encoding='utf8')
+    (tmp_path / 'static').mkdir()
+    return str(tmp_path)
+
+
+def html_of(root: str) -> Path:
+    return Path(project.html_root(root))
+
+
+def make_old(file: Path):
+    os.utime(file, ns=(1, 1))
+
+
+# layout()
+
+def test_layout_default(project_root: str):
+
+    assert static_site.layout(project_root) == render.HTML_TEMPLATE
+
+
+def test_layout_of_project(project_root: str):
+
+    Path(project.layout_file(project_root)).write_text('{{ content }}', encoding='utf8')
+    assert static_site.layout(project_root) == '{{ content }}'
+
+
+# build()
+
+def test_build(project_root: str):
+
+    written = static_site.build(project_root, workers=2)
+    assert written == ['img/c47.jpg', 'index.html', 'obs/2026/c47.html']
+
+    html = html_of(project_root)
+    assert '<a href="obs/2026/c47.html">C47</a>' in (html / 'index.html').read_text()
+    assert (html / 'img' / 'c47.jpg').read_bytes() == b'jpg'
+    # jekyll config and sources are not published
+    assert not (html / '_config.yml').exists()
+    assert not list(html.rglob('*.md'))
+
+
+def test_build_again_writes_nothing(project_root: str):
+
+    static_site.build(project_root, workers=1)
+    assert static_site.build(project_root, workers=1) == []
+
+
+def test_build_changed_page(project_root: str):
+
+    static_site.build(project_root, workers=1)
+    page = Path(project.site_root(project_root)) / 'index.md'
+    page.write_text('# Changed\n', encoding='utf8')
+
+    assert static_site.build(project_root, workers=1) == ['index.html']
+    assert '<h1 id="changed">Changed</h1>' in (html_of(project_root) / 'index.html').read_text()
+
+
+def test_build_touched_page_is_kept(project_root: str):
+
+    static_site.build(project_root, workers=1)
+    make_old(html_of(project_root) / 'index.html')
+
+    # rendered again, but the content is the same
+    assert static_site.build(project_root, workers=1) == []
+    assert static_site.build(project_root, workers=1) == []
+
+
+def test_build_changed_layout(project_root: str):
+
+    static_site.build(project_root, workers=1)
+    Path(project.layout_file(project_root)).write_text('<main>{{ content }}</main>', encoding='utf8')
+
+    assert static_site.build(project_root, workers=1) == ['index.html', 'obs/2026/c47.html']
+    assert (html_of(project_root) / 'index.html').read_text().startswith('<main><h1')
+
+
+def test_build_new_render_version(project_root: str, mocker):
+
+    static_site.build(project_root, workers=1)
+    (html_of(project_root) / 'index.html').write_text('rendered by the old version', encoding='utf8')
+    assert static_site.build(project_root, workers=1) == []
+
+    mocker.patch.object(render, 'VERSION', render.VERSION + 1)
+    assert static_site.build(project_root, workers=1) == ['index.html']
+    assert (html_of(project_root) / 'index.html').read_text().startswith('<!DOCTYPE html>')
+    assert static_site.build(project_root, workers=1) == []
+
+
+def test_build_deletes_outputs_without_source(project_root: str):
+
+    static_site.build(project_root, workers=1)
+    site = Path(project.site_root(project_root))
+    (site / 'obs' / '2026' / 'c47.md').unlink()
+    (site / 'img' / 'c47.jpg').unlink()
+
+    assert static_site.build(project_root, workers=1) == []
+    html = html_of(project_root)
+    assert sorted(f.relative_to(html).as_posix() for f in html.rglob('*')) == ['index.html']
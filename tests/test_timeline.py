@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+from astro_gen import db
+from astro_gen import timeline
+from astro_gen.datatypes import ObsData
+
+from typing import List
+
+
+def obs(names, date: str) -> ObsData:
+    return ObsData(names=names if isinstance(names, list) else [names], date=date)
+
+
+def build(obs_db: List[ObsData]) -> timeline.Timeline:
+    return timeline.build(db.obs_records(obs_db))
+
+
+# build()
+
+def test_build_sorted_by_date():
+
+    obs_db = [obs('M31', '2026-08-16 01:00'),
+              obs('C47', '2025-07-15 23:30'),
+              obs('Saturn', '2026-08-16 01:00'),
+              obs('Alpha UMi', '2025-07-16 00:15')]
+
+    tl = build(obs_db)
+    assert [e.obs.names for e in tl] == [['C47'], ['Alpha UMi'], ['M31'], ['Saturn']]
+    # the entries refer to the observations of the db
+    assert tl[0].obs is obs_db[1]
+
+
+def test_build_no_data():
+
+    assert build([]) == []
+
+
+# latest()
+
+def test_latest():
+
+    tl = build([obs(f'M{i}', f'2026-08-{i:02}') for i in range(1, 6)])
+
+    assert [e.obs.names[0] for e in timeline.latest(tl, 2)] == ['M4', 'M5']
+    # all the entries when there are not enough
+    assert timeline.latest(tl, 10) == tl
+    assert timeline.latest(tl, 0) == []
+
+
+# by_name()
+
+def test_by_name():
+
+    tl = build([obs(['C47', 'Alpha UMi'], '2026-08-16'),
+                         obs('C47', '2025-07-15'),
+                         obs('M31', '2026-08-17')])
+
+    res = timeline.by_name(tl)
+    assert list(res.keys()) == ['C47', 'Alpha UMi', 'M31']
+    assert [e.day for e in res['C47']] == ['2025-07-15', '2026-08-16']
+    assert res['Alpha UMi'] == [tl[1]]
+
+
+# position()
+
+def test_position():
+
+    tl = build([obs('C47', '2025-07-15'),
+                         obs('M31', '2026-08-16'),
+                         obs('Saturn', '2026-08-16')])
+
+    assert [timeline.position(tl, e) for e in tl] == [0, 1, 2]
+
+
+def test_position_of_equal_entries():
+
+    # the entry itself is looked up, not an equal one
+    tl = timeline.build([db.obs_record(obs('C47', '2025-07-15')) for _ in range(2)])
+
+    assert timeline.position(tl, tl[1]) == 1
+
+
+def test_position_not_present():
+
+    tl = build([obs('C47', '2025-07-15')])
+    other = db.obs_record(obs('M31', '2026-08-16'))
+
+    assert timeline.position(tl, other) == -1
+    assert timeline.position([], other) == -1
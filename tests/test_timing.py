@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+from astro_gen import timing
+
+from pathlib import Path
+import pstats
+
+
+# phase()
+
+def test_phase_without_profiling():
+
+    with timing.phase('a'):
+        pass
+    assert timing._active is None
+
+
+def test_phase_is_recorded():
+
+    with timing.profiling() as profiler:
+        for i in range(3):
+            with timing.phase('pages', item=f'page{i}'):
+                pass
+        with timing.phase('index'):
+            pass
+
+    assert list(profiler.phases.keys()) == ['pages', 'index']
+    assert profiler.phases['pages'].calls == 3
+    assert profiler.phases['index'].calls == 1
+    assert profiler.phases['pages'].seconds >= 0.0
+    assert [i for _, i in profiler.phases['pages'].items] == ['page0', 'page1', 'page2']
+    # no items without a name
+    assert profiler.phases['index'].items == []
+
+
+def test_phase_is_recorded_on_error():
+
+    with timing.profiling() as profiler:
+        try:
+            with timing.phase('a'):
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+
+    assert profiler.phases['a'].calls == 1
+
+
+# Profiler
+
+def test_slowest():
+
+    profiler = timing.Profiler()
+    for s, i in [(0.2, 'b'), (0.3, 'c'), (0.1, 'a')]:
+        profiler.add('pages', s, i)
+
+    assert profiler.slowest('pages', 2) == [(0.3, 'c'), (0.2, 'b')]
+    assert profiler.slowest('pages', 5) == [(0.3, 'c'), (0.2, 'b'), (0.1, 'a')]
+    assert profiler.slowest('unknown', 2) == []
+
+
+def test_report():
+
+    profiler = timing.Profiler()
+    profiler.add('db.objects', 0.5)
+    profiler.add('pages', 0.25, 'a.md')
+    profiler.add('pages', 0.5, 'b.md')
+
+    report = profiler.report(slowest=1)
+    assert report[0].split() == ['Phase', 'Calls', 'Time', '[s]']
+    assert report[1].split() == ['db.objects', '1', '0.500']
+    assert report[2].split() == ['pages', '2', '0.750']
+    assert report[3:] == ['', 'Slowest of pages:', '      0.5000  b.md']
+
+
+# profiling()
+
+def test_profiling_restores_the_previous_state():
+
+    with timing.profiling() as outer:
+        with timing.profiling():
+            with timing.phase('inner'):
+                pass
+        with timing.phase('outer'):
+            pass
+
+    assert list(outer.phases.keys()) == ['outer']
+    assert timing._active is None
+
+
+def test_profiling_out_file(tmp_path: Path):
+
+    out = tmp_path / 'regen.prof'
+    with timing.profiling(out_file=str(out)):
+        sum(range(100))
+
+    assert out.is_file()
+    assert pstats.Stats(str(out)).total_calls > 0
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+from astro_gen import project, watch
+
+from pathlib import Path
+import pytest
+from shutil import copytree
+
+
+EXAMPLE_DIR = Path(__file__).resolve().parents[1] / 'example'
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> str:
+    root = tmp_path / 'example'
+    for d in ['db', 'static']:
+        copytree(EXAMPLE_DIR / d, root / d)
+    (root / 'docs').mkdir()
+    return str(root)
+
+
+def edit(file: str, old: str, new: str):
+    p = Path(file)
+    content = p.read_text(encoding='utf8')
+    assert old in content
+    p.write_text(content.replace(old, new, 1), encoding='utf8')
+
+
+# watched_files()
+
+def test_watched_files(project_root: str):
+
+    files = watch.watched_files(project_root)
+    assert files[:3] == [project.sketch_db(project_root),
+                         project.obs_db(project_root),
+                         project.object_db(project_root)]
+    assert project.meta_file(project_root) in files
+    assert project.main_pre_file(project_root) in files
+
+
+def test_watched_files_obs_shards(project_root: str):
+
+    shard_dir = Path(project.obs_shard_dir(project_root))
+    shard_dir.mkdir()
+    Path(project.obs_db(project_root)).rename(shard_dir / '2026.yml')
+
+    files = watch.watched_files(project_root)
+    assert project.obs_shard(project_root, '2026') in files
+    assert project.obs_db(project_root) not in files
+
+
+# changed_files()
+
+def test_changed_files():
+
+    before = {'a': (1, 1), 'b': (1, 1), 'c': (1, 1)}
+    after = {'a': (1, 1), 'b': (2, 1), 'c': None, 'd': (1, 1)}
+    assert watch.changed_files(before, after) == ['b', 'c', 'd']
+    assert watch.changed_files(before, before) == []
+
+
+# load() / reload()
+
+def test_load(project_root: str):
+
+    state = watch.load(project_root)
+    assert state.sketches
+    assert state.observations
+    assert state.objects
+    assert state.stamps == watch.stamps(project_root)
+
+
+def test_reload_only_the_changed_db(project_root: str, mocker):
+
+    state = watch.load(project_root)
+    objects = state.objects
+    sketches = mocker.patch.object(watch.db, 'sketches')
+
+    assert watch.reload(state, [project.obs_db(project_root), project.meta_file(project_root)])
+    sketches.assert_not_called()
+    assert state.objects is objects
+
+
+def test_reload_error_keeps_the_data(project_root: str, capsys):
+
+    state = watch.load(project_root)
+    observations = state.observations
+
+    Path(project.obs_db(project_root)).write_text('observations: [\n', encoding='utf8')
+    assert not watch.reload(state, [project.obs_db(project_root)])
+    assert state.observations is observations
+    assert 'Unable to load' in capsys.readouterr().out
+
+
+# update()
+
+def test_update(project_root: str):
+
+    state = watch.load(project_root)
+    written = watch.update(state, [], run_checks=False)
+    assert 'index.md' in written
+    assert (Path(project.site_root(project_root)) / 'index.md').is_file()
+
+    # nothing changed, nothing written
+    assert watch.update(state, [], run_checks=False) == []
+
+    edit(project.obs_db(project_root), 'Time Square, NYC', 'Central Park, NYC')
+    written = watch.update(state, [project.obs_db(project_root)], run_checks=False)
+    assert written
+    assert all(w.startswith('obs/') for w in written)
+
+
+def test_update_checks_written_pages(project_root: str, mocker):
+
+    state = watch.load(project_root)
+    check_pages = mocker.patch.object(watch.check, 'check_pages', return_value=True)
+
+    written = watch.update(state, [])
+    pages = check_pages.call_args.args[1]
+    assert len(pages) == len([w for w in written if w.endswith('.md')])
+
+
+def test_update_load_error_skips_regen(project_root: str, mocker):
+
+    state = watch.load(project_root)
+    regen = mocker.patch.object(watch.regen, 'regen_loaded')
+
+    Path(project.object_db(project_root)).write_text('objects: {\n', encoding='utf8')
+    assert watch.update(state, [project.object_db(project_root)]) == []
+    regen.assert_not_called()
+
+
+def test_update_regen_error(project_root: str, capsys):
+
+    state = watch.load(project_root)
+    watch.update(state, [], run_checks=False)
+
+    # an observation added before its sketch
+    obs_db = Path(project.obs_db(project_root))
+    obs_db.write_text(obs_db.read_text(encoding='utf8') +
+                      '\n  - name: M42\n    img: 2026/m42-20260901.jpg\n    date: 2026-09-01 22:00\n',
+                      encoding='utf8')
+
+    assert watch.update(state, [str(obs_db)], run_checks=False) == []
+    assert 'Unable to regenerate' in capsys.readouterr().out
+
+
+# watch()
+
+def test_watch_keeps_going_after_errors(project_root: str, mocker):
+
+    mocker.patch.object(watch, 'wait_for_change', side_effect=[['a'], ['b'], KeyboardInterrupt])
+    regen = mocker.patch.object(watch.regen, 'regen_loaded',
+                                side_effect=[['index.md'], AssertionError('no sketch'), ['obs/a.md']])
+    on_update = mocker.Mock()
+
+    watch.watch(project_root, run_checks=False, on_update=on_update)
+
+    assert regen.call_count == 3
+    assert [c.args[0] for c in on_update.call_args_list] == [['index.md'], [], ['obs/a.md']]
+
+
+# wait_for_change()
+
+def test_wait_for_change(project_root: str, mocker):
+
+    state = watch.load(project_root)
+    meta = project.meta_file(project_root)
+    calls = []
+
+    def sleep(_):
+        calls.append(_)
+        # changed on the 2nd poll, then saved again during the debounce
+        if len(calls) in [2, 3]:
+            Path(meta).write_text(f'author: {len(calls)}\n', encoding='utf8')
+
+    mocker.patch.object(watch.time, 'sleep', side_effect=sleep)
+
+    assert watch.wait_for_change(state, poll_interval=1, debounce=2) == [meta]
+    assert calls == [1, 1, 2, 2]
+    assert state.stamps == watch.stamps(project_root)